@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Transaction, DailyCashFlow, Expense
+from .models import (
+    Transaction, DailyCashFlow, Expense, Account, JournalEntry, JournalLine, AccountingPeriod, PeriodBalance,
+)
 
 
 @admin.register(Transaction)
@@ -12,7 +14,7 @@ class TransactionAdmin(admin.ModelAdmin):
 
 @admin.register(DailyCashFlow)
 class DailyCashFlowAdmin(admin.ModelAdmin):
-    list_display = ['date', 'opening_balance', 'total_income', 'total_expense', 'closing_balance', 'is_closed']
+    list_display = ['date', 'opening_balance', 'total_income', 'total_expense', 'closing_balance', 'is_closed', 'organization']
     list_filter = ['is_closed']
     date_hierarchy = 'date'
 
@@ -23,3 +25,41 @@ class ExpenseAdmin(admin.ModelAdmin):
     list_filter = ['category', 'expense_date']
     search_fields = ['description']
     date_hierarchy = 'expense_date'
+
+
+@admin.register(Account)
+class AccountAdmin(admin.ModelAdmin):
+    list_display = ['code', 'name', 'account_type', 'balance', 'organization']
+    list_filter = ['account_type']
+    search_fields = ['code', 'name']
+
+
+class JournalLineInline(admin.TabularInline):
+    model = JournalLine
+    extra = 0
+    fields = ['account', 'debit', 'credit']
+    readonly_fields = ['account', 'debit', 'credit']
+
+
+@admin.register(JournalEntry)
+class JournalEntryAdmin(admin.ModelAdmin):
+    list_display = ['date', 'source', 'reference', 'description', 'created_by']
+    list_filter = ['source', 'date']
+    search_fields = ['reference', 'description']
+    date_hierarchy = 'date'
+    inlines = [JournalLineInline]
+
+
+class PeriodBalanceInline(admin.TabularInline):
+    model = PeriodBalance
+    extra = 0
+    fields = ['account', 'debit', 'credit', 'closing_balance']
+    readonly_fields = ['account', 'debit', 'credit', 'closing_balance']
+
+
+@admin.register(AccountingPeriod)
+class AccountingPeriodAdmin(admin.ModelAdmin):
+    list_display = ['start', 'end', 'is_closed', 'closed_by', 'closed_at', 'organization']
+    list_filter = ['is_closed']
+    readonly_fields = ['is_closed', 'closed_by', 'closed_at']
+    inlines = [PeriodBalanceInline]
@@ -0,0 +1,101 @@
+"""
+দৈনিক ক্যাশ ফ্লো
+One DailyCashFlow row per shop per day, kept up to date by the journal: every
+posted line on a money account (cash, bank / card, mobile banking) adds to
+that day's cash in (debit) or cash out (credit). So a sale counts only what
+was taken at the counter, a later customer payment counts on the day it was
+received, and purchases, supplier payments and expenses count as cash out
+when they are paid.
+
+The days form a chain: each day opens with the previous day's closing. A
+movement dated in the past re-carries the chain from that day on, all rows
+read and written in one statement each. The nightly rollover command opens
+the new day (even with no sales yet) and closes the previous ones.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+
+from stationery_shop.db import bulk_update_columns
+from .models import DailyCashFlow, JournalLine
+
+ZERO = Decimal('0')
+FIELDS = ['opening_balance', 'total_income', 'total_expense', 'closing_balance']
+
+
+def _carry(rows, running):
+    """Chain the rows (in date order) from an opening balance"""
+    for row in rows:
+        row.opening_balance = running
+        row.calculate_closing()
+        running = row.closing_balance
+    return running
+
+
+def _closing_before(organization, day):
+    return DailyCashFlow.objects.filter(organization=organization, date__lt=day).order_by('-date').values_list(
+        'closing_balance', flat=True
+    ).first() or ZERO
+
+
+@transaction.atomic
+def record(organization, movements):
+    """movements: {date: [cash in, cash out]}"""
+    movements = {day: amounts for day, amounts in movements.items() if amounts[0] or amounts[1]}
+    if organization is None or not movements:
+        return
+    first = min(movements)
+    DailyCashFlow.objects.bulk_create(
+        [DailyCashFlow(organization=organization, date=day) for day in movements], ignore_conflicts=True
+    )
+    rows = list(
+        DailyCashFlow.objects.select_for_update().filter(organization=organization, date__gte=first).order_by('date')
+    )
+    for row in rows:
+        cash_in, cash_out = movements.get(row.date, (ZERO, ZERO))
+        row.total_income += cash_in
+        row.total_expense += cash_out
+    _carry(rows, _closing_before(organization, first))
+    bulk_update_columns(DailyCashFlow, rows, FIELDS)
+
+
+@transaction.atomic
+def refresh(organization, money_codes):
+    """Recompute every day of the shop from the journal (after a rebuild)"""
+    movements = defaultdict(lambda: [ZERO, ZERO])
+    for row in JournalLine.objects.filter(
+        account__organization=organization, account__code__in=money_codes
+    ).values('date').annotate(cash_in=Sum('debit'), cash_out=Sum('credit')).order_by():
+        movements[row['date']] = [row['cash_in'], row['cash_out']]
+
+    rows = {row.date: row for row in DailyCashFlow.objects.select_for_update().filter(organization=organization)}
+    DailyCashFlow.objects.bulk_create(
+        [DailyCashFlow(organization=organization, date=day) for day in movements if day not in rows]
+    )
+    rows = list(DailyCashFlow.objects.filter(organization=organization).order_by('date'))
+    for row in rows:
+        row.total_income, row.total_expense = movements.get(row.date, (ZERO, ZERO))
+    _carry(rows, ZERO)
+    bulk_update_columns(DailyCashFlow, rows, FIELDS)
+
+
+@transaction.atomic
+def rollover(organization, day):
+    """দিন শুরু: opens `day` with the last closing balance and closes the days before it"""
+    opening = _closing_before(organization, day)
+    cashflow, created = DailyCashFlow.objects.get_or_create(
+        organization=organization, date=day, defaults={'opening_balance': opening, 'closing_balance': opening},
+    )
+    closed = DailyCashFlow.objects.filter(organization=organization, date__lt=day, is_closed=False).update(is_closed=True)
+    return cashflow, closed
+
+
+def for_day(organization, day):
+    """The day's row, or an unsaved one carried from the last closing if nothing moved yet"""
+    cashflow = DailyCashFlow.objects.filter(organization=organization, date=day).first()
+    if cashflow is None:
+        opening = _closing_before(organization, day)
+        cashflow = DailyCashFlow(organization=organization, date=day, opening_balance=opening, closing_balance=opening)
+    return cashflow
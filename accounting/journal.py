@@ -0,0 +1,441 @@
+"""
+ডাবল-এন্ট্রি জার্নাল
+Sales, purchases, payments and expenses post balanced journal entries in the
+same transaction that commits them. Each shop gets a fixed chart of accounts
+(created on first use), and every Account carries its running balance
+(debits - credits) so the trial balance is a read of the accounts table and
+the profit & loss a grouped read of journal lines over the (account, date)
+index - never a pass over the operational tables.
+
+post() takes any number of entries: they are inserted with two bulk
+statements and each touched account gets one increment, locked in primary
+key order. A document is posted at most once (source + reference are
+unique per shop), so rebuild() can replay a shop's history into an empty
+journal and reposting an already posted document is a no-op. Entries dated
+inside a closed month are refused, and entries dated before one move its
+frozen closing balances (see periods). Lines on the money accounts feed the
+daily cash flow (see cashflow).
+
+    sale              Dr cash (paid) + receivable (due)    Cr sales
+                      Dr cost of goods sold                Cr inventory
+    customer payment  Dr cash                              Cr receivable
+    purchase          Dr inventory (landed total)          Cr cash (paid) + payable
+    supplier payment  Dr payable                           Cr cash
+    sale return       Dr sales                             Cr receivable (credited) + cash (refunded)
+                      Dr inventory                         Cr cost of goods sold
+    purchase return   Dr payable (credited) + cash (refunded)  Cr inventory (landed value)
+    expense           Dr expense account                   Cr cash
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from stationery_shop.db import bulk_update_columns
+from . import cashflow, periods
+from .models import Account, Expense, JournalEntry, JournalLine, PeriodBalance
+
+ZERO = Decimal('0')
+CENTS = Decimal('0.01')
+CHUNK_SIZE = 2000
+
+CASH = '1000'
+BANK = '1010'
+MOBILE = '1020'
+RECEIVABLE = '1100'
+INVENTORY = '1200'
+PAYABLE = '2000'
+EQUITY = '3000'
+SALES = '4000'
+COGS = '5000'
+EXPENSE_CODES = {category: f'6{i:02d}0' for i, (category, label) in enumerate(Expense.EXPENSE_CATEGORIES)}
+
+DEFAULT_ACCOUNTS = [
+    (CASH, 'নগদ ক্যাশ', 'asset'),
+    (BANK, 'ব্যাংক / কার্ড', 'asset'),
+    (MOBILE, 'মোবাইল ব্যাংকিং', 'asset'),
+    (RECEIVABLE, 'গ্রাহকের কাছে পাওনা', 'asset'),
+    (INVENTORY, 'মজুদ পণ্য', 'asset'),
+    (PAYABLE, 'সাপ্লায়ারের কাছে দেনা', 'liability'),
+    (EQUITY, 'মালিকের মূলধন', 'equity'),
+    (SALES, 'বিক্রয় আয়', 'income'),
+    (COGS, 'বিক্রীত পণ্যের খরচ', 'expense'),
+] + [
+    (EXPENSE_CODES[category], label, 'expense') for category, label in Expense.EXPENSE_CATEGORIES
+]
+
+# Where money paid by each method sits ('credit' never moves money, cash is the fallback)
+METHOD_ACCOUNTS = {'cash': CASH, 'card': BANK, 'bank': BANK, 'mobile': MOBILE}
+MONEY_ACCOUNTS = {CASH, BANK, MOBILE}
+
+
+class JournalError(Exception):
+    pass
+
+
+def method_account(payment_method):
+    return METHOD_ACCOUNTS.get(payment_method, CASH)
+
+
+def chart(organization):
+    """{code: Account} of the shop, creating the default chart the first time"""
+    if organization is None:
+        return {}
+    accounts = {account.code: account for account in Account.objects.filter(organization=organization)}
+    missing = [row for row in DEFAULT_ACCOUNTS if row[0] not in accounts]
+    if missing:
+        Account.objects.bulk_create(
+            [Account(organization=organization, code=code, name=name, account_type=account_type)
+             for code, name, account_type in missing],
+            ignore_conflicts=True,
+        )
+        accounts = {account.code: account for account in Account.objects.filter(organization=organization)}
+    return accounts
+
+
+def _day(value):
+    if hasattr(value, 'tzinfo') and value.tzinfo is not None:
+        return timezone.localtime(value).date()
+    return value
+
+
+def entry(source, reference, date, lines, description='', user_id=None):
+    """One unsaved entry: lines are (account code, debit, credit)"""
+    return {
+        'source': source,
+        'reference': reference,
+        'date': _day(date),
+        'description': description[:255],
+        'user_id': user_id,
+        'lines': [(code, debit, credit) for code, debit, credit in lines if debit or credit],
+    }
+
+
+@transaction.atomic
+def post(organization, entries, replaying=False):
+    """Write entries and move account balances and the daily cash flow; returns the number posted
+
+    rebuild() replays with replaying=True and refreshes closed periods and
+    cash flow once at the end instead.
+    """
+    entries = [e for e in entries if e['lines']]
+    if organization is None or not entries:
+        return 0
+    closed = []
+    if not replaying:
+        try:
+            closed = periods.check_open(organization, {e['date'] for e in entries})
+        except periods.PeriodError as error:
+            raise JournalError(str(error))
+    for e in entries:
+        debit = sum((line[1] for line in e['lines']), ZERO)
+        credit = sum((line[2] for line in e['lines']), ZERO)
+        if debit != credit:
+            raise JournalError(f"{e['reference']}: ডেবিট {debit} ≠ ক্রেডিট {credit}")
+
+    # Documents already in the journal are skipped
+    posted = set(
+        JournalEntry.objects.filter(organization=organization).filter(
+            Q(source__in={e['source'] for e in entries}) & Q(reference__in={e['reference'] for e in entries})
+        ).values_list('source', 'reference')
+    )
+    entries = [e for e in entries if (e['source'], e['reference']) not in posted]
+    if not entries:
+        return 0
+
+    accounts = chart(organization)
+    saved = JournalEntry.objects.bulk_create(
+        [
+            JournalEntry(organization=organization, date=e['date'], source=e['source'], reference=e['reference'],
+                         description=e['description'], created_by_id=e['user_id'])
+            for e in entries
+        ],
+        batch_size=CHUNK_SIZE,
+    )
+    lines = []
+    deltas = defaultdict(Decimal)
+    cash = defaultdict(lambda: [ZERO, ZERO])
+    for journal_entry, e in zip(saved, entries):
+        for code, debit, credit in e['lines']:
+            account = accounts[code]
+            lines.append(JournalLine(entry=journal_entry, account=account, date=e['date'], debit=debit, credit=credit))
+            deltas[account.pk] += debit - credit
+            if code in MONEY_ACCOUNTS:
+                cash[e['date']][0] += debit
+                cash[e['date']][1] += credit
+    JournalLine.objects.bulk_create(lines, batch_size=CHUNK_SIZE)
+    if closed:
+        periods.shift_later(closed, [(line.date, line.account_id, line.debit - line.credit) for line in lines])
+    if not replaying:
+        cashflow.record(organization, cash)
+
+    for account_pk in sorted(deltas):
+        if deltas[account_pk]:
+            Account.objects.filter(pk=account_pk).update(balance=F('balance') + deltas[account_pk])
+    return len(saved)
+
+
+# Entries for each kind of document
+
+def _paid_at_creation(paid_amount, paid_later, total):
+    # paid_amount also counts the payments recorded afterwards; those post on their own
+    return min(max(paid_amount - paid_later, ZERO), total)
+
+
+def sale_entry(sale, cogs=ZERO, paid_later=ZERO):
+    paid = _paid_at_creation(sale.paid_amount, paid_later, sale.grand_total)
+    return entry('sale', sale.invoice_number, sale.sale_date, [
+        (method_account(sale.payment_method), paid, ZERO),
+        (RECEIVABLE, sale.grand_total - paid, ZERO),
+        (SALES, ZERO, sale.grand_total),
+        (COGS, cogs or ZERO, ZERO),
+        (INVENTORY, ZERO, cogs or ZERO),
+    ], f'বিক্রয়: {sale.invoice_number}', sale.created_by_id)
+
+
+def sale_payment_entry(payment, invoice_number):
+    return entry('sale_payment', f'PAY-{payment.pk}', payment.payment_date, [
+        (method_account(payment.payment_method), payment.amount, ZERO),
+        (RECEIVABLE, ZERO, payment.amount),
+    ], f'পেমেন্ট: {invoice_number}', payment.received_by_id)
+
+
+def purchase_entry(purchase, paid_later=ZERO):
+    paid = _paid_at_creation(purchase.paid_amount, paid_later, purchase.grand_total)
+    return entry('purchase', purchase.purchase_number, purchase.purchase_date, [
+        (INVENTORY, purchase.grand_total, ZERO),
+        (method_account(purchase.payment_method), ZERO, paid),
+        (PAYABLE, ZERO, purchase.grand_total - paid),
+    ], f'ক্রয়: {purchase.purchase_number}', purchase.created_by_id)
+
+
+def supplier_payment_entry(payment, purchase_number):
+    return entry('supplier_payment', f'SPAY-{payment.pk}', payment.payment_date, [
+        (PAYABLE, payment.amount, ZERO),
+        (method_account(payment.payment_method), ZERO, payment.amount),
+    ], f'সাপ্লায়ার পেমেন্ট: {purchase_number}', payment.paid_by_id)
+
+
+def sale_return_entry(sale_return):
+    cost = sale_return.cost_amount.quantize(CENTS)
+    return entry('sale_return', sale_return.return_number, sale_return.created_at, [
+        (SALES, sale_return.total_amount, ZERO),
+        (RECEIVABLE, ZERO, sale_return.credit_amount),
+        (method_account(sale_return.refund_method), ZERO, sale_return.refund_amount),
+        (INVENTORY, cost, ZERO),
+        (COGS, ZERO, cost),
+    ], f'বিক্রয় ফেরত: {sale_return.return_number}', sale_return.created_by_id)
+
+
+def purchase_return_entry(purchase_return):
+    return entry('purchase_return', purchase_return.return_number, purchase_return.created_at, [
+        (PAYABLE, purchase_return.credit_amount, ZERO),
+        (method_account(purchase_return.refund_method), purchase_return.refund_amount, ZERO),
+        (INVENTORY, ZERO, purchase_return.total_amount),
+    ], f'ক্রয় ফেরত: {purchase_return.return_number}', purchase_return.created_by_id)
+
+
+def expense_entry(expense):
+    return entry('expense', f'EXP-{expense.pk}', expense.expense_date, [
+        (EXPENSE_CODES.get(expense.category, EXPENSE_CODES['other']), expense.amount, ZERO),
+        (CASH, ZERO, expense.amount),
+    ], expense.description or expense.get_category_display(), expense.created_by_id)
+
+
+def sale_costs(invoice_numbers):
+    """{invoice number: cost of goods sold} from the costed sale movements, one query"""
+    from inventory.models import StockMovement
+
+    return dict(
+        StockMovement.objects.filter(movement_type='out', reference__in=list(invoice_numbers))
+        .values('reference').annotate(cost=Sum('total_cost')).order_by().values_list('reference', 'cost')
+    )
+
+
+def post_sale(sale):
+    cogs = sale_costs([sale.invoice_number]).get(sale.invoice_number) or ZERO
+    return post(sale.organization, [sale_entry(sale, cogs)])
+
+
+def post_sale_payment(payment):
+    sale = payment.sale
+    return post(sale.organization, [sale_payment_entry(payment, sale.invoice_number)])
+
+
+def post_sale_payments(organization, payments):
+    """A customer receipt split over several invoices (payment.sale already loaded)"""
+    return post(organization, [sale_payment_entry(payment, payment.sale.invoice_number) for payment in payments])
+
+
+def post_purchase(purchase):
+    return post(purchase.organization, [purchase_entry(purchase)])
+
+
+def post_supplier_payment(payment):
+    purchase = payment.purchase
+    return post(purchase.organization, [supplier_payment_entry(payment, purchase.purchase_number)])
+
+
+def post_sale_return(sale_return):
+    return post(sale_return.organization, [sale_return_entry(sale_return)])
+
+
+def post_purchase_return(purchase_return):
+    return post(purchase_return.organization, [purchase_return_entry(purchase_return)])
+
+
+def post_expense(expense):
+    return post(expense.organization, [expense_entry(expense)])
+
+
+# Reading balances
+
+def trial_balance(organization, period=None):
+    """Accounts with their debit / credit side and the two totals (as of a closed period's end if given)"""
+    accounts = sorted(chart(organization).values(), key=lambda account: account.code)
+    if period is not None:
+        closing = dict(period.balances.values_list('account_id', 'closing_balance'))
+        for account in accounts:
+            account.balance = closing.get(account.pk, ZERO)
+    for account in accounts:
+        account.debit = max(account.balance, ZERO)
+        account.credit = max(-account.balance, ZERO)
+    return (
+        accounts,
+        sum((account.debit for account in accounts), ZERO),
+        sum((account.credit for account in accounts), ZERO),
+    )
+
+
+def activity(organization, from_date, to_date, account_types=('income', 'expense')):
+    """{account: debits - credits between two dates}
+
+    Closed months inside the range are read from their snapshots; only the
+    remaining days are grouped over journal lines.
+    """
+    closed, gaps = periods.covered(organization, from_date, to_date)
+    movement = defaultdict(Decimal)
+    if closed:
+        rows = PeriodBalance.objects.filter(
+            period__in=closed, account__account_type__in=account_types,
+        ).values('account_id').annotate(debit=Sum('debit'), credit=Sum('credit')).order_by()
+        for row in rows:
+            movement[row['account_id']] += row['debit'] - row['credit']
+    if gaps:
+        rows = JournalLine.objects.filter(
+            gaps, account__organization=organization, account__account_type__in=account_types,
+        ).values('account_id').annotate(debit=Sum('debit'), credit=Sum('credit')).order_by()
+        for row in rows:
+            movement[row['account_id']] += row['debit'] - row['credit']
+    return {
+        account: movement.get(account.pk, ZERO)
+        for account in chart(organization).values() if account.account_type in account_types
+    }
+
+
+def profit_and_loss(organization, from_date, to_date):
+    """আয়, বিক্রীত পণ্যের খরচ, খরচের খাত ও নিট লাভ (জার্নাল থেকে)"""
+    income = ZERO
+    cogs = ZERO
+    expenses = []
+    for account, change in sorted(activity(organization, from_date, to_date).items(), key=lambda item: item[0].code):
+        if account.account_type == 'income':
+            income -= change
+        elif account.code == COGS:
+            cogs += change
+        elif change:
+            expenses.append({'category': account.name, 'total': change})
+    total_expenses = sum((row['total'] for row in expenses), ZERO)
+    return {
+        'total_sales': income,
+        'cogs': cogs,
+        'gross_profit': income - cogs,
+        'total_expenses': total_expenses,
+        'net_profit': income - cogs - total_expenses,
+        'expenses_by_category': expenses,
+    }
+
+
+def balances(organization, codes):
+    """{code: balance on the account's normal side} for a few accounts"""
+    accounts = chart(organization)
+    return {code: accounts[code].normal_balance if code in accounts else ZERO for code in codes}
+
+
+# Replaying history
+
+def _chunks(queryset, size=CHUNK_SIZE):
+    chunk = []
+    for obj in queryset.iterator(chunk_size=size):
+        chunk.append(obj)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _payment_totals(model, field, documents, amount='amount'):
+    return dict(
+        model.objects.filter(**{f'{field}__in': [document.pk for document in documents]})
+        .values(field).annotate(total=Sum(amount)).order_by().values_list(field, 'total')
+    )
+
+
+def _paid_later(payments, refunds, document):
+    # Money moved after the document was created: later payments in, return refunds out
+    return payments.get(document.pk, ZERO) - refunds.get(document.pk, ZERO)
+
+
+@transaction.atomic
+def rebuild(organization):
+    """দোকানের পুরো জার্নাল নতুন করে তৈরি (documents -> entries, balances from zero)
+
+    Closed months and the daily cash flow are refilled afterwards from the
+    replayed lines.
+    """
+    from purchases.models import Purchase, PurchaseReturn, SupplierPayment
+    from sales.models import Payment, Sale, SaleReturn
+
+    JournalLine.objects.filter(entry__organization=organization).delete()
+    JournalEntry.objects.filter(organization=organization).delete()
+    accounts = chart(organization)
+    for account in accounts.values():
+        account.balance = ZERO
+    bulk_update_columns(Account, accounts.values(), ['balance'])
+
+    posted = 0
+    for sales in _chunks(Sale.objects.filter(organization=organization).order_by('pk')):
+        costs = sale_costs(sale.invoice_number for sale in sales)
+        later = _payment_totals(Payment, 'sale_id', sales)
+        refunds = _payment_totals(SaleReturn, 'sale_id', sales, 'refund_amount')
+        posted += post(organization, [
+            sale_entry(sale, costs.get(sale.invoice_number) or ZERO, paid_later=_paid_later(later, refunds, sale))
+            for sale in sales
+        ], replaying=True)
+    for payments in _chunks(Payment.objects.filter(sale__organization=organization).select_related('sale').order_by('pk')):
+        posted += post(organization, [sale_payment_entry(payment, payment.sale.invoice_number) for payment in payments],
+                       replaying=True)
+    for purchases in _chunks(Purchase.objects.filter(organization=organization).order_by('pk')):
+        later = _payment_totals(SupplierPayment, 'purchase_id', purchases)
+        refunds = _payment_totals(PurchaseReturn, 'purchase_id', purchases, 'refund_amount')
+        posted += post(organization, [
+            purchase_entry(purchase, paid_later=_paid_later(later, refunds, purchase)) for purchase in purchases
+        ], replaying=True)
+    for payments in _chunks(
+        SupplierPayment.objects.filter(purchase__organization=organization).select_related('purchase').order_by('pk')
+    ):
+        posted += post(organization, [supplier_payment_entry(payment, payment.purchase.purchase_number)
+                                      for payment in payments], replaying=True)
+    for returns in _chunks(SaleReturn.objects.filter(organization=organization).order_by('pk')):
+        posted += post(organization, [sale_return_entry(sale_return) for sale_return in returns], replaying=True)
+    for returns in _chunks(PurchaseReturn.objects.filter(organization=organization).order_by('pk')):
+        posted += post(organization, [purchase_return_entry(purchase_return) for purchase_return in returns],
+                       replaying=True)
+    for expenses in _chunks(Expense.objects.filter(organization=organization).order_by('pk')):
+        posted += post(organization, [expense_entry(expense) for expense in expenses], replaying=True)
+    periods.refresh(organization)
+    cashflow.refresh(organization, MONEY_ACCOUNTS)
+    return posted
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounting import journal
+from tenants.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Rebuild each shop's journal and account balances from its sales, purchases, payments and expenses"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', help='Organization slug (default: all active shops)')
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.filter(is_active=True)
+        if options['org']:
+            organizations = organizations.filter(slug=options['org'])
+
+        for org in organizations:
+            start = time.perf_counter()
+            posted = journal.rebuild(org)
+            accounts, debit, credit = journal.trial_balance(org)
+            self.stdout.write(
+                f'{org.slug}: {posted} entries, trial balance ৳{debit:.2f} / ৳{credit:.2f} '
+                f'in {time.perf_counter() - start:.2f}s'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Done!'))
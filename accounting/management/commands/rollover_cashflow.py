@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from accounting import cashflow
+from tenants.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Open the day's cash flow from the previous closing balance per shop (schedule nightly, e.g. via cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', help='Organization slug (default: all active shops)')
+        parser.add_argument('--date', type=parse_date, help='Day to open, YYYY-MM-DD (default: today)')
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.filter(is_active=True)
+        if options['org']:
+            organizations = organizations.filter(slug=options['org'])
+        day = options['date'] or timezone.localdate()
+
+        for org in organizations:
+            start = time.perf_counter()
+            row, closed = cashflow.rollover(org, day)
+            self.stdout.write(
+                f'{org.slug}: {day} opens at ৳{row.opening_balance} ({closed} earlier days closed) '
+                f'in {time.perf_counter() - start:.2f}s'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Done!'))
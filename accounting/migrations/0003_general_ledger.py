@@ -0,0 +1,96 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_expense_organization(apps, schema_editor):
+    """Expenses belong to the shop of the user who recorded them"""
+    Expense = apps.get_model('accounting', 'Expense')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Expense.objects.filter(organization__isnull=True, created_by__isnull=False).update(
+        organization=Subquery(User.objects.filter(pk=OuterRef('created_by')).values('organization')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0002_initial'),
+        ('tenants', '0002_organization_valuation_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        # The backfill reads User.organization
+        ('accounts', '0002_user_is_owner_user_organization'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='expenses', to='tenants.organization'),
+        ),
+        migrations.CreateModel(
+            name='Account',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=10, verbose_name='কোড')),
+                ('name', models.CharField(max_length=100, verbose_name='নাম')),
+                ('account_type', models.CharField(choices=[('asset', 'সম্পদ'), ('liability', 'দায়'), ('equity', 'মূলধন'), ('income', 'আয়'), ('expense', 'ব্যয়')], max_length=20, verbose_name='ধরণ')),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='ব্যালেন্স (ডেবিট - ক্রেডিট)')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='accounts', to='tenants.organization')),
+            ],
+            options={
+                'verbose_name': 'হিসাবের খাত',
+                'verbose_name_plural': 'হিসাবের খাত সমূহ',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JournalEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='তারিখ')),
+                ('source', models.CharField(choices=[('sale', 'বিক্রয়'), ('sale_payment', 'গ্রাহকের পেমেন্ট'), ('purchase', 'ক্রয়'), ('supplier_payment', 'সাপ্লায়ার পেমেন্ট'), ('expense', 'খরচ'), ('manual', 'ম্যানুয়াল')], max_length=20, verbose_name='উৎস')),
+                ('reference', models.CharField(max_length=100, verbose_name='রেফারেন্স')),
+                ('description', models.CharField(blank=True, max_length=255, verbose_name='বিবরণ')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='তৈরি করেছেন')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='journal_entries', to='tenants.organization')),
+            ],
+            options={
+                'verbose_name': 'জার্নাল এন্ট্রি',
+                'verbose_name_plural': 'জার্নাল এন্ট্রি সমূহ',
+                'ordering': ['-date', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JournalLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='তারিখ')),
+                ('debit', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='ডেবিট')),
+                ('credit', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='ক্রেডিট')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lines', to='accounting.account', verbose_name='খাত')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='accounting.journalentry', verbose_name='এন্ট্রি')),
+            ],
+            options={
+                'verbose_name': 'জার্নাল লাইন',
+                'verbose_name_plural': 'জার্নাল লাইন সমূহ',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='account',
+            constraint=models.UniqueConstraint(fields=('organization', 'code'), name='unique_account_code_per_org'),
+        ),
+        migrations.AddConstraint(
+            model_name='journalentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('source', 'manual'), _negated=True), fields=('organization', 'source', 'reference'), name='unique_journal_source_reference'),
+        ),
+        migrations.AddIndex(
+            model_name='journalline',
+            index=models.Index(fields=['account', 'date'], name='journal_line_account_date_idx'),
+        ),
+        migrations.RunPython(backfill_expense_organization, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0003_general_ledger'),
+        ('tenants', '0002_organization_valuation_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountingPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateField(verbose_name='শুরু')),
+                ('end', models.DateField(verbose_name='শেষ')),
+                ('is_closed', models.BooleanField(default=False, verbose_name='বন্ধ')),
+                ('closed_at', models.DateTimeField(blank=True, null=True, verbose_name='বন্ধের সময়')),
+                ('closed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='বন্ধ করেছেন')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='accounting_periods', to='tenants.organization')),
+            ],
+            options={
+                'verbose_name': 'হিসাবের মেয়াদ',
+                'verbose_name_plural': 'হিসাবের মেয়াদ সমূহ',
+                'ordering': ['-start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PeriodBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('debit', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='ডেবিট')),
+                ('credit', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='ক্রেডিট')),
+                ('closing_balance', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='সমাপনী ব্যালেন্স')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='period_balances', to='accounting.account', verbose_name='খাত')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='accounting.accountingperiod', verbose_name='মেয়াদ')),
+            ],
+            options={
+                'verbose_name': 'মেয়াদের ব্যালেন্স',
+                'verbose_name_plural': 'মেয়াদের ব্যালেন্স সমূহ',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='accountingperiod',
+            constraint=models.UniqueConstraint(fields=('organization', 'start'), name='unique_period_per_org'),
+        ),
+        migrations.AddConstraint(
+            model_name='periodbalance',
+            constraint=models.UniqueConstraint(fields=('period', 'account'), name='unique_balance_per_period_account'),
+        ),
+    ]
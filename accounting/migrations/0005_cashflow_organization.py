@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0004_period_close'),
+        ('tenants', '0002_organization_valuation_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailycashflow',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cash_flows', to='tenants.organization'),
+        ),
+        migrations.AlterField(
+            model_name='dailycashflow',
+            name='date',
+            field=models.DateField(verbose_name='তারিখ'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycashflow',
+            constraint=models.UniqueConstraint(fields=('organization', 'date'), name='unique_cashflow_per_org_date'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0005_cashflow_organization'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='journalentry',
+            name='source',
+            field=models.CharField(choices=[('sale', 'বিক্রয়'), ('sale_payment', 'গ্রাহকের পেমেন্ট'), ('purchase', 'ক্রয়'), ('supplier_payment', 'সাপ্লায়ার পেমেন্ট'), ('sale_return', 'বিক্রয় ফেরত'), ('purchase_return', 'ক্রয় ফেরত'), ('expense', 'খরচ'), ('manual', 'ম্যানুয়াল')], max_length=20, verbose_name='উৎস'),
+        ),
+    ]
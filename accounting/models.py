@@ -43,7 +43,11 @@ class Transaction(models.Model):
 
 class DailyCashFlow(models.Model):
     """দৈনিক ক্যাশ ফ্লো"""
-    date = models.DateField(unique=True, verbose_name='তারিখ')
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='cash_flows'
+    )
+    date = models.DateField(verbose_name='তারিখ')
     opening_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='প্রারম্ভিক ব্যালেন্স')
     total_income = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='মোট আয়')
     total_expense = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='মোট ব্যয়')
@@ -56,6 +60,9 @@ class DailyCashFlow(models.Model):
         verbose_name = 'দৈনিক ক্যাশ ফ্লো'
         verbose_name_plural = 'দৈনিক ক্যাশ ফ্লো সমূহ'
         ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'date'], name='unique_cashflow_per_org_date'),
+        ]
     
     def __str__(self):
         return f"{self.date} - Opening: {self.opening_balance}৳, Closing: {self.closing_balance}৳"
@@ -80,6 +87,10 @@ class Expense(models.Model):
         ('other', 'অন্যান্য'),
     ]
     
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='expenses'
+    )
     category = models.CharField(max_length=30, choices=EXPENSE_CATEGORIES, verbose_name='ক্যাটাগরি')
     amount = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='টাকার পরিমাণ')
     description = models.TextField(blank=True, verbose_name='বিবরণ')
@@ -95,3 +106,146 @@ class Expense(models.Model):
     
     def __str__(self):
         return f"{self.get_category_display()} - {self.amount}৳"
+
+
+class Account(models.Model):
+    """হিসাবের খাত (চার্ট অফ অ্যাকাউন্টস)"""
+    ACCOUNT_TYPES = [
+        ('asset', 'সম্পদ'),
+        ('liability', 'দায়'),
+        ('equity', 'মূলধন'),
+        ('income', 'আয়'),
+        ('expense', 'ব্যয়'),
+    ]
+    # Assets and expenses grow with debits, the rest with credits
+    DEBIT_TYPES = ('asset', 'expense')
+    
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='accounts'
+    )
+    code = models.CharField(max_length=10, verbose_name='কোড')
+    name = models.CharField(max_length=100, verbose_name='নাম')
+    account_type = models.CharField(max_length=20, choices=ACCOUNT_TYPES, verbose_name='ধরণ')
+    # Running debits minus credits, kept current by accounting.journal
+    balance = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name='ব্যালেন্স (ডেবিট - ক্রেডিট)')
+    
+    class Meta:
+        verbose_name = 'হিসাবের খাত'
+        verbose_name_plural = 'হিসাবের খাত সমূহ'
+        ordering = ['code']
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'code'], name='unique_account_code_per_org'),
+        ]
+    
+    def __str__(self):
+        return f"{self.code} - {self.name}"
+    
+    @property
+    def normal_balance(self):
+        """খাতের স্বাভাবিক দিকে ব্যালেন্স (দায়/মূলধন/আয় ক্রেডিট দিকে)"""
+        return self.balance if self.account_type in self.DEBIT_TYPES else -self.balance
+
+
+class JournalEntry(models.Model):
+    """জার্নাল এন্ট্রি"""
+    SOURCES = [
+        ('sale', 'বিক্রয়'),
+        ('sale_payment', 'গ্রাহকের পেমেন্ট'),
+        ('purchase', 'ক্রয়'),
+        ('supplier_payment', 'সাপ্লায়ার পেমেন্ট'),
+        ('sale_return', 'বিক্রয় ফেরত'),
+        ('purchase_return', 'ক্রয় ফেরত'),
+        ('expense', 'খরচ'),
+        ('manual', 'ম্যানুয়াল'),
+    ]
+    
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='journal_entries'
+    )
+    date = models.DateField(verbose_name='তারিখ')
+    source = models.CharField(max_length=20, choices=SOURCES, verbose_name='উৎস')
+    reference = models.CharField(max_length=100, verbose_name='রেফারেন্স')
+    description = models.CharField(max_length=255, blank=True, verbose_name='বিবরণ')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='তৈরি করেছেন')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'জার্নাল এন্ট্রি'
+        verbose_name_plural = 'জার্নাল এন্ট্রি সমূহ'
+        ordering = ['-date', '-id']
+        constraints = [
+            # A document is posted once
+            models.UniqueConstraint(
+                fields=['organization', 'source', 'reference'], condition=~models.Q(source='manual'),
+                name='unique_journal_source_reference',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.get_source_display()} - {self.reference}"
+
+
+class JournalLine(models.Model):
+    """জার্নাল লাইন (ডেবিট / ক্রেডিট)"""
+    entry = models.ForeignKey(JournalEntry, on_delete=models.CASCADE, related_name='lines', verbose_name='এন্ট্রি')
+    account = models.ForeignKey(Account, on_delete=models.PROTECT, related_name='lines', verbose_name='খাত')
+    # Copied from the entry so period reports read one index
+    date = models.DateField(verbose_name='তারিখ')
+    debit = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='ডেবিট')
+    credit = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='ক্রেডিট')
+    
+    class Meta:
+        verbose_name = 'জার্নাল লাইন'
+        verbose_name_plural = 'জার্নাল লাইন সমূহ'
+        indexes = [
+            models.Index(fields=['account', 'date'], name='journal_line_account_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.account} Dr {self.debit} / Cr {self.credit}"
+
+
+class AccountingPeriod(models.Model):
+    """হিসাবের মেয়াদ (মাস) - বন্ধ করলে খাতের ব্যালেন্স স্থির হয়"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='accounting_periods'
+    )
+    start = models.DateField(verbose_name='শুরু')
+    end = models.DateField(verbose_name='শেষ')
+    is_closed = models.BooleanField(default=False, verbose_name='বন্ধ')
+    closed_at = models.DateTimeField(null=True, blank=True, verbose_name='বন্ধের সময়')
+    closed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='বন্ধ করেছেন')
+    
+    class Meta:
+        verbose_name = 'হিসাবের মেয়াদ'
+        verbose_name_plural = 'হিসাবের মেয়াদ সমূহ'
+        ordering = ['-start']
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'start'], name='unique_period_per_org'),
+        ]
+    
+    def __str__(self):
+        return self.start.strftime('%Y-%m')
+
+
+class PeriodBalance(models.Model):
+    """বন্ধ মেয়াদের খাতভিত্তিক স্থির ব্যালেন্স"""
+    period = models.ForeignKey(AccountingPeriod, on_delete=models.CASCADE, related_name='balances', verbose_name='মেয়াদ')
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='period_balances', verbose_name='খাত')
+    # Activity inside the period, and debits - credits from the beginning up to its last day
+    debit = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name='ডেবিট')
+    credit = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name='ক্রেডিট')
+    closing_balance = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name='সমাপনী ব্যালেন্স')
+    
+    class Meta:
+        verbose_name = 'মেয়াদের ব্যালেন্স'
+        verbose_name_plural = 'মেয়াদের ব্যালেন্স সমূহ'
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'account'], name='unique_balance_per_period_account'),
+        ]
+    
+    def __str__(self):
+        return f"{self.period} - {self.account.code}: {self.closing_balance}"
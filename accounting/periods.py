@@ -0,0 +1,175 @@
+"""
+মাস বন্ধ (period close)
+Closing a month freezes every account's activity in it and its closing
+balance into PeriodBalance rows. Reports over closed months read those rows
+and only the days no closed month covers - in practice the open month - are
+aggregated from journal lines.
+
+A closed month takes no new entries. Reopening it drops only its own
+snapshot; the months closed after it keep theirs, and while it is open any
+entry posted into it also moves their closing balances (shift_later), so
+they never go stale. Closing it again recomputes just that month from the
+previous closed month's closing balances plus the lines in between.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from stationery_shop.db import bulk_update_columns
+from .models import Account, AccountingPeriod, JournalLine, PeriodBalance
+
+ZERO = Decimal('0')
+
+
+class PeriodError(Exception):
+    pass
+
+
+def month_bounds(day):
+    """(first day, last day) of the month containing `day`"""
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+def closed_periods(organization, since=None):
+    periods = AccountingPeriod.objects.filter(organization=organization, is_closed=True)
+    if since is not None:
+        periods = periods.filter(end__gte=since)
+    return periods.order_by('start')
+
+
+def check_open(organization, dates):
+    """Closed periods from the earliest of `dates` on; raises if any date falls inside one"""
+    if not dates:
+        return []
+    periods = list(closed_periods(organization, since=min(dates)))
+    for period in periods:
+        if any(period.start <= day <= period.end for day in dates):
+            raise PeriodError(f'{period} মাস বন্ধ; এই তারিখে এন্ট্রি করা যাবে না')
+    return periods
+
+
+def shift_later(periods, dated_deltas):
+    """Entries posted before closed periods move those periods' closing balances.
+
+    dated_deltas: [(date, account_id, debit - credit)]
+    """
+    changes = defaultdict(Decimal)
+    for period in periods:
+        for day, account_id, delta in dated_deltas:
+            if day < period.start:
+                changes[(period.pk, account_id)] += delta
+    changes = {key: delta for key, delta in changes.items() if delta}
+    if not changes:
+        return
+    rows = PeriodBalance.objects.select_for_update().filter(
+        period_id__in={period_id for period_id, account_id in changes},
+        account_id__in={account_id for period_id, account_id in changes},
+    )
+    touched = []
+    for row in rows:
+        delta = changes.get((row.period_id, row.account_id))
+        if delta:
+            row.closing_balance += delta
+            touched.append(row)
+    bulk_update_columns(PeriodBalance, touched, ['closing_balance'])
+
+
+def _snapshot(period):
+    """Write a period's balances from the previous closed period and the lines since"""
+    organization = period.organization
+    previous = AccountingPeriod.objects.filter(
+        organization=organization, is_closed=True, end__lt=period.start
+    ).order_by('-start').first()
+    opening = {}
+    lines = JournalLine.objects.filter(account__organization=organization, date__lte=period.end)
+    if previous is not None:
+        opening = dict(previous.balances.values_list('account_id', 'closing_balance'))
+        lines = lines.filter(date__gt=previous.end)
+
+    in_period = Q(date__gte=period.start)
+    rows = {
+        row['account_id']: row
+        for row in lines.values('account_id').annotate(
+            moved=Sum(F('debit') - F('credit')),
+            period_debit=Sum('debit', filter=in_period),
+            period_credit=Sum('credit', filter=in_period),
+        ).order_by()
+    }
+    balances = []
+    for account_id in Account.objects.filter(organization=organization).values_list('pk', flat=True):
+        row = rows.get(account_id, {})
+        balances.append(PeriodBalance(
+            period=period,
+            account_id=account_id,
+            debit=row.get('period_debit') or ZERO,
+            credit=row.get('period_credit') or ZERO,
+            closing_balance=opening.get(account_id, ZERO) + (row.get('moved') or ZERO),
+        ))
+    period.balances.all().delete()
+    PeriodBalance.objects.bulk_create(balances)
+
+
+@transaction.atomic
+def close(organization, day, user=None):
+    """মাস বন্ধ: the month containing `day` must have ended"""
+    start, end = month_bounds(day)
+    if end >= timezone.localdate():
+        raise PeriodError('চলতি বা ভবিষ্যতের মাস বন্ধ করা যাবে না')
+    period, _ = AccountingPeriod.objects.get_or_create(organization=organization, start=start, defaults={'end': end})
+    period = AccountingPeriod.objects.select_for_update().get(pk=period.pk)
+    if period.is_closed:
+        raise PeriodError(f'{period} মাস আগেই বন্ধ')
+    _snapshot(period)
+    period.is_closed = True
+    period.closed_at = timezone.now()
+    period.closed_by = user
+    period.save()
+    return period
+
+
+@transaction.atomic
+def reopen(period):
+    """মাস আবার খোলা: only this month's snapshot is dropped"""
+    period = AccountingPeriod.objects.select_for_update().get(pk=period.pk)
+    if not period.is_closed:
+        raise PeriodError(f'{period} মাস খোলা আছে')
+    period.balances.all().delete()
+    period.is_closed = False
+    period.closed_at = None
+    period.closed_by = None
+    period.save()
+    return period
+
+
+@transaction.atomic
+def refresh(organization):
+    """Recompute every closed period in order (after the journal is rebuilt)"""
+    for period in closed_periods(organization):
+        _snapshot(period)
+
+
+def covered(organization, from_date, to_date):
+    """Closed periods wholly inside the range, and Q over the days they leave uncovered"""
+    if isinstance(from_date, str):
+        from_date = parse_date(from_date)
+    if isinstance(to_date, str):
+        to_date = parse_date(to_date)
+    periods = list(AccountingPeriod.objects.filter(
+        organization=organization, is_closed=True, start__gte=from_date, end__lte=to_date
+    ).order_by('start'))
+    gaps = Q()
+    day = from_date
+    for period in periods:
+        if period.start > day:
+            gaps |= Q(date__gte=day, date__lt=period.start)
+        day = period.end + timedelta(days=1)
+    if day <= to_date:
+        gaps |= Q(date__gte=day, date__lte=to_date)
+    return periods, gaps
@@ -1,3 +1,66 @@
+import io
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from accounts.models import User
+from tenants.models import Organization
+from .models import Expense
+
+EXPORT_ROWS = 20000
+# Streamed, the export peaks under 1 MB; a normal workbook of EXPORT_ROWS rows needs over 20 MB
+PEAK_MEMORY_LIMIT = 8 * 1024 * 1024
+
+
+def make_shop(slug):
+    org = Organization.objects.create(name=slug, slug=slug, owner_name='o', email=f'{slug}@example.com', phone='1')
+    user = User.objects.create_user(username=f'{slug}-user', password='p', organization=org)
+    return org, user
+
+
+class ExpenseExportTests(TestCase):
+    url = reverse('accounting:expense_report_export')
+    period = {'from_date': '2026-01-01', 'to_date': '2026-01-31'}
+
+    def export(self, user):
+        self.client.force_login(user)
+        response = self.client.get(self.url, self.period)
+        self.assertEqual(response.status_code, 200)
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        return list(workbook['খরচ'].iter_rows(min_row=2, values_only=True))
+
+    def test_expenses_are_scoped_to_the_users_shop(self):
+        first, first_user = make_shop('first')
+        second, second_user = make_shop('second')
+        Expense.objects.create(organization=first, category='rent', amount=Decimal('5000'),
+                               description='first rent', expense_date=date(2026, 1, 5))
+
+        self.assertEqual([row[2] for row in self.export(first_user)], ['first rent'])
+        self.assertEqual(self.export(second_user), [])
+
+    def test_large_export_streams_within_memory_ceiling(self):
+        org, user = make_shop('big')
+        Expense.objects.bulk_create(
+            [Expense(organization=org, category='other', amount=Decimal('10.50'),
+                     description=f'expense {i}', expense_date=date(2026, 1, 1 + i % 28))
+             for i in range(EXPORT_ROWS)],
+            batch_size=2000,
+        )
+        self.client.force_login(user)
+
+        tracemalloc.start()
+        try:
+            response = self.client.get(self.url, self.period)
+            size = sum(len(chunk) for chunk in response.streaming_content)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(size, 0)
+        self.assertLess(peak, PEAK_MEMORY_LIMIT)
+        self.assertEqual(len(self.export(user)), EXPORT_ROWS)
@@ -18,6 +18,13 @@ urlpatterns = [
     
     # Reports
     path('report/profit-loss/', views.profit_loss_report, name='profit_loss_report'),
+    path('report/trial-balance/', views.trial_balance, name='trial_balance'),
     path('report/income/', views.income_report, name='income_report'),
     path('report/expense/', views.expense_report, name='expense_report'),
+    path('report/expense/export/', views.expense_report_export, name='expense_report_export'),
+    
+    # Period close
+    path('periods/', views.period_list, name='period_list'),
+    path('periods/close/', views.period_close, name='period_close'),
+    path('periods/<int:pk>/reopen/', views.period_reopen, name='period_reopen'),
 ]
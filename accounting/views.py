@@ -1,14 +1,18 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Sum, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from decimal import Decimal
-from datetime import timedelta
+from datetime import date, timedelta
 
-from .models import Transaction, DailyCashFlow, Expense
+from .models import Transaction, DailyCashFlow, Expense, AccountingPeriod, JournalLine
+from . import cashflow, journal, periods
 from sales.models import Sale
 from purchases.models import Purchase
+from stationery_shop.exports import EXPORT_CHUNK_SIZE, scope_to_org, xlsx_response
 
 
 @login_required
@@ -17,45 +21,28 @@ def accounting_dashboard(request):
     today = timezone.now().date()
     this_month_start = today.replace(day=1)
     
-    # Monthly income (sales)
-    monthly_sales = Sale.objects.filter(
-        sale_date__date__gte=this_month_start
-    ).aggregate(total=Sum('grand_total'))['total'] or Decimal('0')
+    org = request.user.organization
     
-    # Monthly expenses
-    monthly_purchases = Purchase.objects.filter(
-        purchase_date__date__gte=this_month_start
-    ).aggregate(total=Sum('grand_total'))['total'] or Decimal('0')
-    
-    monthly_expenses = Expense.objects.filter(
-        expense_date__gte=this_month_start
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-    
-    total_expense = monthly_purchases + monthly_expenses
-    
-    # Profit
-    monthly_profit = monthly_sales - total_expense
+    # Income, expenses and profit from the journal
+    monthly = journal.profit_and_loss(org, this_month_start, today)
     
-    # Receivables (customer dues)
-    receivables = Sale.objects.filter(
-        payment_status__in=['unpaid', 'partial']
-    ).aggregate(total=Sum('due_amount'))['total'] or Decimal('0')
+    monthly_purchases = scope_to_org(Purchase.objects.filter(
+        purchase_date__date__gte=this_month_start
+    ), request).aggregate(total=Sum('grand_total'))['total'] or Decimal('0')
     
-    # Payables (supplier dues)
-    payables = Purchase.objects.filter(
-        payment_status__in=['unpaid', 'partial']
-    ).aggregate(total=Sum('due_amount'))['total'] or Decimal('0')
+    # Receivables and payables are the running balances of their accounts
+    balances = journal.balances(org, [journal.RECEIVABLE, journal.PAYABLE])
     
     # Recent transactions
     recent_transactions = Transaction.objects.all()[:10]
     
     context = {
-        'monthly_sales': monthly_sales,
+        'monthly_sales': monthly['total_sales'],
         'monthly_purchases': monthly_purchases,
-        'monthly_expenses': monthly_expenses,
-        'monthly_profit': monthly_profit,
-        'receivables': receivables,
-        'payables': payables,
+        'monthly_expenses': monthly['total_expenses'],
+        'monthly_profit': monthly['net_profit'],
+        'receivables': balances[journal.RECEIVABLE],
+        'payables': balances[journal.PAYABLE],
         'recent_transactions': recent_transactions,
     }
     return render(request, 'accounting/dashboard.html', context)
@@ -137,13 +124,20 @@ def expense_list(request):
 def expense_add(request):
     """নতুন খরচ"""
     if request.method == 'POST':
-        expense = Expense.objects.create(
-            category=request.POST.get('category'),
-            amount=request.POST.get('amount'),
-            description=request.POST.get('description', ''),
-            expense_date=request.POST.get('date', timezone.now().date()),
-            created_by=request.user,
-        )
+        try:
+            with transaction.atomic():
+                expense = Expense.objects.create(
+                    organization=request.user.organization,
+                    category=request.POST.get('category'),
+                    amount=Decimal(request.POST.get('amount') or 0),
+                    description=request.POST.get('description', ''),
+                    expense_date=parse_date(request.POST.get('date') or '') or timezone.localdate(),
+                    created_by=request.user,
+                )
+                journal.post_expense(expense)
+        except journal.JournalError as e:
+            messages.error(request, str(e))
+            return render(request, 'accounting/expense_form.html')
         
         if request.FILES.get('receipt'):
             expense.receipt = request.FILES['receipt']
@@ -158,58 +152,31 @@ def expense_add(request):
 @login_required
 def cashflow_list(request):
     """ক্যাশ ফ্লো তালিকা"""
-    cashflows = DailyCashFlow.objects.all()[:30]
+    cashflows = DailyCashFlow.objects.filter(organization=request.user.organization)[:30]
     return render(request, 'accounting/cashflow_list.html', {'cashflows': cashflows})
 
 
 @login_required
 def today_cashflow(request):
-    """আজকের ক্যাশ ফ্লো"""
-    today = timezone.now().date()
-    
-    cashflow, created = DailyCashFlow.objects.get_or_create(
-        date=today,
-        defaults={
-            'opening_balance': Decimal('0'),
-            'total_income': Decimal('0'),
-            'total_expense': Decimal('0'),
-        }
-    )
-    
-    if created or not cashflow.is_closed:
-        # Calculate from yesterday's closing
-        yesterday = today - timedelta(days=1)
-        yesterday_cf = DailyCashFlow.objects.filter(date=yesterday).first()
-        if yesterday_cf:
-            cashflow.opening_balance = yesterday_cf.closing_balance
-        
-        # Today's income
-        today_sales = Sale.objects.filter(sale_date__date=today)
-        cashflow.total_income = today_sales.aggregate(total=Sum('paid_amount'))['total'] or Decimal('0')
-        
-        # Today's expenses
-        today_purchases = Purchase.objects.filter(purchase_date__date=today)
-        purchase_payments = today_purchases.aggregate(total=Sum('paid_amount'))['total'] or Decimal('0')
-        
-        today_expenses = Expense.objects.filter(expense_date=today)
-        expense_total = today_expenses.aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        cashflow.total_expense = purchase_payments + expense_total
-        cashflow.calculate_closing()
-        cashflow.save()
+    """আজকের ক্যাশ ফ্লো (জার্নাল পোস্টের সাথে সাথেই হালনাগাদ)"""
+    organization = request.user.organization
+    today = timezone.localdate()
+    today_flow = cashflow.for_day(organization, today)
     
-    # Today's breakdown
-    today_sales = Sale.objects.filter(sale_date__date=today)
-    today_purchases = Purchase.objects.filter(purchase_date__date=today)
-    today_expenses = Expense.objects.filter(expense_date=today)
+    # Today's money movements, straight from the journal
+    movements = JournalLine.objects.filter(
+        account__organization=organization, account__code__in=journal.MONEY_ACCOUNTS, date=today,
+    ).select_related('entry', 'account').order_by('-entry__created_at')[:100]
     
     context = {
-        'cashflow': cashflow,
-        'sales': today_sales,
-        'purchases': today_purchases,
-        'expenses': today_expenses,
+        'cashflow': today_flow,
+        'opening_balance': today_flow.opening_balance,
+        'cash_in': today_flow.total_income,
+        'cash_out': today_flow.total_expense,
+        'closing_balance': today_flow.closing_balance,
+        'movements': movements,
     }
-    return render(request, 'accounting/today_cashflow.html', context)
+    return render(request, 'accounting/cashflow.html', context)
 
 
 @login_required
@@ -223,44 +190,76 @@ def profit_loss_report(request):
     if not to_date:
         to_date = timezone.now().date()
     
-    # Sales
-    sales = Sale.objects.filter(
-        sale_date__date__gte=from_date,
-        sale_date__date__lte=to_date
-    )
-    total_sales = sales.aggregate(total=Sum('grand_total'))['total'] or Decimal('0')
-    
-    # Cost of goods sold (buying price of sold items)
-    from sales.models import SaleItem
-    sold_items = SaleItem.objects.filter(sale__in=sales)
-    cogs = sum(item.quantity * item.product.buying_price for item in sold_items)
-    
-    # Gross profit
-    gross_profit = total_sales - cogs
-    
-    # Operating expenses
-    expenses = Expense.objects.filter(
-        expense_date__gte=from_date,
-        expense_date__lte=to_date
-    )
-    total_expenses = expenses.aggregate(total=Sum('amount'))['total'] or Decimal('0')
-    
-    # Net profit
-    net_profit = gross_profit - total_expenses
-    
+    # Read from the journal, not from the sales and expense tables
     context = {
         'from_date': from_date,
         'to_date': to_date,
-        'total_sales': total_sales,
-        'cogs': cogs,
-        'gross_profit': gross_profit,
-        'total_expenses': total_expenses,
-        'net_profit': net_profit,
-        'expenses_by_category': expenses.values('category').annotate(total=Sum('amount')),
+        **journal.profit_and_loss(request.user.organization, from_date, to_date),
     }
     return render(request, 'accounting/profit_loss.html', context)
 
 
+@login_required
+def trial_balance(request):
+    """ট্রায়াল ব্যালেন্স (চলতি, বা ?period=YYYY-MM দিলে বন্ধ মাসের শেষে)"""
+    organization = request.user.organization
+    closed = list(periods.closed_periods(organization).order_by('-start'))
+    period = next((p for p in closed if str(p) == request.GET.get('period')), None)
+    accounts, total_debit, total_credit = journal.trial_balance(organization, period)
+    
+    context = {
+        'accounts': accounts,
+        'total_debit': total_debit,
+        'total_credit': total_credit,
+        'period': period,
+        'closed_periods': closed,
+    }
+    return render(request, 'accounting/trial_balance.html', context)
+
+
+@login_required
+def period_list(request):
+    """হিসাবের মাস (বন্ধ / খোলা)"""
+    last_month = timezone.now().date().replace(day=1) - timedelta(days=1)
+    context = {
+        'periods': AccountingPeriod.objects.filter(organization=request.user.organization).select_related('closed_by')[:100],
+        'last_month': last_month.strftime('%Y-%m'),
+    }
+    return render(request, 'accounting/periods.html', context)
+
+
+@login_required
+def period_close(request):
+    """মাস বন্ধ (month=YYYY-MM)"""
+    if request.method != 'POST':
+        return redirect('accounting:period_list')
+    try:
+        year, month = (int(part) for part in request.POST.get('month', '').split('-'))
+        period = periods.close(request.user.organization, date(year, month, 1), request.user)
+    except ValueError:
+        messages.error(request, 'সঠিক মাস দিন')
+    except periods.PeriodError as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, f'{period} মাস বন্ধ হয়েছে!')
+    return redirect('accounting:period_list')
+
+
+@login_required
+def period_reopen(request, pk):
+    """বন্ধ মাস আবার খোলা"""
+    period = get_object_or_404(AccountingPeriod, pk=pk, organization=request.user.organization)
+    if request.method != 'POST':
+        return redirect('accounting:period_list')
+    try:
+        periods.reopen(period)
+    except periods.PeriodError as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, f'{period} মাস আবার খোলা হয়েছে!')
+    return redirect('accounting:period_list')
+
+
 @login_required
 def income_report(request):
     """আয় রিপোর্ট"""
@@ -317,3 +316,34 @@ def expense_report(request):
         'expenses': expenses,
     }
     return render(request, 'accounting/expense_report.html', context)
+
+
+@login_required
+def expense_report_export(request):
+    """ব্যয় রিপোর্ট Excel"""
+    from_date = request.GET.get('from_date') or timezone.now().date().replace(day=1)
+    to_date = request.GET.get('to_date') or timezone.now().date()
+    
+    purchases = scope_to_org(Purchase.objects.filter(
+        purchase_date__date__gte=from_date,
+        purchase_date__date__lte=to_date
+    ), request).order_by('purchase_date').values_list(
+        'purchase_number', 'purchase_date', 'supplier__name', 'grand_total', 'paid_amount', 'due_amount',
+    )
+    
+    expenses = scope_to_org(Expense.objects.filter(
+        expense_date__gte=from_date,
+        expense_date__lte=to_date
+    ), request).order_by('expense_date').values_list('expense_date', 'category', 'description', 'amount')
+    
+    categories = dict(Expense.EXPENSE_CATEGORIES)
+    expense_rows = (
+        (date, categories.get(category, category), description, amount)
+        for date, category, description, amount in expenses.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    
+    return xlsx_response(f'expenses-{from_date}-{to_date}.xlsx', [
+        ('ক্রয়', ['ক্রয় নম্বর', 'তারিখ', 'সাপ্লায়ার', 'সর্বমোট', 'প্রদত্ত', 'বাকি'],
+         purchases.iterator(chunk_size=EXPORT_CHUNK_SIZE)),
+        ('খরচ', ['তারিখ', 'ক্যাটাগরি', 'বিবরণ', 'টাকার পরিমাণ'], expense_rows),
+    ])
@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Sum, Count, Q, F
 from django.utils import timezone
 from datetime import timedelta
@@ -11,7 +12,9 @@ from .models import User
 from sales.models import Sale, SaleItem
 from purchases.models import Purchase
 from inventory.models import Stock, StockAlert
+from inventory import valuation
 from products.models import Product
+from tenants import quota
 
 
 def get_user_org(user):
@@ -87,7 +90,7 @@ def dashboard(request):
     monthly_profit = monthly_total - monthly_purchase_total
     
     # Low stock products
-    low_stock_items = stock_qs.filter(quantity__lte=F('reorder_level')).select_related('product')[:10]
+    low_stock_items = stock_qs.filter(is_low=True).select_related('product')[:10]
     
     # Recent sales
     recent_sales = sales_qs.select_related('customer', 'created_by').order_by('-sale_date')[:10]
@@ -95,10 +98,12 @@ def dashboard(request):
     # Stock alerts
     unread_alerts = alert_qs.filter(is_read=False).count()
     
-    # Total stock value
-    total_stock_value = stock_qs.annotate(
-        value=F('quantity') * F('product__buying_price')
-    ).aggregate(total=Sum('value'))['total'] or Decimal('0')
+    # Total stock value: valuation engine total once the shop's books are built
+    total_stock_value = valuation.shop_value(org) if org else None
+    if total_stock_value is None:
+        total_stock_value = stock_qs.annotate(
+            value=F('quantity') * F('product__buying_price')
+        ).aggregate(total=Sum('value'))['total'] or Decimal('0')
     
     # Due amounts
     customer_due = sales_qs.filter(payment_status__in=['unpaid', 'partial']).aggregate(
@@ -169,11 +174,9 @@ def user_add(request):
     org = get_user_org(request.user)
     
     # Check user limit for organization
-    if org and org.plan:
-        current_users = User.objects.filter(organization=org).count()
-        if current_users >= org.plan.max_users:
-            messages.error(request, f'আপনার প্ল্যানে সর্বোচ্চ {org.plan.max_users} জন ইউজার যোগ করতে পারবেন। প্ল্যান আপগ্রেড করুন।')
-            return redirect('accounts:user_list')
+    if org and org.plan and not org.can_add_user():
+        messages.error(request, quota.MESSAGES['users'].format(limit=org.plan.max_users))
+        return redirect('accounts:user_list')
     
     if request.method == 'POST':
         username = request.POST.get('username')
@@ -183,17 +186,23 @@ def user_add(request):
         if User.objects.filter(username=username).exists():
             messages.error(request, 'এই ইউজারনেম ইতিমধ্যে আছে!')
         else:
-            user = User.objects.create_user(
-                username=username,
-                password=password,
-                role=role,
-                first_name=request.POST.get('first_name', ''),
-                last_name=request.POST.get('last_name', ''),
-                email=request.POST.get('email', ''),
-                phone=request.POST.get('phone', ''),
-                organization=org,  # Assign to current user's organization
-            )
-            messages.success(request, 'নতুন ইউজার তৈরি হয়েছে!')
+            try:
+                with transaction.atomic():
+                    quota.reserve(org, 'users')
+                    user = User.objects.create_user(
+                        username=username,
+                        password=password,
+                        role=role,
+                        first_name=request.POST.get('first_name', ''),
+                        last_name=request.POST.get('last_name', ''),
+                        email=request.POST.get('email', ''),
+                        phone=request.POST.get('phone', ''),
+                        organization=org,  # Assign to current user's organization
+                    )
+            except quota.QuotaExceeded as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(request, 'নতুন ইউজার তৈরি হয়েছে!')
             return redirect('accounts:user_list')
     
     return render(request, 'accounts/user_form.html')
@@ -1,11 +1,14 @@
 from django.contrib import admin
-from .models import Stock, StockMovement, StockAlert
+from .models import (
+    Stock, StockMovement, StockMovementArchive, StockAlert, StockSnapshot, StockTake, StockTakeLine, StockReservation, CostLayer, ProductValuation, InventoryValuation,
+    Location, LocationStock, StockTransfer, StockTransferItem,
+)
 
 
 @admin.register(Stock)
 class StockAdmin(admin.ModelAdmin):
     list_display = ['product', 'quantity', 'reorder_level', 'is_low_stock', 'last_updated']
-    list_filter = ['last_updated']
+    list_filter = ['is_low', 'last_updated']
     search_fields = ['product__name']
     
     def is_low_stock(self, obj):
@@ -16,13 +19,99 @@ class StockAdmin(admin.ModelAdmin):
 
 @admin.register(StockMovement)
 class StockMovementAdmin(admin.ModelAdmin):
-    list_display = ['product', 'movement_type', 'quantity', 'created_by', 'created_at']
+    list_display = ['product', 'movement_type', 'quantity', 'unit_cost', 'total_cost', 'created_by', 'created_at']
     list_filter = ['movement_type', 'created_at']
     search_fields = ['product__name', 'reference']
-    readonly_fields = ['previous_quantity', 'new_quantity']
+    readonly_fields = ['previous_quantity', 'new_quantity', 'unit_cost', 'total_cost']
+
+
+@admin.register(StockMovementArchive)
+class StockMovementArchiveAdmin(admin.ModelAdmin):
+    list_display = ['product', 'movement_type', 'quantity', 'total_cost', 'created_at', 'archived_at']
+    list_filter = ['movement_type']
+    search_fields = ['reference']
+    raw_id_fields = ['product']
 
 
 @admin.register(StockAlert)
 class StockAlertAdmin(admin.ModelAdmin):
-    list_display = ['stock', 'message', 'is_read', 'created_at']
-    list_filter = ['is_read', 'created_at']
+    list_display = ['stock', 'message', 'is_read', 'is_open', 'created_at', 'resolved_at']
+    list_filter = ['is_read', 'is_open', 'created_at']
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['organization', 'period', 'taken_at', 'product_count', 'total_quantity', 'total_value']
+    list_filter = ['period', 'taken_at']
+    exclude = ['product_ids', 'quantities', 'unit_costs']
+    readonly_fields = ['taken_at', 'product_count', 'total_quantity', 'total_value']
+
+
+@admin.register(CostLayer)
+class CostLayerAdmin(admin.ModelAdmin):
+    list_display = ['product', 'received_at', 'quantity', 'remaining', 'unit_cost']
+    search_fields = ['product__name']
+    raw_id_fields = ['product', 'movement']
+
+
+@admin.register(ProductValuation)
+class ProductValuationAdmin(admin.ModelAdmin):
+    list_display = ['product', 'quantity', 'value', 'average_cost', 'updated_at']
+    search_fields = ['product__name']
+    raw_id_fields = ['product']
+
+
+@admin.register(InventoryValuation)
+class InventoryValuationAdmin(admin.ModelAdmin):
+    list_display = ['organization', 'method', 'quantity', 'value', 'rebuilt_at', 'updated_at']
+
+
+class StockTakeLineInline(admin.TabularInline):
+    model = StockTakeLine
+    extra = 0
+    raw_id_fields = ['product']
+    readonly_fields = ['expected_quantity', 'variance']
+
+
+@admin.register(StockTake)
+class StockTakeAdmin(admin.ModelAdmin):
+    list_display = ['reference', 'organization', 'status', 'created_by', 'created_at', 'posted_at']
+    list_filter = ['status', 'created_at']
+    inlines = [StockTakeLineInline]
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ['cart', 'product', 'quantity', 'expires_at', 'created_by']
+    search_fields = ['cart', 'product__name']
+    raw_id_fields = ['product']
+
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ['name', 'organization', 'is_main', 'is_active', 'created_at']
+    list_filter = ['is_main', 'is_active']
+    search_fields = ['name']
+
+
+@admin.register(LocationStock)
+class LocationStockAdmin(admin.ModelAdmin):
+    list_display = ['product', 'location', 'quantity', 'last_updated']
+    list_filter = ['location']
+    search_fields = ['product__name']
+    raw_id_fields = ['product']
+    # Changed only through transfers so Stock.branch_quantity stays in step
+    readonly_fields = ['quantity']
+
+
+class StockTransferItemInline(admin.TabularInline):
+    model = StockTransferItem
+    extra = 0
+    raw_id_fields = ['product']
+
+
+@admin.register(StockTransfer)
+class StockTransferAdmin(admin.ModelAdmin):
+    list_display = ['reference', 'from_location', 'to_location', 'status', 'created_by', 'created_at', 'completed_at']
+    list_filter = ['status', 'created_at']
+    inlines = [StockTransferItemInline]
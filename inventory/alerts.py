@@ -0,0 +1,49 @@
+"""
+লো স্টক অ্যালার্ট ইঞ্জিন
+Stock rows carry an is_low flag. After any stock mutation, refresh() compares
+the stored flag with quantity <= reorder_level for just the touched rows: a
+downward crossing flips the flag and opens one alert, recovering above the
+reorder level closes it.
+"""
+from django.utils import timezone
+
+from .models import Stock, StockAlert
+
+
+def alert_message(product_name, quantity, reorder_level):
+    return f"{product_name} স্টক কম: {quantity:g} (পুনঃঅর্ডার লেভেল {reorder_level:g})"
+
+
+def refresh(stock_ids):
+    """Re-evaluate low-stock flags for the given Stock ids; returns (opened, closed) counts"""
+    stock_ids = list(stock_ids)
+    if not stock_ids:
+        return 0, 0
+
+    rows = Stock.objects.filter(pk__in=stock_ids).values_list(
+        'pk', 'organization_id', 'product_id', 'product__name', 'quantity', 'reorder_level', 'is_low',
+    )
+
+    became_low, recovered = [], []
+    for pk, org_id, product_id, name, quantity, reorder_level, is_low in rows:
+        now_low = quantity <= reorder_level
+        if now_low and not is_low:
+            became_low.append(StockAlert(
+                organization_id=org_id,
+                stock_id=pk,
+                product_id=product_id,
+                message=alert_message(name, quantity, reorder_level)[:255],
+            ))
+        elif is_low and not now_low:
+            recovered.append(pk)
+
+    if became_low:
+        Stock.objects.filter(pk__in=[alert.stock_id for alert in became_low]).update(is_low=True)
+        # The partial unique constraint keeps a single open alert per stock
+        StockAlert.objects.bulk_create(became_low, ignore_conflicts=True)
+    if recovered:
+        Stock.objects.filter(pk__in=recovered).update(is_low=False)
+        StockAlert.objects.filter(stock_id__in=recovered, is_open=True).update(
+            is_open=False, resolved_at=timezone.now()
+        )
+    return len(became_low), len(recovered)
@@ -0,0 +1,54 @@
+"""
+স্টক মুভমেন্ট আর্কাইভ
+Movements older than the retention window are copied to StockMovementArchive
+and deleted from StockMovement in id-ordered batches, one transaction per
+batch, so the live table and its (organization, created_at) index only hold
+recent history. Code that needs the full history (stock ledger, valuation
+rebuild, long-range exports) checks archive_horizon() and reads both tables.
+"""
+from django.db import transaction
+from django.db.models import Max
+
+from .models import StockMovement, StockMovementArchive
+
+ARCHIVE_BATCH_SIZE = 5000
+
+FIELDS = [
+    'id', 'organization_id', 'product_id', 'location_id', 'movement_type', 'quantity', 'previous_quantity',
+    'new_quantity', 'reference', 'notes', 'unit_cost', 'total_cost', 'created_by_id', 'created_at',
+]
+
+
+def archive_before(cutoff, organization=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """cutoff-এর আগের মুভমেন্ট আর্কাইভে সরান; returns the number moved"""
+    movements = StockMovement.objects.filter(created_at__lt=cutoff)
+    if organization is not None:
+        movements = movements.filter(organization=organization)
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(movements.order_by('pk').values(*FIELDS)[:batch_size])
+            if not rows:
+                return moved
+            # ignore_conflicts makes a re-run after an interrupted batch harmless
+            StockMovementArchive.objects.bulk_create(
+                [StockMovementArchive(**row) for row in rows], ignore_conflicts=True
+            )
+            StockMovement.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+
+
+def archive_horizon(organization):
+    """Newest archived movement time for the shop, or None if nothing is archived"""
+    return StockMovementArchive.objects.filter(organization=organization).aggregate(
+        latest=Max('created_at')
+    )['latest']
+
+
+def sources(organization, start=None):
+    """Movement models holding the shop's history from `start` (None = all history)"""
+    horizon = archive_horizon(organization)
+    if horizon is not None and (start is None or start <= horizon):
+        return [StockMovementArchive, StockMovement]
+    return [StockMovement]
@@ -0,0 +1,131 @@
+"""
+চাহিদা পূর্বাভাস ও রিঅর্ডার পয়েন্ট
+Daily 'out' movements for every product of a shop are pulled in one aggregate
+query into a products x days NumPy matrix. Moving averages, weekday and yearly
+seasonality, variability and lead-time demand are computed column-wise for all
+products at once, and the suggested reorder levels are written back in bulk.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from statistics import NormalDist
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Stock, StockMovement
+from . import alerts
+
+HISTORY_DAYS = 730
+AVERAGE_WINDOW = 28
+VARIABILITY_WINDOW = 90
+LEAD_TIME_DAYS = 7
+SERVICE_LEVEL = 0.95
+
+
+def load_daily_demand(organization, days=HISTORY_DAYS, today=None):
+    """Return (product_ids, matrix[products, days], first_day) of sold quantities"""
+    today = today or timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+
+    rows = (
+        StockMovement.objects.filter(
+            # Through the product: older sale movements were saved without an organization
+            product__organization=organization,
+            movement_type='out',
+            created_at__date__gte=first_day,
+            created_at__date__lte=today,
+        )
+        .annotate(day=TruncDate('created_at'))
+        .values('product_id', 'day')
+        .annotate(total=Sum('quantity'))
+        .values_list('product_id', 'day', 'total')
+    )
+
+    product_col, day_col, qty_col = [], [], []
+    for product_id, day, total in rows.iterator(chunk_size=10000):
+        product_col.append(product_id)
+        day_col.append(day)
+        qty_col.append(float(total))
+
+    if not product_col:
+        return np.array([], dtype=np.int64), np.zeros((0, days), dtype=np.float32), first_day
+
+    product_ids, row_index = np.unique(np.array(product_col, dtype=np.int64), return_inverse=True)
+    day_index = (np.array(day_col, dtype='datetime64[D]') - np.datetime64(first_day, 'D')).astype(np.int64)
+
+    matrix = np.zeros((len(product_ids), days), dtype=np.float32)
+    np.add.at(matrix, (row_index, day_index), np.array(qty_col, dtype=np.float32))
+    return product_ids, matrix, first_day
+
+
+def reorder_points(matrix, first_day, lead_time=LEAD_TIME_DAYS, service_level=SERVICE_LEVEL,
+                   window=AVERAGE_WINDOW):
+    """Vectorized reorder point for every row of the demand matrix"""
+    n_products, days = matrix.shape
+    if n_products == 0:
+        return np.zeros(0)
+
+    # Level: recent moving average
+    recent = matrix[:, -window:].mean(axis=1)
+
+    # Weekday seasonality: mean per weekday relative to overall mean
+    weekdays = (np.arange(days) + first_day.weekday()) % 7
+    overall = matrix.mean(axis=1)
+    safe_overall = np.where(overall > 0, overall, 1.0)
+    weekday_factor = np.ones((n_products, 7), dtype=np.float32)
+    for weekday in range(7):
+        columns = weekdays == weekday
+        if columns.any():
+            weekday_factor[:, weekday] = np.where(
+                overall > 0, matrix[:, columns].mean(axis=1) / safe_overall, 1.0
+            )
+
+    # Yearly seasonality: same lead-time window one year ago vs that year's average
+    yearly_factor = np.ones(n_products, dtype=np.float32)
+    if days >= 365 + lead_time:
+        last_year = matrix[:, -365:]
+        last_year_mean = last_year.mean(axis=1)
+        window_last_year = matrix[:, days - 365:days - 365 + lead_time].mean(axis=1)
+        yearly_factor = np.where(last_year_mean > 0, window_last_year / np.where(last_year_mean > 0, last_year_mean, 1.0), 1.0)
+        # Damp noisy single-year signals
+        yearly_factor = np.clip(yearly_factor, 0.5, 2.0)
+
+    # Expected demand over the coming lead time, by the weekdays it spans
+    last_weekday = weekdays[-1]
+    upcoming = (last_weekday + 1 + np.arange(lead_time)) % 7
+    lead_demand = recent * weekday_factor[:, upcoming].sum(axis=1) * yearly_factor
+
+    # Safety stock from recent daily variability
+    sigma = matrix[:, -VARIABILITY_WINDOW:].std(axis=1)
+    z = NormalDist().inv_cdf(service_level)
+    safety = z * sigma * np.sqrt(lead_time)
+
+    return np.ceil(np.maximum(lead_demand + safety, 0))
+
+
+def update_reorder_levels(organization, days=HISTORY_DAYS, lead_time=LEAD_TIME_DAYS,
+                          service_level=SERVICE_LEVEL, dry_run=False):
+    """দোকানের সব পণ্যের রিঅর্ডার লেভেল হালনাগাদ; products with no sales keep their level"""
+    product_ids, matrix, first_day = load_daily_demand(organization, days)
+    points = reorder_points(matrix, first_day, lead_time, service_level)
+    suggested = {int(pid): Decimal(int(point)) for pid, point in zip(product_ids, points)}
+    if dry_run or not suggested:
+        return suggested
+
+    stocks = list(Stock.objects.filter(product__organization=organization, product_id__in=suggested.keys()).only(
+        'pk', 'product_id', 'reorder_level'
+    ))
+    changed = []
+    for stock in stocks:
+        level = suggested[stock.product_id]
+        if stock.reorder_level != level:
+            stock.reorder_level = level
+            changed.append(stock)
+
+    with transaction.atomic():
+        Stock.objects.bulk_update(changed, ['reorder_level'], batch_size=5000)
+        alerts.refresh([stock.pk for stock in changed])
+    return suggested
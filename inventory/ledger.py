@@ -0,0 +1,206 @@
+"""
+স্টক লেজার ও পয়েন্ট-ইন-টাইম স্টক
+Snapshots store a shop's whole stock as three packed int64 columns
+(product id, quantity and unit cost in hundredths). The stock at any instant
+is rebuilt from the nearest base - a snapshot on either side, or the live
+Stock table as "now" - by adding or subtracting just the movements between
+the two instants, aggregated per product in one query (transfers between
+locations do not change the shop's stock and are left out). Unit costs are the
+inventory.valuation average where a product has one, else its buying price.
+
+An instant covers movements created strictly before it; a date means the end
+of that local day.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from products.models import Product
+from . import archive
+from .models import Stock, StockSnapshot
+
+SCALE = 100  # two decimal places
+DTYPE = np.dtype('<i8')
+
+
+def _pack(values):
+    return np.ascontiguousarray(values, dtype=DTYPE).tobytes()
+
+
+def _unpack(data):
+    return np.frombuffer(bytes(data), dtype=DTYPE)
+
+
+def _scaled(values):
+    """Decimals -> int64 hundredths without going through float"""
+    return np.fromiter((int(value * SCALE) for value in values), dtype=DTYPE)
+
+
+def end_of_day(date):
+    """তারিখের দিনশেষ (পরের দিনের শুরু, স্থানীয় সময়)"""
+    return timezone.make_aware(datetime.combine(date + timedelta(days=1), time.min))
+
+
+class StockPosition:
+    """নির্দিষ্ট সময়ের স্টক; arrays are sorted by product id"""
+
+    def __init__(self, as_of, product_ids, quantities, unit_costs, base=None):
+        self.as_of = as_of
+        self.product_ids = product_ids
+        self.quantities = quantities
+        self.unit_costs = unit_costs
+        self.base = base  # StockSnapshot used, or None for the live stock table
+
+    @property
+    def values(self):
+        # hundredths x hundredths -> hundredths
+        return self.quantities * self.unit_costs // SCALE
+
+    @property
+    def total_quantity(self):
+        return Decimal(int(self.quantities.sum())) / SCALE
+
+    @property
+    def total_value(self):
+        return Decimal(int(self.values.sum())) / SCALE
+
+    def rows(self):
+        """(product_id, quantity, unit_cost, value) as Decimals"""
+        for product_id, quantity, cost, value in zip(
+            self.product_ids.tolist(), self.quantities.tolist(), self.unit_costs.tolist(), self.values.tolist()
+        ):
+            yield product_id, Decimal(quantity) / SCALE, Decimal(cost) / SCALE, Decimal(value) / SCALE
+
+
+def live_position(organization):
+    """বর্তমান স্টক (Stock টেবিল থেকে)"""
+    as_of = timezone.now()
+    rows = list(Stock.objects.filter(organization=organization).order_by('product_id').values_list(
+        'product_id', 'quantity', 'product__buying_price', 'product__valuation__quantity', 'product__valuation__value',
+    ))
+    product_ids, quantities, costs = (), (), ()
+    if rows:
+        product_ids, quantities, costs = zip(*(
+            (product_id, quantity, value / valued if valued else buying_price)
+            for product_id, quantity, buying_price, valued, value in rows
+        ))
+    return StockPosition(
+        as_of,
+        np.array(product_ids, dtype=DTYPE),
+        _scaled(quantities),
+        _scaled(costs),
+    )
+
+
+@transaction.atomic
+def take_snapshot(organization, period='daily'):
+    """দোকানের স্টক স্ন্যাপশট নিন"""
+    position = live_position(organization)
+    return StockSnapshot.objects.create(
+        organization=organization,
+        period=period,
+        taken_at=position.as_of,
+        product_count=len(position.product_ids),
+        total_quantity=position.total_quantity,
+        total_value=position.total_value,
+        product_ids=_pack(position.product_ids),
+        quantities=_pack(position.quantities),
+        unit_costs=_pack(position.unit_costs),
+    )
+
+
+def snapshot_position(snapshot):
+    return StockPosition(
+        snapshot.taken_at,
+        _unpack(snapshot.product_ids),
+        _unpack(snapshot.quantities),
+        _unpack(snapshot.unit_costs),
+        base=snapshot,
+    )
+
+
+def nearest_snapshot(organization, when):
+    """Closest snapshot on either side of `when`, or None"""
+    snapshots = StockSnapshot.objects.filter(organization=organization)
+    before = snapshots.filter(taken_at__lte=when).order_by('-taken_at').only('pk', 'taken_at').first()
+    after = snapshots.filter(taken_at__gt=when).order_by('taken_at').only('pk', 'taken_at').first()
+    candidates = [s for s in (before, after) if s is not None]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda s: abs(s.taken_at - when))
+
+
+def movement_deltas(organization, start, end):
+    """Net quantity change per product for movements in [start, end)"""
+    totals = defaultdict(Decimal)
+    for model in archive.sources(organization, start):
+        rows = (
+            model.objects.filter(organization=organization, created_at__gte=start, created_at__lt=end)
+            .exclude(movement_type='transfer')
+            .values('product_id')
+            .annotate(change=Sum(F('new_quantity') - F('previous_quantity')))
+            .order_by()
+            .values_list('product_id', 'change')
+        )
+        for product_id, change in rows:
+            totals[product_id] += change
+    product_ids, changes = zip(*sorted(totals.items())) if totals else ((), ())
+    return np.array(product_ids, dtype=DTYPE), _scaled(changes)
+
+
+def _apply(position, when, delta_ids, deltas, sign):
+    product_ids = np.union1d(position.product_ids, delta_ids)
+    quantities = np.zeros(len(product_ids), dtype=DTYPE)
+    unit_costs = np.zeros(len(product_ids), dtype=DTYPE)
+
+    at = np.searchsorted(product_ids, position.product_ids)
+    quantities[at] = position.quantities
+    unit_costs[at] = position.unit_costs
+    np.add.at(quantities, np.searchsorted(product_ids, delta_ids), sign * deltas)
+
+    # Products created after the base have no cost yet: use their buying price
+    missing = np.setdiff1d(delta_ids, position.product_ids, assume_unique=True)
+    if len(missing):
+        costs = dict(Product.objects.filter(pk__in=missing.tolist()).values_list('pk', 'buying_price'))
+        unit_costs[np.searchsorted(product_ids, missing)] = _scaled(
+            costs.get(pk, Decimal('0')) for pk in missing.tolist()
+        )
+
+    return StockPosition(when, product_ids, quantities, unit_costs, base=position.base)
+
+
+def stock_at(organization, when):
+    """নির্দিষ্ট সময়ের স্টক: nearest base plus/minus the movements in between"""
+    now = timezone.now()
+    when = min(when, now)
+    snapshot = nearest_snapshot(organization, when)
+
+    if snapshot is not None and abs(snapshot.taken_at - when) <= now - when:
+        position = snapshot_position(StockSnapshot.objects.get(pk=snapshot.pk))
+    else:
+        position = live_position(organization)
+
+    if position.as_of <= when:
+        delta_ids, deltas = movement_deltas(organization, position.as_of, when)
+        return _apply(position, when, delta_ids, deltas, 1)
+    delta_ids, deltas = movement_deltas(organization, when, position.as_of)
+    return _apply(position, when, delta_ids, deltas, -1)
+
+
+def stock_on(organization, date):
+    """তারিখের দিনশেষে স্টক (যেমন বছর শেষের ক্লোজিং স্টক)"""
+    return stock_at(organization, end_of_day(date))
+
+
+def prune_snapshots(organization, keep_daily_days):
+    """Delete daily snapshots older than keep_daily_days; monthly ones are kept"""
+    cutoff = timezone.now() - timedelta(days=keep_daily_days)
+    deleted, _ = StockSnapshot.objects.filter(
+        organization=organization, period='daily', taken_at__lt=cutoff
+    ).delete()
+    return deleted
@@ -0,0 +1,151 @@
+"""
+একাধিক লোকেশনের স্টক (শাখা / গুদাম)
+Stock stays the shop-wide total of every product - sales, receipts,
+adjustments and stock takes keep updating it as before - and the main store
+holds whatever is not at a branch. Branch stock lives in LocationStock, one
+row per (location, product), and Stock.branch_quantity is kept equal to the
+sum of a product's branch rows, so each figure is one row read through a
+unique index and never a SUM at request time:
+
+    all locations   Stock.quantity
+    main store      Stock.quantity - Stock.branch_quantity
+    a branch        LocationStock(location, product)
+
+Transfers move stock between two locations in one transaction and write a
+pair of 'transfer' movements whose previous/new quantities are the
+location's. The pair nets to zero, so the stock ledger is unchanged and the
+valuation engine skips them. Writers lock the Stock rows first and the branch
+rows second, so concurrent transfers and branch sales queue per product.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from stationery_shop.db import bulk_update_columns
+from .models import Location, LocationStock, Stock, StockMovement, StockTransfer
+
+ZERO = Decimal('0')
+
+
+class TransferError(Exception):
+    pass
+
+
+def main_location(organization):
+    """দোকানের প্রধান লোকেশন (প্রথমবার তৈরি হয়)"""
+    location, _ = Location.objects.get_or_create(
+        organization=organization, is_main=True, defaults={'name': 'প্রধান দোকান'}
+    )
+    return location
+
+
+def is_branch(location):
+    return location is not None and not location.is_main
+
+
+def quantities_at(location, product_ids, lock=False):
+    """{product_id: quantity} at one location (None = the main store)"""
+    product_ids = list(product_ids)
+    if is_branch(location):
+        rows = LocationStock.objects.filter(location=location, product_id__in=product_ids)
+        if lock:
+            rows = rows.select_for_update()
+        found = dict(rows.values_list('product_id', 'quantity'))
+    else:
+        stocks = Stock.objects.filter(product_id__in=product_ids)
+        if lock:
+            stocks = stocks.select_for_update()
+        found = {
+            product_id: quantity - branch_quantity
+            for product_id, quantity, branch_quantity in stocks.values_list('product_id', 'quantity', 'branch_quantity')
+        }
+    return {pk: found.get(pk, ZERO) for pk in product_ids}
+
+
+def _shift_branch(location, changes):
+    """Add {product_id: delta} to a branch's rows and to Stock.branch_quantity"""
+    stocks = list(Stock.objects.select_for_update().filter(product_id__in=changes).order_by('pk'))
+    rows = {
+        row.product_id: row
+        for row in LocationStock.objects.select_for_update().filter(location=location, product_id__in=changes)
+    }
+    now = timezone.now()
+    new_rows = []
+    for product_id, delta in changes.items():
+        row = rows.get(product_id)
+        if row is None:
+            row = LocationStock(organization_id=location.organization_id, location=location, product_id=product_id)
+            new_rows.append(row)
+        row.quantity += delta
+        row.last_updated = now
+    for stock in stocks:
+        stock.branch_quantity += changes[stock.product_id]
+
+    LocationStock.objects.bulk_create(new_rows, batch_size=1000)
+    bulk_update_columns(LocationStock, list(rows.values()), ['quantity', 'last_updated'])
+    bulk_update_columns(Stock, stocks, ['branch_quantity'])
+
+
+@transaction.atomic
+def issue_at(location, quantities):
+    """শাখা থেকে বিক্রি: the caller has already taken `quantities` off Stock.quantity"""
+    if is_branch(location) and quantities:
+        _shift_branch(location, {pk: -quantity for pk, quantity in quantities.items()})
+
+
+@transaction.atomic
+def complete_transfer(transfer, user):
+    """স্থানান্তর সম্পন্ন: stock leaves one location and arrives at the other together"""
+    transfer = StockTransfer.objects.select_for_update().select_related('from_location', 'to_location').get(
+        pk=transfer.pk
+    )
+    if transfer.status != 'draft':
+        raise TransferError('এই স্থানান্তর আগেই সম্পন্ন/বাতিল হয়েছে')
+    source, destination = transfer.from_location, transfer.to_location
+
+    quantities = defaultdict(Decimal)
+    for product_id, quantity in transfer.items.values_list('product_id', 'quantity'):
+        quantities[product_id] += quantity
+    if not quantities:
+        raise TransferError('স্থানান্তরে কোনো পণ্য নেই')
+
+    # Lock in the same order as _shift_branch: Stock rows, then branch rows
+    list(Stock.objects.select_for_update().filter(product_id__in=quantities).order_by('pk').values_list('pk'))
+    at_source = quantities_at(source, quantities, lock=True)
+    at_destination = quantities_at(destination, quantities, lock=True)
+    short = [pk for pk, quantity in quantities.items() if quantity > at_source[pk]]
+    if short:
+        raise TransferError(f'{source}-এ পর্যাপ্ত স্টক নেই ({len(short)}টি পণ্য)')
+
+    if is_branch(source):
+        _shift_branch(source, {pk: -quantity for pk, quantity in quantities.items()})
+    if is_branch(destination):
+        _shift_branch(destination, dict(quantities))
+
+    movements = []
+    for product_id, quantity in quantities.items():
+        for location, before, change in (
+            (source, at_source[product_id], -quantity),
+            (destination, at_destination[product_id], quantity),
+        ):
+            movements.append(StockMovement(
+                organization_id=transfer.organization_id,
+                product_id=product_id,
+                location=location,
+                movement_type='transfer',
+                quantity=quantity,
+                previous_quantity=before,
+                new_quantity=before + change,
+                reference=transfer.reference,
+                notes=f'স্থানান্তর: {source} → {destination}',
+                created_by=user,
+            ))
+    # bulk_create skips the costing signal on purpose: the pair moves no value
+    StockMovement.objects.bulk_create(movements, batch_size=1000)
+
+    transfer.status = 'completed'
+    transfer.completed_at = timezone.now()
+    transfer.save()
+    return len(quantities)
@@ -0,0 +1,30 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory import archive, forecasting
+from tenants.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Move old stock movements to the archive table in batches (schedule monthly, e.g. via cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', help='Organization slug (default: all shops)')
+        # Demand forecasting reads this much live history
+        parser.add_argument('--keep-days', type=int, default=forecasting.HISTORY_DAYS,
+                            help='Keep movements newer than this many days in the live table')
+        parser.add_argument('--batch-size', type=int, default=archive.ARCHIVE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['keep_days'])
+        organization = None
+        if options['org']:
+            organization = Organization.objects.get(slug=options['org'])
+
+        start = time.perf_counter()
+        moved = archive.archive_before(cutoff, organization, batch_size=options['batch_size'])
+        self.stdout.write(f'{moved} movements before {cutoff:%Y-%m-%d} archived in {time.perf_counter() - start:.2f}s')
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import forecasting
+from tenants.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Recompute reorder levels from sales history (schedule nightly, e.g. via cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', help='Organization slug (default: all active shops)')
+        parser.add_argument('--days', type=int, default=forecasting.HISTORY_DAYS, help='Days of history')
+        parser.add_argument('--lead-time', type=int, default=forecasting.LEAD_TIME_DAYS, help='Supplier lead time in days')
+        parser.add_argument('--service-level', type=float, default=forecasting.SERVICE_LEVEL)
+        parser.add_argument('--dry-run', action='store_true', help='Compute without saving')
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.filter(is_active=True)
+        if options['org']:
+            organizations = organizations.filter(slug=options['org'])
+
+        for org in organizations:
+            start = time.perf_counter()
+            suggested = forecasting.update_reorder_levels(
+                org,
+                days=options['days'],
+                lead_time=options['lead_time'],
+                service_level=options['service_level'],
+                dry_run=options['dry_run'],
+            )
+            self.stdout.write(f'{org.slug}: {len(suggested)} products in {time.perf_counter() - start:.2f}s')
+
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import valuation
+from tenants.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Rebuild stock valuation from each shop's full movement history (also applies a changed method)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', help='Organization slug (default: all active shops)')
+        parser.add_argument('--method', choices=['average', 'fifo'],
+                            help="Override the shop's valuation method for this run")
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.filter(is_active=True)
+        if options['org']:
+            organizations = organizations.filter(slug=options['org'])
+
+        for org in organizations:
+            start = time.perf_counter()
+            result = valuation.rebuild(org, method=options['method'])
+            self.stdout.write(
+                f'{org.slug}: {result.method}, {result.quantity} units = ৳{result.value:.2f} '
+                f'in {time.perf_counter() - start:.2f}s'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import reservations
+
+
+class Command(BaseCommand):
+    help = 'Delete expired POS cart reservations (schedule every few minutes, e.g. via cron)'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        removed = reservations.sweep()
+        self.stdout.write(f'{removed} expired reservations removed in {time.perf_counter() - start:.2f}s')
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import ledger
+from tenants.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Store a stock snapshot per shop (schedule daily, and monthly on the 1st, e.g. via cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', help='Organization slug (default: all active shops)')
+        parser.add_argument('--period', choices=['daily', 'monthly'], default='daily')
+        parser.add_argument('--keep-daily', type=int, default=90,
+                            help='Delete daily snapshots older than this many days (0 keeps all)')
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.filter(is_active=True)
+        if options['org']:
+            organizations = organizations.filter(slug=options['org'])
+
+        for org in organizations:
+            start = time.perf_counter()
+            snapshot = ledger.take_snapshot(org, period=options['period'])
+            pruned = ledger.prune_snapshots(org, options['keep_daily']) if options['keep_daily'] else 0
+            self.stdout.write(
+                f'{org.slug}: {snapshot.product_count} products, ৳{snapshot.total_value} '
+                f'({pruned} old snapshots removed) in {time.perf_counter() - start:.2f}s'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Done!'))
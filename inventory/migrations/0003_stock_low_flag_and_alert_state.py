@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+def backfill_low_flags(apps, schema_editor):
+    """Flag rows already at/below reorder level; earlier alerts become history"""
+    Stock = apps.get_model('inventory', 'Stock')
+    StockAlert = apps.get_model('inventory', 'StockAlert')
+    Stock.objects.filter(quantity__lte=models.F('reorder_level')).update(is_low=True)
+    StockAlert.objects.update(is_open=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_stock_organization_stockalert_organization_and_more'),
+        ('products', '0003_sku_counter'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stock',
+            name='is_low',
+            field=models.BooleanField(default=False, editable=False, verbose_name='লো স্টক'),
+        ),
+        migrations.AddField(
+            model_name='stockalert',
+            name='is_open',
+            field=models.BooleanField(default=True, verbose_name='চলমান'),
+        ),
+        migrations.AddField(
+            model_name='stockalert',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='সমাধান হয়েছে'),
+        ),
+        migrations.RunPython(backfill_low_flags, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(condition=models.Q(('is_low', True)), fields=['organization'], name='stock_low_by_org_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='stockalert',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_open', True)), fields=('stock',), name='unique_open_alert_per_stock'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_movement_organization(apps, schema_editor):
+    """Movements written by sales and manual adjustments had no organization"""
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    Product = apps.get_model('products', 'Product')
+    StockMovement.objects.filter(organization__isnull=True).update(
+        organization=models.Subquery(
+            Product.objects.filter(pk=models.OuterRef('product_id')).values('organization')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_stock_low_flag_and_alert_state'),
+        ('products', '0003_sku_counter'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('daily', 'দৈনিক'), ('monthly', 'মাসিক')], default='daily', max_length=10, verbose_name='ধরন')),
+                ('taken_at', models.DateTimeField(verbose_name='সময়')),
+                ('product_count', models.PositiveIntegerField(default=0, verbose_name='পণ্য সংখ্যা')),
+                ('total_quantity', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='মোট পরিমাণ')),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='মোট মূল্য')),
+                ('product_ids', models.BinaryField()),
+                ('quantities', models.BinaryField()),
+                ('unit_costs', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='tenants.organization')),
+            ],
+            options={
+                'verbose_name': 'স্টক স্ন্যাপশট',
+                'verbose_name_plural': 'স্টক স্ন্যাপশট সমূহ',
+                'ordering': ['-taken_at'],
+                'indexes': [models.Index(fields=['organization', 'taken_at'], name='stock_snapshot_org_time_idx')],
+            },
+        ),
+        migrations.RunPython(fill_movement_organization, migrations.RunPython.noop),
+    ]
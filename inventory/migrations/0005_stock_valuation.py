@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_stock_snapshots'),
+        ('products', '0003_sku_counter'),
+        ('tenants', '0002_organization_valuation_method'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockmovement',
+            name='total_cost',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=16, null=True, verbose_name='মোট খরচ'),
+        ),
+        migrations.AddField(
+            model_name='stockmovement',
+            name='unit_cost',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=14, null=True, verbose_name='একক খরচ'),
+        ),
+        migrations.CreateModel(
+            name='InventoryValuation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10, verbose_name='পদ্ধতি')),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='মোট পরিমাণ')),
+                ('value', models.DecimalField(decimal_places=4, default=0, max_digits=18, verbose_name='মোট মূল্য')),
+                ('rebuilt_at', models.DateTimeField(verbose_name='পুনর্গঠনের সময়')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_valuation', to='tenants.organization')),
+            ],
+            options={
+                'verbose_name': 'স্টক মূল্যায়ন',
+                'verbose_name_plural': 'স্টক মূল্যায়ন সমূহ',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductValuation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='পরিমাণ')),
+                ('value', models.DecimalField(decimal_places=4, default=0, max_digits=16, verbose_name='মূল্য')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='product_valuations', to='tenants.organization')),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='valuation', to='products.product', verbose_name='পণ্য')),
+            ],
+            options={
+                'verbose_name': 'পণ্য মূল্যায়ন',
+                'verbose_name_plural': 'পণ্য মূল্যায়ন সমূহ',
+            },
+        ),
+        migrations.CreateModel(
+            name='CostLayer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('received_at', models.DateTimeField(verbose_name='প্রাপ্তির সময়')),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='পরিমাণ')),
+                ('remaining', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='অবশিষ্ট')),
+                ('unit_cost', models.DecimalField(decimal_places=4, max_digits=14, verbose_name='একক খরচ')),
+                ('movement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cost_layers', to='inventory.stockmovement', verbose_name='মুভমেন্ট')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cost_layers', to='tenants.organization')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_layers', to='products.product', verbose_name='পণ্য')),
+            ],
+            options={
+                'verbose_name': 'কস্ট লেয়ার',
+                'verbose_name_plural': 'কস্ট লেয়ার সমূহ',
+                'ordering': ['received_at', 'id'],
+                'indexes': [models.Index(fields=['product', 'received_at', 'id'], name='cost_layer_open_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_stock_valuation'),
+        ('products', '0003_sku_counter'),
+        ('tenants', '0002_organization_valuation_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovementArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('movement_type', models.CharField(choices=[('in', 'স্টক ইন'), ('out', 'স্টক আউট'), ('adjustment', 'সমন্বয়'), ('return', 'রিটার্ন')], max_length=20, verbose_name='মুভমেন্ট টাইপ')),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='পরিমাণ')),
+                ('previous_quantity', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='আগের পরিমাণ')),
+                ('new_quantity', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='নতুন পরিমাণ')),
+                ('reference', models.CharField(blank=True, max_length=100, verbose_name='রেফারেন্স')),
+                ('notes', models.TextField(blank=True, verbose_name='নোট')),
+                ('unit_cost', models.DecimalField(blank=True, decimal_places=4, max_digits=14, null=True, verbose_name='একক খরচ')),
+                ('total_cost', models.DecimalField(blank=True, decimal_places=4, max_digits=16, null=True, verbose_name='মোট খরচ')),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'আর্কাইভ মুভমেন্ট',
+                'verbose_name_plural': 'আর্কাইভ মুভমেন্ট সমূহ',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['organization', '-created_at'], name='movement_org_recent_idx'),
+        ),
+        migrations.AddField(
+            model_name='stockmovementarchive',
+            name='created_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='তৈরি করেছেন'),
+        ),
+        migrations.AddField(
+            model_name='stockmovementarchive',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_stock_movements', to='tenants.organization'),
+        ),
+        migrations.AddField(
+            model_name='stockmovementarchive',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_movements', to='products.product', verbose_name='পণ্য'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovementarchive',
+            index=models.Index(fields=['organization', 'created_at'], name='movement_archive_org_time_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_movement_archive'),
+        ('products', '0003_sku_counter'),
+        ('tenants', '0002_organization_valuation_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockTake',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('draft', 'চলমান'), ('posted', 'পোস্ট হয়েছে'), ('cancelled', 'বাতিল')], default='draft', max_length=20, verbose_name='স্ট্যাটাস')),
+                ('notes', models.TextField(blank=True, verbose_name='নোট')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('posted_at', models.DateTimeField(blank=True, null=True, verbose_name='পোস্টের সময়')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_takes', to=settings.AUTH_USER_MODEL, verbose_name='তৈরি করেছেন')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_takes', to='tenants.organization')),
+            ],
+            options={
+                'verbose_name': 'স্টক গণনা',
+                'verbose_name_plural': 'স্টক গণনা সমূহ',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockTakeLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('counted_quantity', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='গণনাকৃত পরিমাণ')),
+                ('expected_quantity', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='সিস্টেমের পরিমাণ')),
+                ('variance', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='পার্থক্য')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='products.product', verbose_name='পণ্য')),
+                ('stock_take', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='inventory.stocktake')),
+            ],
+            options={
+                'verbose_name': 'স্টক গণনা লাইন',
+                'verbose_name_plural': 'স্টক গণনা লাইন সমূহ',
+                'constraints': [models.UniqueConstraint(fields=('stock_take', 'product'), name='unique_product_per_stock_take')],
+            },
+        ),
+    ]
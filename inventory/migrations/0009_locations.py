@@ -0,0 +1,124 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_stock_reservation'),
+        ('products', '0003_sku_counter'),
+        ('tenants', '0002_organization_valuation_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stock',
+            name='branch_quantity',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='শাখাগুলোতে পরিমাণ'),
+        ),
+        migrations.AlterField(
+            model_name='stockmovement',
+            name='movement_type',
+            field=models.CharField(choices=[('in', 'স্টক ইন'), ('out', 'স্টক আউট'), ('adjustment', 'সমন্বয়'), ('return', 'রিটার্ন'), ('transfer', 'স্থানান্তর')], max_length=20, verbose_name='মুভমেন্ট টাইপ'),
+        ),
+        migrations.AlterField(
+            model_name='stockmovementarchive',
+            name='movement_type',
+            field=models.CharField(choices=[('in', 'স্টক ইন'), ('out', 'স্টক আউট'), ('adjustment', 'সমন্বয়'), ('return', 'রিটার্ন'), ('transfer', 'স্থানান্তর')], max_length=20, verbose_name='মুভমেন্ট টাইপ'),
+        ),
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='নাম')),
+                ('address', models.TextField(blank=True, verbose_name='ঠিকানা')),
+                ('is_main', models.BooleanField(default=False, verbose_name='প্রধান দোকান')),
+                ('is_active', models.BooleanField(default=True, verbose_name='সক্রিয়')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='locations', to='tenants.organization')),
+            ],
+            options={
+                'verbose_name': 'লোকেশন',
+                'verbose_name_plural': 'লোকেশন সমূহ',
+                'ordering': ['-is_main', 'name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='stockmovement',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='inventory.location', verbose_name='লোকেশন'),
+        ),
+        migrations.AddField(
+            model_name='stockmovementarchive',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='inventory.location', verbose_name='লোকেশন'),
+        ),
+        migrations.AddField(
+            model_name='stockreservation',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='inventory.location', verbose_name='লোকেশন'),
+        ),
+        migrations.CreateModel(
+            name='LocationStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='পরিমাণ')),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stocks', to='inventory.location', verbose_name='লোকেশন')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='location_stocks', to='tenants.organization')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='location_stocks', to='products.product', verbose_name='পণ্য')),
+            ],
+            options={
+                'verbose_name': 'শাখার স্টক',
+                'verbose_name_plural': 'শাখার স্টক সমূহ',
+            },
+        ),
+        migrations.CreateModel(
+            name='StockTransfer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('draft', 'খসড়া'), ('completed', 'সম্পন্ন'), ('cancelled', 'বাতিল')], default='draft', max_length=20, verbose_name='স্ট্যাটাস')),
+                ('notes', models.TextField(blank=True, verbose_name='নোট')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='সম্পন্নের সময়')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_transfers', to=settings.AUTH_USER_MODEL, verbose_name='তৈরি করেছেন')),
+                ('from_location', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='transfers_out', to='inventory.location', verbose_name='যেখান থেকে')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_transfers', to='tenants.organization')),
+                ('to_location', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='transfers_in', to='inventory.location', verbose_name='যেখানে')),
+            ],
+            options={
+                'verbose_name': 'স্টক স্থানান্তর',
+                'verbose_name_plural': 'স্টক স্থানান্তর সমূহ',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockTransferItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='পরিমাণ')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='products.product', verbose_name='পণ্য')),
+                ('transfer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='inventory.stocktransfer')),
+            ],
+            options={
+                'verbose_name': 'স্থানান্তর আইটেম',
+                'verbose_name_plural': 'স্থানান্তর আইটেম সমূহ',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='location',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_main', True)), fields=('organization',), name='one_main_location_per_org'),
+        ),
+        migrations.AddConstraint(
+            model_name='locationstock',
+            constraint=models.UniqueConstraint(fields=('location', 'product'), name='unique_product_per_location'),
+        ),
+        migrations.AddConstraint(
+            model_name='stocktransferitem',
+            constraint=models.UniqueConstraint(fields=('transfer', 'product'), name='unique_product_per_transfer'),
+        ),
+    ]
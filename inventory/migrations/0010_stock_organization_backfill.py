@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:31
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_stock_organization(apps, schema_editor):
+    """Stock rows from before shops existed belong to their product's shop"""
+    Stock = apps.get_model('inventory', 'Stock')
+    Product = apps.get_model('products', 'Product')
+    Stock.objects.filter(organization__isnull=True).update(
+        organization=Subquery(Product.objects.filter(pk=OuterRef('product')).values('organization')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_locations'),
+        # The backfill reads Product.organization
+        ('products', '0002_category_organization_product_organization'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_stock_organization, migrations.RunPython.noop),
+    ]
@@ -10,24 +10,55 @@ class Stock(models.Model):
         null=True, blank=True, related_name='stocks'
     )
     product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='stock', verbose_name='পণ্য')
+    # Shop-wide total across all locations
     quantity = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='বর্তমান পরিমাণ')
+    # Sum of the product's LocationStock rows, maintained by inventory.locations; the rest is at the main store
+    branch_quantity = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False, verbose_name='শাখাগুলোতে পরিমাণ'
+    )
     reorder_level = models.DecimalField(max_digits=12, decimal_places=2, default=10, verbose_name='পুনঃঅর্ডার লেভেল')
+    # Maintained by inventory.alerts.refresh() so the low-stock list is an index lookup
+    is_low = models.BooleanField(default=False, editable=False, verbose_name='লো স্টক')
     last_updated = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = 'স্টক'
         verbose_name_plural = 'স্টক সমূহ'
+        indexes = [
+            models.Index(fields=['organization'], condition=models.Q(is_low=True), name='stock_low_by_org_idx'),
+        ]
     
     def __str__(self):
         return f"{self.product.name}: {self.quantity} {self.product.unit.short_name if self.product.unit else ''}"
     
+    def save(self, *args, **kwargs):
+        # Low-stock lists and the stock ledger are read per shop
+        if self.organization_id is None and self.product_id is not None:
+            self.organization_id = self.product.organization_id
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # is_low and branch_quantity are owned by inventory.alerts / inventory.locations;
+            # never write them back from a stale instance
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ('is_low', 'branch_quantity')
+            ]
+        super().save(*args, **kwargs)
+    
+    @property
+    def main_quantity(self):
+        """প্রধান দোকানের পরিমাণ"""
+        return self.quantity - self.branch_quantity
+    
     @property
     def is_low_stock(self):
         return self.quantity <= self.reorder_level
     
     @property
     def stock_value(self):
-        """স্টকের মোট মূল্য (ক্রয় মূল্যে)"""
+        """স্টকের মোট মূল্য (মূল্যায়িত খরচে, না থাকলে ক্রয় মূল্যে)"""
+        valuation = getattr(self.product, 'valuation', None)
+        if valuation is not None:
+            return valuation.value
         return self.quantity * self.product.buying_price
     
     @property
@@ -43,6 +74,7 @@ class StockMovement(models.Model):
         ('out', 'স্টক আউট'),
         ('adjustment', 'সমন্বয়'),
         ('return', 'রিটার্ন'),
+        ('transfer', 'স্থানান্তর'),
     ]
     
     organization = models.ForeignKey(
@@ -50,12 +82,20 @@ class StockMovement(models.Model):
         null=True, blank=True, related_name='stock_movements'
     )
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='movements', verbose_name='পণ্য')
+    # Set on transfer movements, whose previous/new quantities are that location's, not the shop total
+    location = models.ForeignKey(
+        'Location', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='movements', verbose_name='লোকেশন'
+    )
     movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPES, verbose_name='মুভমেন্ট টাইপ')
     quantity = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='পরিমাণ')
     previous_quantity = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='আগের পরিমাণ')
     new_quantity = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='নতুন পরিমাণ')
     reference = models.CharField(max_length=100, blank=True, verbose_name='রেফারেন্স')
     notes = models.TextField(blank=True, verbose_name='নোট')
+    # Receipts: cost paid per unit; issues: cost of goods filled in by inventory.valuation
+    unit_cost = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True, verbose_name='একক খরচ')
+    total_cost = models.DecimalField(max_digits=16, decimal_places=4, null=True, blank=True, verbose_name='মোট খরচ')
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, verbose_name='তৈরি করেছেন')
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -63,11 +103,61 @@ class StockMovement(models.Model):
         verbose_name = 'স্টক মুভমেন্ট'
         verbose_name_plural = 'স্টক মুভমেন্ট সমূহ'
         ordering = ['-created_at']
+        indexes = [
+            # Recent movements of one shop; old rows move to StockMovementArchive
+            models.Index(fields=['organization', '-created_at'], name='movement_org_recent_idx'),
+        ]
     
     def __str__(self):
         return f"{self.product.name} - {self.get_movement_type_display()} ({self.quantity})"
+    
+    def save(self, *args, **kwargs):
+        # The stock ledger replays movements per shop, so every row needs its organization
+        if self.organization_id is None and self.product_id is not None:
+            self.organization_id = self.product.organization_id
+        super().save(*args, **kwargs)
+
 
 
+class StockMovementArchive(models.Model):
+    """আর্কাইভ করা স্টক মুভমেন্ট (পুরনো ইতিহাস)"""
+    # Same id as the original StockMovement row
+    id = models.BigIntegerField(primary_key=True)
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='archived_stock_movements'
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='archived_movements', verbose_name='পণ্য')
+    location = models.ForeignKey(
+        'Location', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+', verbose_name='লোকেশন'
+    )
+    movement_type = models.CharField(max_length=20, choices=StockMovement.MOVEMENT_TYPES, verbose_name='মুভমেন্ট টাইপ')
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='পরিমাণ')
+    previous_quantity = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='আগের পরিমাণ')
+    new_quantity = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='নতুন পরিমাণ')
+    reference = models.CharField(max_length=100, blank=True, verbose_name='রেফারেন্স')
+    notes = models.TextField(blank=True, verbose_name='নোট')
+    unit_cost = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True, verbose_name='একক খরচ')
+    total_cost = models.DecimalField(max_digits=16, decimal_places=4, null=True, blank=True, verbose_name='মোট খরচ')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True,
+        related_name='+', verbose_name='তৈরি করেছেন'
+    )
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'আর্কাইভ মুভমেন্ট'
+        verbose_name_plural = 'আর্কাইভ মুভমেন্ট সমূহ'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['organization', 'created_at'], name='movement_archive_org_time_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} - {self.movement_type} ({self.quantity})"
+
 class StockAlert(models.Model):
     """লো স্টক অ্যালার্ট"""
     organization = models.ForeignKey(
@@ -78,12 +168,319 @@ class StockAlert(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, null=True, blank=True, related_name='alerts', verbose_name='পণ্য')
     message = models.CharField(max_length=255, verbose_name='বার্তা')
     is_read = models.BooleanField(default=False, verbose_name='পড়া হয়েছে')
+    is_open = models.BooleanField(default=True, verbose_name='চলমান')
     created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True, verbose_name='সমাধান হয়েছে')
     
     class Meta:
         verbose_name = 'স্টক অ্যালার্ট'
         verbose_name_plural = 'স্টক অ্যালার্ট সমূহ'
         ordering = ['-created_at']
+        constraints = [
+            # At most one open alert per stock row
+            models.UniqueConstraint(fields=['stock'], condition=models.Q(is_open=True), name='unique_open_alert_per_stock'),
+        ]
     
     def __str__(self):
         return f"{self.stock.product.name}: {self.message}"
+
+
+class StockSnapshot(models.Model):
+    """স্টক স্ন্যাপশট (নির্দিষ্ট সময়ের স্টক)"""
+    PERIODS = [
+        ('daily', 'দৈনিক'),
+        ('monthly', 'মাসিক'),
+    ]
+    
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='stock_snapshots'
+    )
+    period = models.CharField(max_length=10, choices=PERIODS, default='daily', verbose_name='ধরন')
+    taken_at = models.DateTimeField(verbose_name='সময়')
+    product_count = models.PositiveIntegerField(default=0, verbose_name='পণ্য সংখ্যা')
+    total_quantity = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name='মোট পরিমাণ')
+    total_value = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name='মোট মূল্য')
+    # Columnar payload: little-endian int64 arrays, see inventory.ledger
+    product_ids = models.BinaryField()
+    quantities = models.BinaryField()
+    unit_costs = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'স্টক স্ন্যাপশট'
+        verbose_name_plural = 'স্টক স্ন্যাপশট সমূহ'
+        ordering = ['-taken_at']
+        indexes = [
+            models.Index(fields=['organization', 'taken_at'], name='stock_snapshot_org_time_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_period_display()} স্ন্যাপশট {self.taken_at:%Y-%m-%d %H:%M}"
+
+
+class CostLayer(models.Model):
+    """FIFO কস্ট লেয়ার (একটি প্রাপ্তির অবশিষ্ট অংশ)"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='cost_layers'
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='cost_layers', verbose_name='পণ্য')
+    movement = models.ForeignKey(
+        StockMovement, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='cost_layers', verbose_name='মুভমেন্ট'
+    )
+    received_at = models.DateTimeField(verbose_name='প্রাপ্তির সময়')
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='পরিমাণ')
+    remaining = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='অবশিষ্ট')
+    unit_cost = models.DecimalField(max_digits=14, decimal_places=4, verbose_name='একক খরচ')
+    
+    class Meta:
+        verbose_name = 'কস্ট লেয়ার'
+        verbose_name_plural = 'কস্ট লেয়ার সমূহ'
+        ordering = ['received_at', 'id']
+        indexes = [
+            models.Index(fields=['product', 'received_at', 'id'], name='cost_layer_open_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id}: {self.remaining} @ {self.unit_cost}"
+
+
+class ProductValuation(models.Model):
+    """পণ্যের বর্তমান স্টক মূল্যায়ন"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='product_valuations'
+    )
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='valuation', verbose_name='পণ্য')
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='পরিমাণ')
+    value = models.DecimalField(max_digits=16, decimal_places=4, default=0, verbose_name='মূল্য')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'পণ্য মূল্যায়ন'
+        verbose_name_plural = 'পণ্য মূল্যায়ন সমূহ'
+    
+    def __str__(self):
+        return f"{self.product_id}: {self.quantity} = ৳{self.value}"
+    
+    @property
+    def average_cost(self):
+        return self.value / self.quantity if self.quantity else None
+
+
+class InventoryValuation(models.Model):
+    """দোকানের মোট স্টক মূল্যায়ন; created by the first costed movement or a rebuild, then kept current"""
+    organization = models.OneToOneField(
+        'tenants.Organization', on_delete=models.CASCADE, related_name='inventory_valuation'
+    )
+    method = models.CharField(max_length=10, verbose_name='পদ্ধতি')
+    quantity = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name='মোট পরিমাণ')
+    value = models.DecimalField(max_digits=18, decimal_places=4, default=0, verbose_name='মোট মূল্য')
+    rebuilt_at = models.DateTimeField(verbose_name='পুনর্গঠনের সময়')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'স্টক মূল্যায়ন'
+        verbose_name_plural = 'স্টক মূল্যায়ন সমূহ'
+    
+    def __str__(self):
+        return f"{self.organization}: ৳{self.value}"
+
+
+class StockTake(models.Model):
+    """স্টক গণনা (ফিজিক্যাল কাউন্ট)"""
+    STATUS_CHOICES = [
+        ('draft', 'চলমান'),
+        ('posted', 'পোস্ট হয়েছে'),
+        ('cancelled', 'বাতিল'),
+    ]
+    
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='stock_takes'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft', verbose_name='স্ট্যাটাস')
+    notes = models.TextField(blank=True, verbose_name='নোট')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True,
+        related_name='stock_takes', verbose_name='তৈরি করেছেন'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    posted_at = models.DateTimeField(null=True, blank=True, verbose_name='পোস্টের সময়')
+    
+    class Meta:
+        verbose_name = 'স্টক গণনা'
+        verbose_name_plural = 'স্টক গণনা সমূহ'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return self.reference
+    
+    @property
+    def reference(self):
+        return f"ST-{self.pk}"
+
+
+class StockTakeLine(models.Model):
+    """স্টক গণনার লাইন"""
+    stock_take = models.ForeignKey(StockTake, on_delete=models.CASCADE, related_name='lines')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name='পণ্য')
+    counted_quantity = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='গণনাকৃত পরিমাণ')
+    # Filled in when the count is posted
+    expected_quantity = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name='সিস্টেমের পরিমাণ')
+    variance = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name='পার্থক্য')
+    
+    class Meta:
+        verbose_name = 'স্টক গণনা লাইন'
+        verbose_name_plural = 'স্টক গণনা লাইন সমূহ'
+        constraints = [
+            models.UniqueConstraint(fields=['stock_take', 'product'], name='unique_product_per_stock_take'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id}: {self.counted_quantity}"
+
+
+class StockReservation(models.Model):
+    """কার্টে রাখা পণ্যের সাময়িক রিজার্ভেশন"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='stock_reservations'
+    )
+    # One POS cart (a terminal's open sale); generated when the POS page loads
+    cart = models.CharField(max_length=32, verbose_name='কার্ট')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations', verbose_name='পণ্য')
+    # Branch the cart sells from; empty for the main store
+    location = models.ForeignKey(
+        'Location', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='reservations', verbose_name='লোকেশন'
+    )
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='পরিমাণ')
+    expires_at = models.DateTimeField(verbose_name='মেয়াদ শেষ')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True,
+        related_name='+', verbose_name='তৈরি করেছেন'
+    )
+    
+    class Meta:
+        verbose_name = 'স্টক রিজার্ভেশন'
+        verbose_name_plural = 'স্টক রিজার্ভেশন সমূহ'
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_product_per_cart'),
+        ]
+        indexes = [
+            # Active reservations per product: product_id = ? AND expires_at > now
+            models.Index(fields=['product', 'expires_at'], name='reservation_product_exp_idx'),
+            models.Index(fields=['expires_at'], name='reservation_expires_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.cart}: {self.product_id} × {self.quantity}"
+
+
+class Location(models.Model):
+    """দোকানের শাখা / গুদাম"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='locations'
+    )
+    name = models.CharField(max_length=100, verbose_name='নাম')
+    address = models.TextField(blank=True, verbose_name='ঠিকানা')
+    # The main store holds whatever stock is not at a branch; it has no LocationStock rows
+    is_main = models.BooleanField(default=False, verbose_name='প্রধান দোকান')
+    is_active = models.BooleanField(default=True, verbose_name='সক্রিয়')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'লোকেশন'
+        verbose_name_plural = 'লোকেশন সমূহ'
+        ordering = ['-is_main', 'name']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization'], condition=models.Q(is_main=True), name='one_main_location_per_org'
+            ),
+        ]
+    
+    def __str__(self):
+        return self.name
+
+
+class LocationStock(models.Model):
+    """শাখার স্টক"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='location_stocks'
+    )
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='stocks', verbose_name='লোকেশন')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='location_stocks', verbose_name='পণ্য')
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='পরিমাণ')
+    last_updated = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'শাখার স্টক'
+        verbose_name_plural = 'শাখার স্টক সমূহ'
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'product'], name='unique_product_per_location'),
+        ]
+    
+    def __str__(self):
+        return f"{self.location_id}: {self.product_id} × {self.quantity}"
+
+
+class StockTransfer(models.Model):
+    """শাখার মধ্যে স্টক স্থানান্তর"""
+    STATUS_CHOICES = [
+        ('draft', 'খসড়া'),
+        ('completed', 'সম্পন্ন'),
+        ('cancelled', 'বাতিল'),
+    ]
+    
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='stock_transfers'
+    )
+    from_location = models.ForeignKey(
+        Location, on_delete=models.PROTECT, related_name='transfers_out', verbose_name='যেখান থেকে'
+    )
+    to_location = models.ForeignKey(
+        Location, on_delete=models.PROTECT, related_name='transfers_in', verbose_name='যেখানে'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft', verbose_name='স্ট্যাটাস')
+    notes = models.TextField(blank=True, verbose_name='নোট')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True,
+        related_name='stock_transfers', verbose_name='তৈরি করেছেন'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True, verbose_name='সম্পন্নের সময়')
+    
+    class Meta:
+        verbose_name = 'স্টক স্থানান্তর'
+        verbose_name_plural = 'স্টক স্থানান্তর সমূহ'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return self.reference
+    
+    @property
+    def reference(self):
+        return f"TR-{self.pk}"
+
+
+class StockTransferItem(models.Model):
+    """স্থানান্তরের আইটেম"""
+    transfer = models.ForeignKey(StockTransfer, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name='পণ্য')
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='পরিমাণ')
+    
+    class Meta:
+        verbose_name = 'স্থানান্তর আইটেম'
+        verbose_name_plural = 'স্থানান্তর আইটেম সমূহ'
+        constraints = [
+            models.UniqueConstraint(fields=['transfer', 'product'], name='unique_product_per_transfer'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} × {self.quantity}"
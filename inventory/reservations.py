@@ -0,0 +1,122 @@
+"""
+POS কার্ট রিজার্ভেশন
+Adding a product to a POS cart holds that quantity for STOCK_RESERVATION_TTL
+seconds; every change to the cart pushes the whole cart's expiry forward.
+Available-to-sell is the stock at the cart's location (see
+inventory.locations) minus the unexpired reservations of other carts there,
+read from the (product, expires_at) index, so expired rows stop counting the
+moment they expire and the sweep only has to delete them later.
+
+Reserving never locks the Stock row. A reservation is written and committed
+first and then checked against the stock; if the shop is now over-promised
+the reservation is put back. Two terminals racing for the last unit
+therefore see each other's rows and at least one backs off - at worst both
+do and the cashier simply taps again.
+
+Selling is different: the sale checks availability with lock=True inside its
+own transaction, holding the Stock rows (and branch rows) until it commits.
+A second terminal selling the same products waits on the lock and then sees
+the first sale's decrement, so the last ream is sold once.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from . import locations
+from .models import Stock, StockReservation
+
+ZERO = Decimal('0')
+
+
+class ReservationError(Exception):
+    def __init__(self, message, available):
+        super().__init__(message)
+        self.available = available
+
+
+def expiry(now=None):
+    return (now or timezone.now()) + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+
+
+def _branch(location):
+    return location if locations.is_branch(location) else None
+
+
+def available_quantities(product_ids, exclude_cart=None, location=None, lock=False):
+    """{product_id: stock - active reservations} at a location (None = the main store);
+    a cart's own reservations can be left out. lock=True (inside a transaction)
+    holds the stock rows until it commits."""
+    product_ids = list(product_ids)
+    if lock:
+        # Stock rows first, then branch rows: the order transfers and branch sales lock in
+        list(Stock.objects.select_for_update().filter(product_id__in=product_ids).order_by('pk').values_list('pk'))
+    stock = locations.quantities_at(location, product_ids, lock=lock)
+    held = StockReservation.objects.filter(
+        product_id__in=product_ids, location=_branch(location), expires_at__gt=timezone.now()
+    )
+    if exclude_cart:
+        held = held.exclude(cart=exclude_cart)
+    reserved = dict(
+        held.values('product_id').annotate(total=Sum('quantity')).order_by().values_list('product_id', 'total')
+    )
+    return {pk: stock.get(pk, ZERO) - reserved.get(pk, ZERO) for pk in product_ids}
+
+
+def touch(cart):
+    """কার্টের সব রিজার্ভেশনের মেয়াদ বাড়ান"""
+    return StockReservation.objects.filter(cart=cart).update(expires_at=expiry())
+
+
+def reserve(organization, cart, product_id, quantity, user=None, location=None):
+    """Set the cart's hold on a product to `quantity`; returns what is left to sell.
+
+    Must run outside a transaction: the check only sees other terminals'
+    reservations once they are committed.
+    """
+    if quantity <= 0:
+        release(cart, [product_id])
+        return available_quantities([product_id], location=location)[product_id]
+
+    previous = StockReservation.objects.filter(cart=cart, product_id=product_id).values_list(
+        'quantity', flat=True
+    ).first()
+    StockReservation.objects.bulk_create(
+        [StockReservation(organization=organization, cart=cart, product_id=product_id, location=_branch(location),
+                          quantity=quantity, expires_at=expiry(), created_by=user)],
+        update_conflicts=True,
+        unique_fields=['cart', 'product'],
+        update_fields=['location', 'quantity', 'expires_at'],
+    )
+
+    left = available_quantities([product_id], location=location)[product_id]
+    if left < 0:
+        # Over-promised: put the cart back where it was
+        if previous is None:
+            release(cart, [product_id])
+        else:
+            StockReservation.objects.filter(cart=cart, product_id=product_id).update(quantity=previous)
+        raise ReservationError('পর্যাপ্ত স্টক নেই', left + quantity)
+    touch(cart)
+    return left
+
+
+def release(cart, product_ids=None):
+    """কার্টের রিজার্ভেশন ছেড়ে দিন (সব, বা নির্দিষ্ট পণ্যের)"""
+    reservations = StockReservation.objects.filter(cart=cart)
+    if product_ids is not None:
+        reservations = reservations.filter(product_id__in=product_ids)
+    return reservations.delete()[0]
+
+
+def shortages(quantities, exclude_cart=None, location=None, lock=False):
+    """Products in {product_id: quantity} that cannot be sold in full right now"""
+    available = available_quantities(quantities, exclude_cart=exclude_cart, location=location, lock=lock)
+    return [pk for pk, quantity in quantities.items() if quantity > available[pk]]
+
+
+def sweep(now=None):
+    """মেয়াদোত্তীর্ণ রিজার্ভেশন মুছুন (single DELETE); returns the number removed"""
+    return StockReservation.objects.filter(expires_at__lte=now or timezone.now()).delete()[0]
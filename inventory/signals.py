@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Stock, StockMovement
+from . import alerts, valuation
+
+
+@receiver(post_save, sender=Stock)
+def check_stock_level(sender, instance, raw=False, **kwargs):
+    """প্রতিটি স্টক সেভের পর লো স্টক যাচাই"""
+    if not raw:
+        alerts.refresh([instance.pk])
+
+
+@receiver(post_save, sender=StockMovement)
+def cost_movement(sender, instance, created, raw=False, **kwargs):
+    """নতুন মুভমেন্টের খরচ হিসাব (FIFO / এভারেজ)"""
+    if created and not raw:
+        valuation.apply([instance])
@@ -0,0 +1,150 @@
+"""
+স্টক গণনা ও বাল্ক সমন্বয়
+Counted quantities are collected on a StockTake from an uploaded sheet or a
+barcode scanner. Variances against Stock come from one annotated query, and
+posting locks the counted stock rows, writes every changed quantity, its
+adjustment movement and its cost in a handful of bulk statements inside one
+transaction. Products that were not counted are left as they are.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from products.importer import ImportResult, read_rows
+from products.models import Product
+from stationery_shop.db import bulk_update_columns
+from .models import Stock, StockMovement, StockTake, StockTakeLine
+from . import alerts, valuation
+
+COUNT_COLUMNS = ['sku', 'barcode', 'counted']
+
+
+class StockTakeError(Exception):
+    pass
+
+
+def find_product(organization, code):
+    """SKU বা বারকোড দিয়ে পণ্য"""
+    return Product.objects.filter(organization=organization).filter(Q(sku=code) | Q(barcode=code)).first()
+
+
+def load_counts(stock_take, uploaded_file):
+    """Upsert counted quantities from an .xlsx/.csv with sku or barcode + counted columns"""
+    organization = stock_take.organization
+    by_sku, by_barcode = {}, {}
+    for pk, sku, barcode in Product.objects.filter(organization=organization).values_list('pk', 'sku', 'barcode'):
+        by_sku[sku] = pk
+        if barcode:
+            by_barcode[barcode] = pk
+
+    result = ImportResult()
+    counts = {}
+    for row_number, row in read_rows(uploaded_file, columns=COUNT_COLUMNS, required='counted'):
+        product_id = by_sku.get(row.get('sku', '')) or by_barcode.get(row.get('barcode', ''))
+        if product_id is None:
+            result.add_error(row_number, f"অজানা পণ্য: {row.get('sku') or row.get('barcode') or '-'}")
+            continue
+        try:
+            counted = Decimal(row.get('counted', '').replace(',', ''))
+        except InvalidOperation:
+            counted = None
+        if counted is None or counted < 0:
+            result.add_error(row_number, 'ভুল counted')
+            continue
+        counts[product_id] = counted
+
+    existing = set(stock_take.lines.filter(product_id__in=counts).values_list('product_id', flat=True))
+    StockTakeLine.objects.bulk_create(
+        [
+            StockTakeLine(stock_take=stock_take, product_id=product_id, counted_quantity=counted)
+            for product_id, counted in counts.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['stock_take', 'product'],
+        update_fields=['counted_quantity'],
+        batch_size=1000,
+    )
+    result.updated = len(existing)
+    result.created = len(counts) - result.updated
+    return result
+
+
+def scan(stock_take, code, quantity=Decimal('1')):
+    """একটি স্ক্যান: the product's counted quantity goes up by `quantity`"""
+    product = find_product(stock_take.organization, code)
+    if product is None:
+        return None
+    line, created = StockTakeLine.objects.get_or_create(
+        stock_take=stock_take, product=product, defaults={'counted_quantity': quantity}
+    )
+    if not created:
+        StockTakeLine.objects.filter(pk=line.pk).update(counted_quantity=F('counted_quantity') + quantity)
+    return product
+
+
+def lines_with_variance(stock_take):
+    """লাইন + current system quantity and variance, computed in the query"""
+    return stock_take.lines.select_related('product').annotate(
+        system_quantity=Coalesce(
+            F('product__stock__quantity'), Value(Decimal('0')), output_field=DecimalField()
+        ),
+    ).annotate(
+        difference=F('counted_quantity') - F('system_quantity'),
+    ).order_by('product__name')
+
+
+@transaction.atomic
+def post_stock_take(stock_take, user):
+    """সব পার্থক্য একসাথে স্টকে পোস্ট; returns the number of adjusted products"""
+    stock_take = StockTake.objects.select_for_update().get(pk=stock_take.pk)
+    if stock_take.status != 'draft':
+        raise StockTakeError('এই স্টক গণনা আগেই পোস্ট/বাতিল হয়েছে')
+
+    lines = list(stock_take.lines.all())
+    stocks = {
+        stock.product_id: stock
+        for stock in Stock.objects.select_for_update().filter(product_id__in=[line.product_id for line in lines])
+    }
+
+    now = timezone.now()
+    new_stocks, changed, movements = [], [], []
+    for line in lines:
+        stock = stocks.get(line.product_id)
+        if stock is None:
+            stock = Stock(organization=stock_take.organization, product_id=line.product_id, quantity=0)
+            new_stocks.append(stock)
+        line.expected_quantity = stock.quantity
+        line.variance = line.counted_quantity - stock.quantity
+        if not line.variance:
+            continue
+
+        movements.append(StockMovement(
+            organization=stock_take.organization,
+            product_id=line.product_id,
+            movement_type='adjustment',
+            quantity=line.counted_quantity,
+            previous_quantity=stock.quantity,
+            new_quantity=line.counted_quantity,
+            reference=stock_take.reference,
+            notes=f'স্টক গণনা: {stock_take.reference}',
+            created_by=user,
+        ))
+        stock.quantity = line.counted_quantity
+        stock.last_updated = now
+        if stock.pk:
+            changed.append(stock)
+
+    Stock.objects.bulk_create(new_stocks, batch_size=1000)
+    bulk_update_columns(Stock, changed, ['quantity', 'last_updated'])
+    bulk_update_columns(StockTakeLine, lines, ['expected_quantity', 'variance'])
+    # bulk_create skips post_save, so costing and low-stock checks run here for the whole batch
+    valuation.apply(StockMovement.objects.bulk_create(movements, batch_size=1000))
+    alerts.refresh([stock.pk for stock in changed + new_stocks])
+
+    stock_take.status = 'posted'
+    stock_take.posted_at = now
+    stock_take.save()
+    return len(movements)
@@ -1,3 +1,155 @@
+from decimal import Decimal
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from products.models import Product
+from tenants.models import Organization
+from . import reservations, valuation
+from .models import CostLayer, InventoryValuation, ProductValuation, Stock, StockMovement, StockReservation
+
+
+def make_shop(slug, valuation_method='average'):
+    return Organization.objects.create(
+        name=slug, slug=slug, owner_name='o', email=f'{slug}@example.com', phone='1',
+        valuation_method=valuation_method,
+    )
+
+
+def make_product(organization, buying_price='5', stock=0):
+    product = Product.objects.create(
+        organization=organization, name='A4 কাগজ', buying_price=Decimal(buying_price), selling_price=Decimal('10'),
+    )
+    Stock.objects.create(organization=organization, product=product, quantity=Decimal(stock))
+    return product
+
+
+def move(product, movement_type, change, unit_cost=None):
+    """Write a movement the way the views do: stock first, then its history row"""
+    stock = Stock.objects.get(product=product)
+    previous = stock.quantity
+    stock.quantity += Decimal(change)
+    stock.save()
+    movement = StockMovement.objects.create(
+        product=product, movement_type=movement_type, quantity=abs(Decimal(change)),
+        previous_quantity=previous, new_quantity=stock.quantity, unit_cost=unit_cost,
+    )
+    movement.refresh_from_db()
+    return movement
+
+
+class ValuationTests(TestCase):
+    def test_product_without_shop_is_costed_without_a_shop_total(self):
+        product = make_product(None, buying_price='4', stock=10)
+
+        movement = move(product, 'out', -3)
+
+        self.assertEqual(movement.organization_id, None)
+        self.assertEqual(movement.unit_cost, Decimal('4'))
+        self.assertEqual(movement.total_cost, Decimal('12'))
+        book = ProductValuation.objects.get(product=product)
+        self.assertEqual((book.quantity, book.value), (Decimal('7'), Decimal('28')))
+        self.assertFalse(InventoryValuation.objects.exists())
+
+    def test_shop_total_follows_its_products(self):
+        shop = make_shop('avg')
+        product = make_product(shop)
+
+        move(product, 'in', 10, Decimal('5'))
+        move(product, 'in', 10, Decimal('7'))
+        issue = move(product, 'out', -5)
+
+        self.assertEqual(issue.unit_cost, Decimal('6'))
+        total = InventoryValuation.objects.get(organization=shop)
+        self.assertEqual((total.quantity, total.value), (Decimal('15'), Decimal('90')))
+
+    def test_average_issue_of_everything_leaves_no_residue(self):
+        shop = make_shop('avg')
+        product = make_product(shop)
+
+        move(product, 'in', 3, Decimal('10'))
+        move(product, 'in', 1, Decimal('11'))
+        issue = move(product, 'out', -4)
+
+        self.assertEqual(issue.total_cost, Decimal('41'))
+        book = ProductValuation.objects.get(product=product)
+        self.assertEqual((book.quantity, book.value), (Decimal('0'), Decimal('0')))
+
+    def test_fifo_issues_the_oldest_layers_first(self):
+        shop = make_shop('fifo', valuation_method='fifo')
+        product = make_product(shop)
+
+        move(product, 'in', 10, Decimal('5'))
+        move(product, 'in', 10, Decimal('7'))
+        issue = move(product, 'out', -15)
+
+        self.assertEqual(issue.total_cost, Decimal('85'))
+        self.assertEqual(
+            list(CostLayer.objects.filter(product=product).values_list('remaining', 'unit_cost')),
+            [(Decimal('5'), Decimal('7'))],
+        )
+        self.assertEqual(InventoryValuation.objects.get(organization=shop).value, Decimal('35'))
+
+    def test_rebuild_matches_the_running_books(self):
+        shop = make_shop('fifo', valuation_method='fifo')
+        product = make_product(shop)
+        move(product, 'in', 10, Decimal('5'))
+        move(product, 'out', -4)
+        move(product, 'in', 6, Decimal('8'))
+        move(product, 'out', -9)
+        running = InventoryValuation.objects.get(organization=shop)
+
+        rebuilt = valuation.rebuild(shop)
+
+        self.assertEqual((rebuilt.quantity, rebuilt.value), (running.quantity, running.value))
+        self.assertEqual((rebuilt.quantity, rebuilt.value), (Decimal('3'), Decimal('24')))
+
+
+class StockAdjustTests(TestCase):
+    def test_adjustment_starts_from_the_committed_quantity(self):
+        shop = make_shop('shop')
+        user = User.objects.create_user(username='u', password='p', organization=shop)
+        product = make_product(shop, stock=10)
+        stale = Stock.objects.get(product=product)
+        # A sale commits its decrement after the adjustment page loaded the row
+        Stock.objects.filter(pk=stale.pk).update(quantity=Decimal('7'))
+        self.client.force_login(user)
+
+        with mock.patch('inventory.views.get_object_or_404', return_value=stale):
+            self.client.post(reverse('inventory:stock_adjust', args=[stale.pk]), {'type': 'add', 'quantity': '1'})
+
+        self.assertEqual(Stock.objects.get(pk=stale.pk).quantity, Decimal('8'))
+        movement = StockMovement.objects.get(product=product)
+        self.assertEqual((movement.previous_quantity, movement.new_quantity), (Decimal('7'), Decimal('8')))
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.shop = make_shop('pos')
+        self.product = make_product(self.shop, stock=5)
+
+    def test_carts_share_the_stock(self):
+        self.assertEqual(reservations.reserve(self.shop, 'a', self.product.pk, Decimal('3')), Decimal('2'))
+        self.assertEqual(reservations.available_quantities([self.product.pk], exclude_cart='a'),
+                         {self.product.pk: Decimal('5')})
+
+    def test_over_promise_is_put_back(self):
+        reservations.reserve(self.shop, 'a', self.product.pk, Decimal('3'))
+
+        with self.assertRaises(reservations.ReservationError) as raised:
+            reservations.reserve(self.shop, 'b', self.product.pk, Decimal('3'))
+
+        self.assertEqual(raised.exception.available, Decimal('2'))
+        self.assertFalse(StockReservation.objects.filter(cart='b').exists())
+
+    def test_over_promise_restores_the_carts_previous_hold(self):
+        reservations.reserve(self.shop, 'a', self.product.pk, Decimal('3'))
+        reservations.reserve(self.shop, 'b', self.product.pk, Decimal('1'))
+
+        with self.assertRaises(reservations.ReservationError):
+            reservations.reserve(self.shop, 'b', self.product.pk, Decimal('4'))
 
-# Create your tests here.
+        self.assertEqual(StockReservation.objects.get(cart='b').quantity, Decimal('1'))
+        self.assertEqual(reservations.shortages({self.product.pk: Decimal('2')}), [self.product.pk])
@@ -7,7 +7,22 @@ urlpatterns = [
     path('', views.stock_list, name='stock_list'),
     path('low-stock/', views.low_stock, name='low_stock'),
     path('movements/', views.movement_list, name='movement_list'),
+    path('movements/export/', views.movement_export, name='movement_export'),
     path('adjust/<int:pk>/', views.stock_adjust, name='stock_adjust'),
     path('alerts/', views.alerts, name='alerts'),
+    path('stock-take/', views.stock_take_list, name='stock_take_list'),
+    path('stock-take/<int:pk>/', views.stock_take_detail, name='stock_take_detail'),
+    path('stock-take/<int:pk>/upload/', views.stock_take_upload, name='stock_take_upload'),
+    path('stock-take/<int:pk>/scan/', views.stock_take_scan, name='stock_take_scan'),
+    path('stock-take/<int:pk>/post/', views.stock_take_post, name='stock_take_post'),
+    path('stock-take/<int:pk>/cancel/', views.stock_take_cancel, name='stock_take_cancel'),
+    path('locations/', views.location_list, name='location_list'),
+    path('locations/<int:pk>/', views.location_detail, name='location_detail'),
+    path('transfers/', views.transfer_list, name='transfer_list'),
+    path('transfers/<int:pk>/', views.transfer_detail, name='transfer_detail'),
+    path('transfers/<int:pk>/complete/', views.transfer_complete, name='transfer_complete'),
+    path('transfers/<int:pk>/cancel/', views.transfer_cancel, name='transfer_cancel'),
     path('report/', views.inventory_report, name='inventory_report'),
+    path('report/export/', views.inventory_report_export, name='inventory_report_export'),
+    path('report/closing/export/', views.closing_stock_export, name='closing_stock_export'),
 ]
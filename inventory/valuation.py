@@ -0,0 +1,336 @@
+"""
+স্টক মূল্যায়ন ইঞ্জিন (FIFO / ওয়েটেড এভারেজ)
+Every stock movement is costed when it is written. Increases add a FIFO cost
+layer or blend into the running average; decreases consume the oldest layers
+or take the average, and their cost of goods is stored on the movement.
+ProductValuation (per product) and InventoryValuation (per shop) are kept
+current, so reading a valuation is a single row lookup.
+
+rebuild() replays a shop's whole movement history, archived rows included,
+through the same cost books
+in one streaming pass and replaces the stored state. It is also how a shop
+switches method: until then the books keep the method they were built with.
+
+Only stock on hand is costed: issuing more than is held costs the shortfall
+at the last known cost and nothing negative is carried forward. Transfers
+between locations move no value and are skipped. Products from before shops
+existed (no organization) keep their product books but have no shop total.
+"""
+import heapq
+from collections import defaultdict, deque
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from products.models import Product
+from stationery_shop.db import bulk_update_columns
+from tenants.models import Organization
+from . import archive
+from .models import CostLayer, InventoryValuation, ProductValuation, Stock, StockMovement
+
+ZERO = Decimal('0')
+COST_PLACES = Decimal('0.0001')
+REBUILD_CHUNK_SIZE = 5000
+
+
+def _q(value):
+    return value.quantize(COST_PLACES)
+
+
+class AverageBook:
+    """ওয়েটেড এভারেজ খাতা (একটি পণ্য)"""
+
+    def __init__(self, quantity=ZERO, value=ZERO):
+        self.quantity = quantity
+        self.value = value
+
+    @property
+    def unit_cost(self):
+        return _q(self.value / self.quantity) if self.quantity > 0 else None
+
+    def receive(self, quantity, unit_cost, received_at=None, movement_id=None):
+        self.quantity += quantity
+        self.value += _q(quantity * unit_cost)
+
+    def issue(self, quantity, fallback_cost):
+        unit_cost = self.unit_cost or fallback_cost
+        taken = min(quantity, max(self.quantity, ZERO))
+        if taken == self.quantity:
+            # Issuing everything takes the exact remaining value so no rounding residue is left
+            cost = self.value
+        elif taken:
+            cost = _q(taken * self.value / self.quantity)
+        else:
+            cost = ZERO
+        self.quantity -= taken
+        self.value -= cost
+        return cost + _q((quantity - taken) * unit_cost)
+
+
+class FifoBook:
+    """FIFO খাতা (একটি পণ্য): open cost layers, oldest first"""
+
+    def __init__(self, organization_id, product_id, layers=()):
+        self.organization_id = organization_id
+        self.product_id = product_id
+        self.layers = deque(layers)
+        self.consumed = []  # pks of stored layers that were used up
+        self.last_cost = None
+
+    @property
+    def quantity(self):
+        return sum((layer.remaining for layer in self.layers), ZERO)
+
+    @property
+    def value(self):
+        return sum((_q(layer.remaining * layer.unit_cost) for layer in self.layers), ZERO)
+
+    @property
+    def unit_cost(self):
+        quantity = self.quantity
+        return _q(self.value / quantity) if quantity > 0 else self.last_cost
+
+    def receive(self, quantity, unit_cost, received_at=None, movement_id=None):
+        self.layers.append(CostLayer(
+            organization_id=self.organization_id,
+            product_id=self.product_id,
+            movement_id=movement_id,
+            received_at=received_at or timezone.now(),
+            quantity=quantity,
+            remaining=quantity,
+            unit_cost=unit_cost,
+        ))
+
+    def issue(self, quantity, fallback_cost):
+        cost = ZERO
+        while quantity > 0 and self.layers:
+            layer = self.layers[0]
+            taken = min(quantity, layer.remaining)
+            cost += _q(taken * layer.unit_cost)
+            layer.remaining -= taken
+            quantity -= taken
+            self.last_cost = layer.unit_cost
+            if layer.remaining <= 0:
+                self.layers.popleft()
+                if layer.pk:
+                    self.consumed.append(layer.pk)
+        if quantity > 0:
+            cost += _q(quantity * (self.last_cost or fallback_cost))
+        return cost
+
+
+def new_book(method, organization_id, product_id):
+    return FifoBook(organization_id, product_id) if method == 'fifo' else AverageBook()
+
+
+def post(book, change, unit_cost, fallback_cost, created_at=None, movement_id=None):
+    """Post one stock change to a book; returns (unit_cost, total_cost) for the movement"""
+    if change > 0:
+        if unit_cost is None:
+            unit_cost = book.unit_cost or fallback_cost
+        book.receive(change, unit_cost, created_at, movement_id)
+        return unit_cost, _q(change * unit_cost)
+    total = book.issue(-change, fallback_cost)
+    return _q(total / -change), total
+
+
+def shop_method(organization_id):
+    """The method the shop's books are kept in"""
+    method = InventoryValuation.objects.filter(organization_id=organization_id).values_list('method', flat=True).first()
+    if method is None:
+        method = Organization.objects.filter(pk=organization_id).values_list('valuation_method', flat=True).first()
+    return method or 'average'
+
+
+def _save_books(organization_id, method, books):
+    ProductValuation.objects.bulk_create(
+        [
+            ProductValuation(organization_id=organization_id, product_id=product_id,
+                             quantity=book.quantity, value=book.value)
+            for product_id, book in books.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['product'],
+        update_fields=['organization', 'quantity', 'value', 'updated_at'],
+        batch_size=REBUILD_CHUNK_SIZE,
+    )
+    if method != 'fifo':
+        return
+
+    consumed = [pk for book in books.values() for pk in book.consumed]
+    layers = [layer for book in books.values() for layer in book.layers]
+    if consumed:
+        CostLayer.objects.filter(pk__in=consumed).delete()
+    bulk_update_columns(CostLayer, [layer for layer in layers if layer.pk], ['remaining'])
+    CostLayer.objects.bulk_create([layer for layer in layers if not layer.pk], batch_size=REBUILD_CHUNK_SIZE)
+
+
+def _ensure_shop(organization_id, method):
+    """The shop's total row, opened from its product books if it was never rebuilt"""
+    if InventoryValuation.objects.filter(organization_id=organization_id).exists():
+        return
+    totals = ProductValuation.objects.filter(organization_id=organization_id).aggregate(
+        quantity=Sum('quantity'), value=Sum('value'),
+    )
+    InventoryValuation.objects.get_or_create(
+        organization_id=organization_id,
+        defaults={'method': method, 'quantity': totals['quantity'] or ZERO, 'value': totals['value'] or ZERO,
+                  'rebuilt_at': timezone.now()},
+    )
+
+
+def _apply_shop(organization_id, movements):
+    method = shop_method(organization_id)
+    product_ids = {movement.product_id for movement in movements}
+    if organization_id is not None:
+        _ensure_shop(organization_id, method)
+
+    # Empty books for products costed for the first time, so there is always a row to lock:
+    # concurrent first movements of a product then queue on it like any other
+    ProductValuation.objects.bulk_create(
+        [ProductValuation(organization_id=organization_id, product_id=product_id) for product_id in product_ids],
+        ignore_conflicts=True,
+    )
+    # Lock the products' valuations so concurrent movements are costed one after another
+    valuations = {
+        valuation.product_id: valuation
+        for valuation in ProductValuation.objects.select_for_update().filter(product_id__in=product_ids)
+    }
+    prices = dict(Product.objects.filter(pk__in=product_ids).values_list('pk', 'buying_price'))
+
+    layers = defaultdict(list)
+    if method == 'fifo':
+        for layer in CostLayer.objects.filter(product_id__in=product_ids).order_by('received_at', 'id'):
+            layers[layer.product_id].append(layer)
+
+    books = {}
+    before_quantity = before_value = ZERO
+    for product_id, valuation in valuations.items():
+        before_quantity += valuation.quantity
+        before_value += valuation.value
+        if method == 'fifo':
+            books[product_id] = FifoBook(organization_id, product_id, layers[product_id])
+        else:
+            books[product_id] = AverageBook(valuation.quantity, valuation.value)
+
+    opened = set()
+    for movement in sorted(movements, key=lambda m: (m.created_at, m.pk)):
+        book = books[movement.product_id]
+        if movement.product_id not in opened:
+            opened.add(movement.product_id)
+            # An empty book for stock that is there (first costed movement, or stock set without
+            # a movement) opens with that stock at buying price, as rebuild() does
+            if book.quantity <= 0 and movement.previous_quantity > 0:
+                book.receive(movement.previous_quantity, prices[movement.product_id], movement.created_at)
+        movement.unit_cost, movement.total_cost = post(
+            book, movement.new_quantity - movement.previous_quantity, movement.unit_cost,
+            prices[movement.product_id], movement.created_at, movement.pk,
+        )
+
+    _save_books(organization_id, method, books)
+    bulk_update_columns(StockMovement, movements, ['unit_cost', 'total_cost'])
+
+    after_quantity = sum((book.quantity for book in books.values()), ZERO)
+    after_value = sum((book.value for book in books.values()), ZERO)
+    InventoryValuation.objects.filter(organization_id=organization_id).update(
+        quantity=F('quantity') + (after_quantity - before_quantity),
+        value=F('value') + (after_value - before_value),
+    )
+
+
+@transaction.atomic
+def apply(movements):
+    """নতুন মুভমেন্টগুলোর খরচ হিসাব ও মূল্যায়ন হালনাগাদ (saved StockMovement objects)"""
+    by_shop = defaultdict(list)
+    for movement in movements:
+        if movement.new_quantity != movement.previous_quantity and movement.movement_type != 'transfer':
+            by_shop[movement.organization_id].append(movement)
+    for organization_id, shop_movements in by_shop.items():
+        _apply_shop(organization_id, shop_movements)
+
+
+@transaction.atomic
+def rebuild(organization, method=None, chunk_size=REBUILD_CHUNK_SIZE):
+    """দোকানের পুরো ইতিহাস থেকে মূল্যায়ন পুনর্গঠন; returns the InventoryValuation"""
+    from purchases.models import PurchaseItem
+
+    method = method or organization.valuation_method
+    CostLayer.objects.filter(organization=organization).delete()
+    ProductValuation.objects.filter(organization=organization).delete()
+
+    prices = dict(Product.objects.filter(organization=organization).values_list('pk', 'buying_price'))
+    # Older receipts carry no cost on the movement; their purchase line has it (landed where known)
+    purchase_costs = {
+        (number, product_id): landed if landed is not None else price
+        for number, product_id, landed, price in PurchaseItem.objects.filter(
+            purchase__organization=organization
+        ).values_list(
+            'purchase__purchase_number', 'product_id', 'landed_unit_cost', 'unit_price'
+        ).iterator(chunk_size=chunk_size)
+    }
+
+    def stream(model):
+        rows = model.objects.filter(organization=organization).order_by('created_at', 'pk').values_list(
+            'pk', 'product_id', 'previous_quantity', 'new_quantity', 'unit_cost', 'total_cost',
+            'reference', 'created_at', 'movement_type',
+        )
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield model, row
+
+    # Archived and live history merged into one stream in time order
+    streams = [stream(model) for model in archive.sources(organization)]
+    books, pending = {}, defaultdict(list)
+    for model, row in heapq.merge(*streams, key=lambda item: (item[1][7], item[1][0])):
+        pk, product_id, previous, new, stored_cost, stored_total, reference, created_at, movement_type = row
+        if movement_type == 'transfer':
+            continue
+        book = books.get(product_id)
+        if book is None:
+            book = books[product_id] = new_book(method, organization.pk, product_id)
+            if previous > 0:
+                book.receive(previous, prices.get(product_id, ZERO), created_at)
+        if new == previous:
+            continue
+        # Receipts keep the cost they were booked at; issues are recosted
+        unit_cost = stored_cost if new > previous else None
+        if unit_cost is None and new > previous:
+            unit_cost = purchase_costs.get((reference, product_id))
+        # Cost layers only point at live movements
+        layer_source = pk if model is StockMovement else None
+        unit_cost, total_cost = post(
+            book, new - previous, unit_cost, prices.get(product_id, ZERO), created_at, layer_source
+        )
+        if (unit_cost, total_cost) != (stored_cost, stored_total):
+            pending[model].append(model(pk=pk, unit_cost=unit_cost, total_cost=total_cost))
+            if len(pending[model]) >= chunk_size:
+                bulk_update_columns(model, pending.pop(model), ['unit_cost', 'total_cost'])
+    for model, objs in pending.items():
+        bulk_update_columns(model, objs, ['unit_cost', 'total_cost'])
+
+    # Stock that never went through a movement opens at buying price
+    now = timezone.now()
+    for product_id, quantity in Stock.objects.filter(organization=organization, quantity__gt=0).values_list(
+        'product_id', 'quantity'
+    ):
+        if product_id not in books:
+            book = books[product_id] = new_book(method, organization.pk, product_id)
+            book.receive(quantity, prices.get(product_id, ZERO), now)
+
+    _save_books(organization.pk, method, books)
+    valuation, _ = InventoryValuation.objects.update_or_create(
+        organization=organization,
+        defaults={
+            'method': method,
+            'quantity': sum((book.quantity for book in books.values()), ZERO),
+            'value': sum((book.value for book in books.values()), ZERO),
+            'rebuilt_at': now,
+        },
+    )
+    return valuation
+
+
+def shop_value(organization):
+    """দোকানের বর্তমান স্টক মূল্য, or None before the shop's first costed movement"""
+    return InventoryValuation.objects.filter(organization=organization).values_list('value', flat=True).first()
@@ -2,16 +2,29 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import HttpResponse
-from django.db.models import Sum, F
+from django.db import transaction
+from django.db.models import Count, DecimalField, Sum, F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
 
-from .models import Stock, StockMovement, StockAlert
+from .models import (
+    Location, LocationStock, Stock, StockMovement, StockMovementArchive, StockAlert, StockTake, StockTransfer,
+    StockTransferItem,
+)
 from products.models import Product
+from . import archive, ledger, locations, valuation
+from .stocktake import StockTakeError, find_product, lines_with_variance, load_counts, post_stock_take, scan
+from stationery_shop.exports import EXPORT_CHUNK_SIZE, scope_to_org, xlsx_response
 
 
 @login_required
 def stock_list(request):
     """স্টক তালিকা"""
-    stocks = Stock.objects.select_related('product', 'product__category', 'product__unit').all()
+    stocks = Stock.objects.select_related(
+        'product', 'product__category', 'product__unit', 'product__valuation'
+    ).all()
     
     # Filter by category
     category_id = request.GET.get('category')
@@ -20,7 +33,10 @@ def stock_list(request):
     
     # Calculate totals
     total_value = stocks.aggregate(
-        total=Sum(F('quantity') * F('product__buying_price'))
+        total=Sum(Coalesce(
+            F('product__valuation__value'), F('quantity') * F('product__buying_price'),
+            output_field=DecimalField(),
+        ))
     )['total'] or 0
     
     total_selling_value = stocks.aggregate(
@@ -42,9 +58,9 @@ def stock_list(request):
 @login_required
 def low_stock(request):
     """লো স্টক তালিকা"""
-    stocks = Stock.objects.filter(
-        quantity__lte=F('reorder_level')
-    ).select_related('product', 'product__category')
+    stocks = scope_to_org(Stock.objects.filter(is_low=True), request).select_related(
+        'product', 'product__category'
+    )
     
     return render(request, 'inventory/low_stock.html', {'stocks': stocks})
 
@@ -52,7 +68,8 @@ def low_stock(request):
 @login_required
 def movement_list(request):
     """স্টক মুভমেন্ট হিস্ট্রি"""
-    movements = StockMovement.objects.select_related('product', 'created_by').all()
+    # Scoped to the shop so the (organization, created_at) index serves the newest rows
+    movements = scope_to_org(StockMovement.objects.select_related('product', 'created_by'), request)
     
     # Filter by type
     movement_type = request.GET.get('type')
@@ -73,37 +90,41 @@ def movement_list(request):
 @login_required
 def stock_adjust(request, pk):
     """স্টক সমন্বয়"""
-    stock = get_object_or_404(Stock, pk=pk)
+    stock = get_object_or_404(scope_to_org(Stock.objects.all(), request), pk=pk)
     
     if request.method == 'POST':
         adjustment_type = request.POST.get('type')
-        quantity = float(request.POST.get('quantity', 0))
+        quantity = Decimal(request.POST.get('quantity') or 0)
         notes = request.POST.get('notes', '')
         
-        previous_qty = stock.quantity
-        
-        if adjustment_type == 'add':
-            stock.quantity += quantity
-            movement_type = 'in'
-        elif adjustment_type == 'remove':
-            stock.quantity -= quantity
-            movement_type = 'out'
-        else:  # set
-            stock.quantity = quantity
-            movement_type = 'adjustment'
-        
-        stock.save()
-        
-        # Create movement record
-        StockMovement.objects.create(
-            product=stock.product,
-            movement_type=movement_type,
-            quantity=quantity,
-            previous_quantity=previous_qty,
-            new_quantity=stock.quantity,
-            notes=notes,
-            created_by=request.user,
-        )
+        with transaction.atomic():
+            # Read the quantity under the row lock sales take, so neither overwrites the other
+            stock = Stock.objects.select_for_update().select_related('product').get(pk=stock.pk)
+            previous_qty = stock.quantity
+            
+            if adjustment_type == 'add':
+                stock.quantity += quantity
+                movement_type = 'in'
+            elif adjustment_type == 'remove':
+                stock.quantity -= quantity
+                movement_type = 'out'
+            else:  # set
+                stock.quantity = quantity
+                movement_type = 'adjustment'
+            
+            stock.save()
+            
+            # Create movement record
+            StockMovement.objects.create(
+                organization=stock.organization,
+                product=stock.product,
+                movement_type=movement_type,
+                quantity=quantity,
+                previous_quantity=previous_qty,
+                new_quantity=stock.quantity,
+                notes=notes,
+                created_by=request.user,
+            )
         
         messages.success(request, 'স্টক আপডেট হয়েছে!')
         return redirect('inventory:stock_list')
@@ -114,7 +135,7 @@ def stock_adjust(request, pk):
 @login_required
 def alerts(request):
     """স্টক অ্যালার্ট"""
-    alerts = StockAlert.objects.select_related('stock', 'stock__product').all()
+    alerts = scope_to_org(StockAlert.objects.all(), request).select_related('stock', 'product')
     
     if request.method == 'POST':
         # Mark all as read
@@ -146,9 +167,11 @@ def inventory_report(request):
             'total_value': total_value,
         })
     
-    total_stock_value = stocks.aggregate(
-        total=Sum(F('quantity') * F('product__buying_price'))
-    )['total'] or 0
+    total_stock_value = valuation.shop_value(request.user.organization)
+    if total_stock_value is None:
+        total_stock_value = stocks.aggregate(
+            total=Sum(F('quantity') * F('product__buying_price'))
+        )['total'] or 0
     
     context = {
         'category_data': category_data,
@@ -156,3 +179,335 @@ def inventory_report(request):
         'total_products': stocks.count(),
     }
     return render(request, 'inventory/report.html', context)
+
+
+@login_required
+def movement_export(request):
+    """স্টক মুভমেন্ট Excel"""
+    movement_type = request.GET.get('type')
+    from_date = request.GET.get('from_date')
+    to_date = request.GET.get('to_date')
+    
+    # Older ranges also read the archive table (archived rows are all older than live ones)
+    models = [StockMovement]
+    org = request.user.organization
+    horizon = archive.archive_horizon(org) if org else None
+    if horizon is not None and (not from_date or from_date <= timezone.localtime(horizon).date().isoformat()):
+        models = [StockMovementArchive, StockMovement]
+    
+    def model_rows(model):
+        movements = scope_to_org(model.objects.all(), request)
+        if movement_type:
+            movements = movements.filter(movement_type=movement_type)
+        if from_date:
+            movements = movements.filter(created_at__date__gte=from_date)
+        if to_date:
+            movements = movements.filter(created_at__date__lte=to_date)
+        return movements.order_by('created_at').values_list(
+            'created_at', 'product__sku', 'product__name', 'movement_type', 'quantity',
+            'previous_quantity', 'new_quantity', 'reference', 'created_by__username',
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    
+    types = dict(StockMovement.MOVEMENT_TYPES)
+    rows = (
+        row[:3] + (types.get(row[3], row[3]),) + row[4:]
+        for model in models
+        for row in model_rows(model)
+    )
+    headers = ['তারিখ', 'SKU', 'পণ্য', 'মুভমেন্ট টাইপ', 'পরিমাণ', 'আগের পরিমাণ',
+               'নতুন পরিমাণ', 'রেফারেন্স', 'তৈরি করেছেন']
+    return xlsx_response('stock-movements.xlsx', [('মুভমেন্ট', headers, rows)])
+
+
+@login_required
+def inventory_report_export(request):
+    """ইনভেন্টরি রিপোর্ট Excel"""
+    stocks = scope_to_org(Stock.objects.all(), request).order_by(
+        'product__category__name', 'product__name'
+    ).values_list(
+        'product__sku', 'product__name', 'product__category__name', 'quantity',
+        'reorder_level', 'product__buying_price', 'product__selling_price',
+    )
+    
+    rows = (
+        row + (row[3] * row[5], row[3] * row[6])
+        for row in stocks.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    headers = ['SKU', 'পণ্য', 'ক্যাটাগরি', 'পরিমাণ', 'পুনঃঅর্ডার লেভেল', 'ক্রয় মূল্য',
+               'বিক্রয় মূল্য', 'স্টক মূল্য (ক্রয়)', 'স্টক মূল্য (বিক্রয়)']
+    return xlsx_response('inventory-report.xlsx', [('ইনভেন্টরি', headers, rows)])
+
+
+@login_required
+def closing_stock_export(request):
+    """নির্দিষ্ট তারিখের ক্লোজিং স্টক Excel"""
+    date_str = request.GET.get('date')
+    try:
+        date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else timezone.localdate()
+    except ValueError:
+        messages.error(request, 'ভুল তারিখ!')
+        return redirect('inventory:inventory_report')
+    
+    org = request.user.organization
+    position = ledger.stock_on(org, date)
+    products = {
+        pk: (sku, name) for pk, sku, name in
+        Product.objects.filter(organization=org).values_list('pk', 'sku', 'name').iterator()
+    }
+    
+    rows = (
+        products.get(product_id, ('', '')) + (quantity, unit_cost, value)
+        for product_id, quantity, unit_cost, value in position.rows()
+        if quantity
+    )
+    headers = ['SKU', 'পণ্য', 'পরিমাণ', 'একক মূল্য', 'স্টক মূল্য']
+    return xlsx_response(f'closing-stock-{date:%Y-%m-%d}.xlsx', [(f'{date:%Y-%m-%d}', headers, rows)])
+
+
+@login_required
+def stock_take_list(request):
+    """স্টক গণনা তালিকা"""
+    org = request.user.organization
+    
+    if request.method == 'POST':
+        stock_take = StockTake.objects.create(
+            organization=org,
+            notes=request.POST.get('notes', ''),
+            created_by=request.user,
+        )
+        messages.success(request, f'স্টক গণনা {stock_take.reference} শুরু হয়েছে!')
+        return redirect('inventory:stock_take_detail', pk=stock_take.pk)
+    
+    stock_takes = StockTake.objects.filter(organization=org).select_related('created_by').annotate(
+        line_count=Count('lines')
+    )
+    return render(request, 'inventory/stock_take_list.html', {'stock_takes': stock_takes})
+
+
+@login_required
+def stock_take_detail(request, pk):
+    """স্টক গণনা বিস্তারিত ও পার্থক্য"""
+    stock_take = get_object_or_404(StockTake, pk=pk, organization=request.user.organization)
+    lines = lines_with_variance(stock_take)
+    
+    context = {
+        'stock_take': stock_take,
+        'lines': lines,
+        'columns': ['sku', 'barcode', 'counted'],
+    }
+    return render(request, 'inventory/stock_take_detail.html', context)
+
+
+@login_required
+def stock_take_upload(request, pk):
+    """গণনার ফাইল আপলোড"""
+    stock_take = get_object_or_404(StockTake, pk=pk, organization=request.user.organization, status='draft')
+    
+    if request.method == 'POST' and request.FILES.get('file'):
+        try:
+            result = load_counts(stock_take, request.FILES['file'])
+        except ValueError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f'{result.created} টি নতুন ও {result.updated} টি পণ্যের গণনা হালনাগাদ হয়েছে!')
+            for row_number, message in result.errors[:10]:
+                messages.warning(request, f'সারি {row_number}: {message}')
+    
+    return redirect('inventory:stock_take_detail', pk=pk)
+
+
+@login_required
+def stock_take_scan(request, pk):
+    """বারকোড/SKU স্ক্যান"""
+    stock_take = get_object_or_404(StockTake, pk=pk, organization=request.user.organization, status='draft')
+    
+    if request.method == 'POST':
+        code = request.POST.get('code', '').strip()
+        try:
+            quantity = Decimal(request.POST.get('quantity') or 1)
+        except InvalidOperation:
+            quantity = Decimal('1')
+        product = scan(stock_take, code, quantity) if code else None
+        if product:
+            messages.success(request, f'{product.name}: +{quantity}')
+        else:
+            messages.error(request, f'পণ্য পাওয়া যায়নি: {code}')
+    
+    return redirect('inventory:stock_take_detail', pk=pk)
+
+
+@login_required
+def stock_take_post(request, pk):
+    """সব পার্থক্য স্টকে পোস্ট"""
+    stock_take = get_object_or_404(StockTake, pk=pk, organization=request.user.organization)
+    
+    if request.method == 'POST':
+        try:
+            adjusted = post_stock_take(stock_take, request.user)
+        except StockTakeError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f'স্টক গণনা পোস্ট হয়েছে! {adjusted} টি পণ্যের স্টক সমন্বয় করা হয়েছে।')
+    
+    return redirect('inventory:stock_take_detail', pk=pk)
+
+
+@login_required
+def stock_take_cancel(request, pk):
+    """স্টক গণনা বাতিল"""
+    stock_take = get_object_or_404(StockTake, pk=pk, organization=request.user.organization, status='draft')
+    if request.method == 'POST':
+        stock_take.status = 'cancelled'
+        stock_take.save()
+        messages.success(request, 'স্টক গণনা বাতিল হয়েছে!')
+    return redirect('inventory:stock_take_list')
+
+
+def _locations_enabled(request):
+    org = request.user.organization
+    if org is None or not org.has_multiple_locations():
+        messages.error(request, 'একাধিক লোকেশন আপনার প্ল্যানে নেই!')
+        return False
+    return True
+
+
+@login_required
+def location_list(request):
+    """লোকেশন (শাখা) তালিকা"""
+    if not _locations_enabled(request):
+        return redirect('inventory:stock_list')
+    org = request.user.organization
+    main = locations.main_location(org)
+    
+    if request.method == 'POST':
+        name = request.POST.get('name', '').strip()
+        if name:
+            Location.objects.create(organization=org, name=name, address=request.POST.get('address', ''))
+            messages.success(request, f'লোকেশন "{name}" যোগ হয়েছে!')
+        return redirect('inventory:location_list')
+    
+    branches = Location.objects.filter(organization=org, is_main=False).annotate(
+        product_count=Count('stocks', filter=Q(stocks__quantity__gt=0)),
+        total_quantity=Coalesce(Sum('stocks__quantity'), Decimal('0'), output_field=DecimalField()),
+    )
+    totals = Stock.objects.filter(organization=org).aggregate(
+        total=Coalesce(Sum('quantity'), Decimal('0'), output_field=DecimalField()),
+        branches=Coalesce(Sum('branch_quantity'), Decimal('0'), output_field=DecimalField()),
+    )
+    context = {
+        'main': main,
+        'main_quantity': totals['total'] - totals['branches'],
+        'total_quantity': totals['total'],
+        'branches': branches,
+    }
+    return render(request, 'inventory/location_list.html', context)
+
+
+@login_required
+def location_detail(request, pk):
+    """একটি শাখার স্টক"""
+    if not _locations_enabled(request):
+        return redirect('inventory:stock_list')
+    location = get_object_or_404(Location, pk=pk, organization=request.user.organization)
+    if location.is_main:
+        return redirect('inventory:stock_list')
+    
+    stocks = LocationStock.objects.filter(location=location, quantity__gt=0).select_related('product').order_by(
+        'product__name'
+    )
+    return render(request, 'inventory/location_detail.html', {'location': location, 'stocks': stocks})
+
+
+@login_required
+def transfer_list(request):
+    """স্টক স্থানান্তর তালিকা"""
+    if not _locations_enabled(request):
+        return redirect('inventory:stock_list')
+    org = request.user.organization
+    
+    if request.method == 'POST':
+        from_location = get_object_or_404(Location, pk=request.POST.get('from_location'), organization=org)
+        to_location = get_object_or_404(Location, pk=request.POST.get('to_location'), organization=org)
+        if from_location == to_location:
+            messages.error(request, 'একই লোকেশনে স্থানান্তর করা যায় না!')
+            return redirect('inventory:transfer_list')
+        transfer = StockTransfer.objects.create(
+            organization=org,
+            from_location=from_location,
+            to_location=to_location,
+            notes=request.POST.get('notes', ''),
+            created_by=request.user,
+        )
+        return redirect('inventory:transfer_detail', pk=transfer.pk)
+    
+    locations.main_location(org)
+    transfers = StockTransfer.objects.filter(organization=org).select_related(
+        'from_location', 'to_location', 'created_by'
+    ).annotate(item_count=Count('items'))
+    context = {
+        'transfers': transfers[:100],
+        'locations': Location.objects.filter(organization=org, is_active=True),
+    }
+    return render(request, 'inventory/transfer_list.html', context)
+
+
+@login_required
+def transfer_detail(request, pk):
+    """স্থানান্তর বিস্তারিত; POST adds an item by SKU/barcode"""
+    if not _locations_enabled(request):
+        return redirect('inventory:stock_list')
+    transfer = get_object_or_404(
+        StockTransfer.objects.select_related('from_location', 'to_location'),
+        pk=pk, organization=request.user.organization,
+    )
+    
+    if request.method == 'POST' and transfer.status == 'draft':
+        code = request.POST.get('code', '').strip()
+        product = find_product(transfer.organization, code) if code else None
+        try:
+            quantity = Decimal(request.POST.get('quantity') or 1)
+        except InvalidOperation:
+            quantity = Decimal('0')
+        if product is None:
+            messages.error(request, f'পণ্য পাওয়া যায়নি: {code}')
+        elif quantity <= 0:
+            messages.error(request, 'সঠিক পরিমাণ দিন!')
+        else:
+            StockTransferItem.objects.update_or_create(
+                transfer=transfer, product=product, defaults={'quantity': quantity}
+            )
+        return redirect('inventory:transfer_detail', pk=pk)
+    
+    items = list(transfer.items.select_related('product').order_by('product__name'))
+    if transfer.status == 'draft':
+        available = locations.quantities_at(transfer.from_location, [item.product_id for item in items])
+        for item in items:
+            item.available = available[item.product_id]
+    return render(request, 'inventory/transfer_detail.html', {'transfer': transfer, 'items': items})
+
+
+@login_required
+def transfer_complete(request, pk):
+    """স্থানান্তর সম্পন্ন"""
+    transfer = get_object_or_404(StockTransfer, pk=pk, organization=request.user.organization)
+    
+    if request.method == 'POST' and _locations_enabled(request):
+        try:
+            moved = locations.complete_transfer(transfer, request.user)
+        except locations.TransferError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f'স্থানান্তর সম্পন্ন! {moved} টি পণ্য সরানো হয়েছে।')
+    
+    return redirect('inventory:transfer_detail', pk=pk)
+
+
+@login_required
+def transfer_cancel(request, pk):
+    """স্থানান্তর বাতিল"""
+    transfer = get_object_or_404(StockTransfer, pk=pk, organization=request.user.organization, status='draft')
+    if request.method == 'POST':
+        transfer.status = 'cancelled'
+        transfer.save()
+        messages.success(request, 'স্থানান্তর বাতিল হয়েছে!')
+    return redirect('inventory:transfer_list')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, GSMType, PaperSize, Unit, Product
+from .models import Category, GSMType, PaperSize, Unit, Product, SkuCounter
 
 
 @admin.register(Category)
@@ -31,3 +31,10 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = ['category', 'gsm', 'size', 'is_active']
     search_fields = ['name', 'sku', 'barcode']
     readonly_fields = ['sku']
+
+
+@admin.register(SkuCounter)
+class SkuCounterAdmin(admin.ModelAdmin):
+    list_display = ['organization', 'prefix', 'last_number']
+    list_filter = ['organization']
+    search_fields = ['prefix']
@@ -0,0 +1,346 @@
+"""
+Excel/CSV থেকে বাল্ক পণ্য ইমপোর্ট
+Rows are read in streaming mode, validated against in-memory lookup tables and
+upserted in batches together with their initial stock.
+"""
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Q
+from openpyxl import load_workbook
+
+from tenants import quota
+from .models import Category, GSMType, PaperSize, Unit, Product, SkuCounter
+
+BATCH_SIZE = 1000
+
+COLUMNS = [
+    'name', 'sku', 'barcode', 'category', 'gsm', 'size', 'unit',
+    'buying_price', 'selling_price', 'initial_stock', 'reorder_level', 'description',
+]
+
+PRODUCT_UPDATE_FIELDS = [
+    'name', 'barcode', 'category', 'gsm', 'size', 'unit',
+    'buying_price', 'selling_price', 'description', 'updated_at',
+]
+
+# Optional columns -> Product attribute; a blank or missing cell keeps an existing product's value
+OPTIONAL_FIELDS = {
+    'barcode': 'barcode',
+    'category': 'category_id',
+    'gsm': 'gsm_id',
+    'size': 'size_id',
+    'unit': 'unit_id',
+    'description': 'description',
+}
+
+
+class ImportResult:
+    """ইমপোর্টের ফলাফল"""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.errors = []  # (row_number, message)
+
+    def add_error(self, row_number, message):
+        self.errors.append((row_number, message))
+
+    @property
+    def total(self):
+        return self.created + self.updated
+
+
+def read_rows(uploaded_file, columns=COLUMNS, required='name'):
+    """Yield (row_number, dict) from an .xlsx or .csv upload without loading it whole"""
+    name = uploaded_file.name.lower()
+    if name.endswith('.xlsx'):
+        wb = load_workbook(uploaded_file, read_only=True, data_only=True)
+        rows = wb.active.iter_rows(values_only=True)
+    elif name.endswith('.csv'):
+        rows = csv.reader(io.TextIOWrapper(uploaded_file, encoding='utf-8-sig'))
+    else:
+        raise ValueError('শুধুমাত্র .xlsx অথবা .csv ফাইল সমর্থিত')
+
+    header = next(rows, None)
+    if not header:
+        return
+    keys = [str(h or '').strip().lower().replace(' ', '_') for h in header]
+    if required not in keys:
+        raise ValueError(f"ফাইলে '{required}' কলাম নেই")
+
+    for row_number, values in enumerate(rows, start=2):
+        if not values or all(v in (None, '') for v in values):
+            continue
+        yield row_number, {
+            key: ('' if value is None else str(value).strip())
+            for key, value in zip(keys, values)
+            if key in columns
+        }
+
+
+class ReferenceLookup:
+    """ক্যাটাগরি/GSM/সাইজ/একক নাম থেকে id (একবার লোড, তারপর মেমোরিতে)"""
+
+    def __init__(self, organization):
+        # Shop's own categories win over global ones with the same name
+        categories = Category.objects.filter(
+            Q(organization=organization) | Q(organization__isnull=True), is_active=True
+        ).values_list('pk', 'name', 'organization_id')
+        self.categories = {}
+        for pk, name, org_id in sorted(categories, key=lambda c: c[2] is not None):
+            self.categories[name.lower()] = pk
+        self.gsm = dict(GSMType.objects.values_list('value', 'pk'))
+        self.sizes = {name.lower(): pk for pk, name in PaperSize.objects.values_list('pk', 'name')}
+        self.units = {}
+        for pk, name, short_name in Unit.objects.values_list('pk', 'name', 'short_name'):
+            self.units[short_name.lower()] = pk
+            self.units[name.lower()] = pk
+
+    def category(self, value):
+        return self.categories.get(value.lower())
+
+    def gsm_type(self, value):
+        digits = value.lower().replace('gsm', '').strip()
+        try:
+            return self.gsm.get(int(float(digits)))
+        except (ValueError, OverflowError):
+            # 'nan' and 'inf' parse as floats but are no GSM
+            return None
+
+    def size(self, value):
+        return self.sizes.get(value.lower())
+
+    def unit(self, value):
+        return self.units.get(value.lower())
+
+
+def _decimal(value, default=None, field=None):
+    """A non-negative finite number that fits `field` (a DecimalField), else None"""
+    if value == '':
+        return default
+    try:
+        number = Decimal(value.replace(',', ''))
+        if not number.is_finite() or number < 0:
+            return None
+        if field is not None:
+            number = number.quantize(Decimal(1).scaleb(-field.decimal_places))
+            if number.adjusted() >= field.max_digits - field.decimal_places:
+                return None
+    except InvalidOperation:
+        return None
+    return number
+
+
+class ProductImporter:
+    """পণ্য ইমপোর্ট পাইপলাইন"""
+
+    def __init__(self, organization, user=None, batch_size=BATCH_SIZE):
+        self.organization = organization
+        self.user = user
+        self.batch_size = batch_size
+        self.lookup = ReferenceLookup(organization)
+        self.result = ImportResult()
+        self.seen_skus = set()
+        self.category_names = {pk: name for name, pk in self.lookup.categories.items()}
+
+        from inventory.models import Stock
+        # Columns whose values must fit the database field they end up in
+        self.fields = {
+            'buying_price': Product._meta.get_field('buying_price'),
+            'selling_price': Product._meta.get_field('selling_price'),
+            'initial_stock': Stock._meta.get_field('quantity'),
+            'reorder_level': Stock._meta.get_field('reorder_level'),
+        }
+
+        # Read from the shop's usage counter; each batch reserves its new products (tenants.quota)
+        plan = organization.plan if organization else None
+        if plan:
+            self.remaining = plan.max_products - organization.get_current_product_count()
+        else:
+            self.remaining = None
+
+    def validate(self, row_number, row):
+        """একটি সারি যাচাই; ভুল হলে None"""
+        errors = []
+        name = row.get('name', '')
+        if not name:
+            errors.append('নাম আবশ্যক')
+
+        refs = {}
+        for field, resolve in (('category', self.lookup.category), ('gsm', self.lookup.gsm_type),
+                               ('size', self.lookup.size), ('unit', self.lookup.unit)):
+            value = row.get(field, '')
+            refs[field] = resolve(value) if value else None
+            if value and refs[field] is None:
+                errors.append(f"অজানা {field}: {value}")
+
+        buying_price = _decimal(row.get('buying_price', ''), field=self.fields['buying_price'])
+        selling_price = _decimal(row.get('selling_price', ''), field=self.fields['selling_price'])
+        initial_stock = _decimal(row.get('initial_stock', ''), Decimal('0'), self.fields['initial_stock'])
+        reorder_level = _decimal(row.get('reorder_level', ''), Decimal('10'), self.fields['reorder_level'])
+        for field, value in (('buying_price', buying_price), ('selling_price', selling_price),
+                             ('initial_stock', initial_stock), ('reorder_level', reorder_level)):
+            if value is None:
+                errors.append(f"ভুল {field}")
+
+        sku = row.get('sku', '')
+        if sku:
+            if sku in self.seen_skus:
+                errors.append(f"ফাইলে SKU একাধিকবার আছে: {sku}")
+            self.seen_skus.add(sku)
+
+        if errors:
+            self.result.add_error(row_number, ', '.join(errors))
+            return None
+
+        return {
+            'row_number': row_number,
+            'product': Product(
+                organization=self.organization,
+                name=name[:200],
+                sku=sku,
+                barcode=row.get('barcode', '')[:50],
+                category_id=refs['category'],
+                gsm_id=refs['gsm'],
+                size_id=refs['size'],
+                unit_id=refs['unit'],
+                buying_price=buying_price,
+                selling_price=selling_price,
+                description=row.get('description', ''),
+                is_active=True,
+            ),
+            'initial_stock': initial_stock,
+            'reorder_level': reorder_level,
+            'keep': [attname for column, attname in OPTIONAL_FIELDS.items() if not row.get(column, '')],
+        }
+
+    def sku_prefix(self, product):
+        name = self.category_names.get(product.category_id)
+        return name[:3].upper() if name else 'PRD'
+
+    def flush(self, batch):
+        """একটি ব্যাচ upsert: পণ্য, স্টক ও প্রারম্ভিক মুভমেন্ট"""
+        from inventory import alerts as stock_alerts, valuation
+        from inventory.models import Stock, StockMovement
+
+        given_skus = [entry['product'].sku for entry in batch if entry['product'].sku]
+        existing = {
+            row['sku']: row for row in Product.objects.filter(
+                organization=self.organization, sku__in=given_skus
+            ).values('sku', *OPTIONAL_FIELDS.values())
+        }
+
+        accepted, needs_sku = [], {}
+        for entry in batch:
+            product = entry['product']
+            if product.sku and product.sku in existing:
+                entry['is_new'] = False
+                # The upsert writes every column; blank cells write back what is there
+                for attname in entry['keep']:
+                    setattr(product, attname, existing[product.sku][attname])
+            else:
+                if self.remaining is not None and self.remaining <= 0:
+                    self.result.add_error(entry['row_number'], 'প্ল্যানের সর্বোচ্চ পণ্য সংখ্যা পূর্ণ হয়েছে')
+                    continue
+                if self.remaining is not None:
+                    self.remaining -= 1
+                if not product.sku:
+                    needs_sku.setdefault(self.sku_prefix(product), []).append(product)
+                entry['is_new'] = True
+            accepted.append(entry)
+
+        # Hand-entered SKUs first so reserved ranges never collide with them
+        SkuCounter.observe(self.organization, [
+            entry['product'].sku for entry in accepted if entry['is_new'] and entry['product'].sku
+        ])
+        # One counter round trip per prefix reserves the whole range
+        for prefix, products in needs_sku.items():
+            for product, sku in zip(products, SkuCounter.allocate(self.organization, prefix, len(products))):
+                product.sku = sku
+
+        new = [entry for entry in accepted if entry['is_new']]
+        try:
+            quota.reserve(self.organization, 'products', len(new))
+        except quota.QuotaExceeded as e:
+            # Another upload or user took the last slots since the plan was read
+            for entry in new:
+                self.result.add_error(entry['row_number'], str(e))
+            accepted = [entry for entry in accepted if not entry['is_new']]
+            self.remaining = 0
+
+        if not accepted:
+            return
+
+        Product.objects.bulk_create(
+            [entry['product'] for entry in accepted],
+            update_conflicts=True,
+            unique_fields=['organization', 'sku'],
+            update_fields=PRODUCT_UPDATE_FIELDS,
+        )
+        ids = dict(Product.objects.filter(
+            organization=self.organization,
+            sku__in=[entry['product'].sku for entry in accepted]
+        ).values_list('sku', 'pk'))
+
+        stocks, movements = [], []
+        for entry in accepted:
+            product_id = ids[entry['product'].sku]
+            quantity = entry['initial_stock'] if entry['is_new'] else Decimal('0')
+            stocks.append(Stock(
+                organization=self.organization,
+                product_id=product_id,
+                quantity=quantity,
+                reorder_level=entry['reorder_level'],
+            ))
+            if entry['is_new'] and quantity > 0:
+                movements.append(StockMovement(
+                    organization=self.organization,
+                    product_id=product_id,
+                    movement_type='in',
+                    quantity=quantity,
+                    previous_quantity=0,
+                    new_quantity=quantity,
+                    unit_cost=entry['product'].buying_price,
+                    reference='IMPORT',
+                    notes='বাল্ক ইমপোর্ট: প্রারম্ভিক স্টক',
+                    created_by=self.user,
+                ))
+            if entry['is_new']:
+                self.result.created += 1
+            else:
+                self.result.updated += 1
+
+        # Existing products keep their quantity; only the reorder level is refreshed
+        Stock.objects.bulk_create(
+            stocks,
+            update_conflicts=True,
+            unique_fields=['product'],
+            update_fields=['reorder_level'],
+        )
+        # bulk_create skips post_save, so the opening stock is costed here
+        valuation.apply(StockMovement.objects.bulk_create(movements))
+        stock_alerts.refresh(
+            Stock.objects.filter(product_id__in=ids.values()).values_list('pk', flat=True)
+        )
+
+    def run(self, uploaded_file):
+        batch = []
+        with transaction.atomic():
+            for row_number, row in read_rows(uploaded_file):
+                entry = self.validate(row_number, row)
+                if entry:
+                    batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    self.flush(batch)
+                    batch = []
+            if batch:
+                self.flush(batch)
+        return self.result
+
+
+def import_products(uploaded_file, organization, user=None):
+    """ফাইল থেকে পণ্য ইমপোর্ট করে ImportResult রিটার্ন করে"""
+    return ProductImporter(organization, user).run(uploaded_file)
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:48
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_sku_counters(apps, schema_editor):
+    """Start every shop's counters after the SKUs it already uses"""
+    Product = apps.get_model('products', 'Product')
+    SkuCounter = apps.get_model('products', 'SkuCounter')
+    pattern = re.compile(r"^(.{1,20})-(\d+)$")
+
+    highest = {}
+    for organization_id, sku in Product.objects.values_list('organization_id', 'sku').iterator():
+        match = pattern.match(sku or '')
+        if match:
+            key = (organization_id, match.group(1))
+            highest[key] = max(highest.get(key, 0), int(match.group(2)))
+
+    SkuCounter.objects.bulk_create([
+        SkuCounter(organization_id=organization_id, prefix=prefix, last_number=number)
+        for (organization_id, prefix), number in highest.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_category_organization_product_organization'),
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkuCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=20, verbose_name='প্রিফিক্স')),
+                ('last_number', models.PositiveIntegerField(default=0, verbose_name='শেষ নম্বর')),
+            ],
+            options={
+                'verbose_name': 'SKU কাউন্টার',
+                'verbose_name_plural': 'SKU কাউন্টার সমূহ',
+            },
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='sku',
+            field=models.CharField(blank=True, max_length=50, verbose_name='SKU কোড'),
+        ),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('organization', 'sku'), name='unique_product_sku_per_organization'),
+        ),
+        migrations.AddField(
+            model_name='skucounter',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sku_counters', to='tenants.organization'),
+        ),
+        migrations.AddConstraint(
+            model_name='skucounter',
+            constraint=models.UniqueConstraint(fields=('organization', 'prefix'), name='unique_sku_counter_per_organization'),
+        ),
+        migrations.RunPython(seed_sku_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:04
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def merge_duplicates(apps, schema_editor):
+    """Products and counters without a shop may have doubled up since 0003; keep one of each"""
+    Product = apps.get_model('products', 'Product')
+    SkuCounter = apps.get_model('products', 'SkuCounter')
+
+    counters = SkuCounter.objects.filter(organization__isnull=True)
+    for row in counters.values('prefix').annotate(n=Count('id'), last=Max('last_number')).filter(n__gt=1):
+        keep = counters.filter(prefix=row['prefix']).order_by('pk').first()
+        counters.filter(prefix=row['prefix']).exclude(pk=keep.pk).delete()
+        SkuCounter.objects.filter(pk=keep.pk).update(last_number=row['last'])
+
+    products = Product.objects.filter(organization__isnull=True)
+    for row in products.values('sku').annotate(n=Count('id')).filter(n__gt=1):
+        for product in products.filter(sku=row['sku']).order_by('pk')[1:]:
+            suffix = f"-{product.pk}"
+            Product.objects.filter(pk=product.pk).update(sku=row['sku'][:50 - len(suffix)] + suffix)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_sku_counter'),
+        ('tenants', '0003_usage_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(condition=models.Q(('organization__isnull', True)), fields=('sku',), name='unique_product_sku_without_organization'),
+        ),
+        migrations.AddConstraint(
+            model_name='skucounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('organization__isnull', True)), fields=('prefix',), name='unique_sku_counter_without_organization'),
+        ),
+    ]
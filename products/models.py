@@ -1,4 +1,6 @@
-from django.db import models
+import re
+
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
@@ -72,7 +74,7 @@ class Product(models.Model):
         null=True, blank=True, related_name='products'
     )
     name = models.CharField(max_length=200, verbose_name='পণ্যের নাম')
-    sku = models.CharField(max_length=50, unique=True, blank=True, verbose_name='SKU কোড')
+    sku = models.CharField(max_length=50, blank=True, verbose_name='SKU কোড')
     barcode = models.CharField(max_length=50, blank=True, verbose_name='বারকোড')
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='products', verbose_name='ক্যাটাগরি')
     gsm = models.ForeignKey(GSMType, on_delete=models.SET_NULL, null=True, blank=True, related_name='products', verbose_name='GSM')
@@ -100,6 +102,14 @@ class Product(models.Model):
         verbose_name = 'পণ্য'
         verbose_name_plural = 'পণ্যসমূহ'
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'sku'], name='unique_product_sku_per_organization'),
+            # NULLs never collide in the constraint above; products without a shop share one SKU space
+            models.UniqueConstraint(
+                fields=['sku'], condition=models.Q(organization__isnull=True),
+                name='unique_product_sku_without_organization',
+            ),
+        ]
     
     def __str__(self):
         parts = [self.name]
@@ -111,19 +121,15 @@ class Product(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.sku:
-            # Auto generate SKU
-            prefix = self.category.name[:3].upper() if self.category else 'PRD'
-            last_product = Product.objects.filter(sku__startswith=prefix).order_by('-id').first()
-            if last_product and last_product.sku:
-                try:
-                    last_num = int(last_product.sku.split('-')[-1])
-                    self.sku = f"{prefix}-{last_num + 1:04d}"
-                except:
-                    self.sku = f"{prefix}-0001"
-            else:
-                self.sku = f"{prefix}-0001"
+            # Auto generate SKU from the shop's counter
+            self.sku = SkuCounter.allocate(self.organization, self.sku_prefix())[0]
+        elif self._state.adding:
+            SkuCounter.observe(self.organization, [self.sku])
         super().save(*args, **kwargs)
     
+    def sku_prefix(self):
+        return self.category.name[:3].upper() if self.category else 'PRD'
+    
     @property
     def profit_margin(self):
         """লাভের পরিমাণ"""
@@ -135,3 +141,81 @@ class Product(models.Model):
         if self.buying_price > 0:
             return ((self.selling_price - self.buying_price) / self.buying_price) * 100
         return 0
+
+
+SKU_PATTERN = re.compile(r"^(.{1,20})-(\d+)$")
+
+
+class SkuCounter(models.Model):
+    """প্রতিটি দোকান ও prefix-এর SKU কাউন্টার"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='sku_counters'
+    )
+    prefix = models.CharField(max_length=20, verbose_name='প্রিফিক্স')
+    last_number = models.PositiveIntegerField(default=0, verbose_name='শেষ নম্বর')
+    
+    class Meta:
+        verbose_name = 'SKU কাউন্টার'
+        verbose_name_plural = 'SKU কাউন্টার সমূহ'
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'prefix'], name='unique_sku_counter_per_organization'),
+            models.UniqueConstraint(
+                fields=['prefix'], condition=models.Q(organization__isnull=True),
+                name='unique_sku_counter_without_organization',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.prefix}: {self.last_number}"
+    
+    @staticmethod
+    def format(prefix, number):
+        return f"{prefix}-{number:04d}"
+    
+    @classmethod
+    def highest_existing(cls, organization, prefix):
+        """Seed value: highest well-formed SKU number already used by the shop"""
+        pattern = re.compile(rf"^{re.escape(prefix)}-(\d+)$")
+        numbers = (
+            pattern.match(sku)
+            for sku in Product.objects.filter(
+                organization=organization, sku__startswith=f"{prefix}-"
+            ).values_list('sku', flat=True).iterator()
+        )
+        return max((int(m.group(1)) for m in numbers if m), default=0)
+    
+    @classmethod
+    def observe(cls, organization, skus):
+        """Hand-entered SKUs in counter format push the counter past them"""
+        highest = {}
+        for sku in skus:
+            match = SKU_PATTERN.match(sku)
+            if match:
+                prefix, number = match.group(1), int(match.group(2))
+                highest[prefix] = max(highest.get(prefix, 0), number)
+        for prefix, number in highest.items():
+            cls.ensure(organization, prefix)
+            cls.objects.filter(
+                organization=organization, prefix=prefix, last_number__lt=number
+            ).update(last_number=number)
+    
+    @classmethod
+    def ensure(cls, organization, prefix):
+        """Create the counter on first use, seeded from the shop's existing SKUs"""
+        if not cls.objects.filter(organization=organization, prefix=prefix).exists():
+            cls.objects.get_or_create(
+                organization=organization, prefix=prefix,
+                defaults={'last_number': cls.highest_existing(organization, prefix)},
+            )
+    
+    @classmethod
+    def allocate(cls, organization, prefix, count=1):
+        """count টি নতুন SKU রিজার্ভ করে (bulk import-এর জন্য একসাথে রেঞ্জ)"""
+        cls.ensure(organization, prefix)
+        with transaction.atomic():
+            counter = cls.objects.select_for_update().get(organization=organization, prefix=prefix)
+            start = counter.last_number + 1
+            counter.last_number += count
+            counter.save(update_fields=['last_number'])
+        return [cls.format(prefix, number) for number in range(start, start + count)]
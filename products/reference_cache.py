@@ -0,0 +1,143 @@
+"""
+রেফারেন্স টেবিল ক্যাশ (GSMType, PaperSize, Unit, Category)
+These tables change a few times a year, so each worker process keeps them in
+memory. A version number in the shared cache is bumped by signals on every
+change; workers compare it on access and reload when it moved.
+
+Cached instances are shared between requests: treat them as read-only.
+Categories are per shop, so only the most recently used CATEGORY_CACHE_SIZE
+shops are kept; the rest are reloaded (one query) when they come back.
+"""
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Category, GSMType, PaperSize, Unit, Product
+
+VERSION_KEY = 'products:reference_tables:version'
+CATEGORY_CACHE_SIZE = 256
+
+_state = {
+    'version': None,
+    'gsm': None,
+    'sizes': None,
+    'units': None,
+    'categories': OrderedDict(),  # organization_id -> (by_pk, active list), least recently used first
+}
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate():
+    """Signal handler target: every worker reloads on its next access"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, timeout=None)
+
+
+def _fresh():
+    version = current_version()
+    if _state['version'] != version:
+        _state.update({
+            'version': version,
+            'gsm': None,
+            'sizes': None,
+            'units': None,
+            'categories': OrderedDict(),
+        })
+    return _state
+
+
+def _table(key, queryset, state=None):
+    state = state or _fresh()
+    if state[key] is None:
+        state[key] = {obj.pk: obj for obj in queryset}
+    return state[key]
+
+
+def _gsm_map(state=None):
+    return _table('gsm', GSMType.objects.all(), state)
+
+
+def _size_map(state=None):
+    return _table('sizes', PaperSize.objects.all(), state)
+
+
+def _unit_map(state=None):
+    return _table('units', Unit.objects.all(), state)
+
+
+def _category_state(organization_id, state=None):
+    state = state or _fresh()
+    shops = state['categories']
+    if organization_id in shops:
+        shops.move_to_end(organization_id)
+    else:
+        by_pk = {
+            obj.pk: obj for obj in Category.objects.filter(
+                Q(organization_id=organization_id) | Q(organization__isnull=True)
+            )
+        }
+        active = [obj for obj in by_pk.values() if obj.is_active]
+        active.sort(key=lambda obj: obj.name)
+        shops[organization_id] = (by_pk, active)
+        if len(shops) > CATEGORY_CACHE_SIZE:
+            shops.popitem(last=False)
+    return shops[organization_id]
+
+
+def gsm_types():
+    """GSM তালিকা (মান অনুযায়ী)"""
+    return sorted(_gsm_map().values(), key=lambda obj: obj.value)
+
+
+def paper_sizes():
+    """সাইজ তালিকা (নাম অনুযায়ী)"""
+    return sorted(_size_map().values(), key=lambda obj: obj.name)
+
+
+def units():
+    """একক তালিকা"""
+    return list(_unit_map().values())
+
+
+def categories(organization):
+    """দোকানের ও গ্লোবাল সক্রিয় ক্যাটাগরি"""
+    return _category_state(organization.pk if organization else None)[1]
+
+
+def hydrate(products):
+    """Attach cached gsm/size/unit/category objects to products without joins"""
+    products = list(products)
+    # One version check per call, however many products
+    state = _fresh()
+    gsm, sizes, unit_map = _gsm_map(state), _size_map(state), _unit_map(state)
+    relations = (
+        (Product.gsm.field, 'gsm_id', gsm),
+        (Product.size.field, 'size_id', sizes),
+        (Product.unit.field, 'unit_id', unit_map),
+    )
+    category_field = Product.category.field
+    category_maps = {
+        organization_id: _category_state(organization_id, state)[0]
+        for organization_id in {product.organization_id for product in products if product.category_id is not None}
+    }
+
+    for product in products:
+        for field, attname, table in relations:
+            value = getattr(product, attname)
+            if value is not None and value in table:
+                field.set_cached_value(product, table[value])
+        if product.category_id is not None:
+            by_pk = category_maps[product.organization_id]
+            if product.category_id in by_pk:
+                category_field.set_cached_value(product, by_pk[product.category_id])
+    return products
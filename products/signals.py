@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Category, GSMType, PaperSize, Unit
+from . import reference_cache
+
+
+@receiver([post_save, post_delete], sender=GSMType)
+@receiver([post_save, post_delete], sender=PaperSize)
+@receiver([post_save, post_delete], sender=Unit)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_reference_cache(sender, **kwargs):
+    """রেফারেন্স টেবিল বদলালে সব ওয়ার্কারের ক্যাশ বাতিল"""
+    # After commit, so no worker reloads the old rows before the change is visible
+    transaction.on_commit(reference_cache.invalidate)
@@ -1,3 +1,78 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 
-# Create your tests here.
+from tenants.models import Organization, OrganizationUsage, SubscriptionPlan
+from . import reference_cache
+from .importer import ProductImporter, import_products
+from .models import Category, Product
+
+
+def upload(text):
+    return SimpleUploadedFile('products.csv', text.encode())
+
+
+class ProductImportTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name='s', slug='s', owner_name='o', email='s@example.com', phone='1')
+        self.category = Category.objects.create(organization=self.org, name='খাতা')
+        self.product = Product.objects.create(
+            organization=self.org, name='খাতা ১', sku='KHA-0001', category=self.category, barcode='123',
+            buying_price=Decimal('10'), selling_price=Decimal('15'), description='ruled', is_active=False,
+        )
+
+    def test_blank_cells_keep_existing_values(self):
+        result = import_products(upload(
+            'name,sku,category,barcode,buying_price,selling_price\n'
+            'খাতা ১,KHA-0001,,,11,16\n'
+        ), self.org)
+
+        self.assertEqual((result.updated, result.errors), (1, []))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.selling_price, Decimal('16'))
+        self.assertEqual(self.product.category, self.category)
+        self.assertEqual((self.product.barcode, self.product.description), ('123', 'ruled'))
+        self.assertFalse(self.product.is_active)
+
+    def test_filled_cells_overwrite(self):
+        import_products(upload(
+            'name,sku,barcode,buying_price,selling_price\n'
+            'খাতা ১,KHA-0001,999,11,16\n'
+        ), self.org)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.barcode, '999')
+
+    def test_slots_taken_during_the_upload_become_row_errors(self):
+        self.org.plan = SubscriptionPlan.objects.create(name='free', display_name='ফ্রি', max_products=3)
+        self.org.save()
+        importer = ProductImporter(self.org)
+        # Another user fills the plan after the importer read the usage
+        OrganizationUsage.objects.filter(organization=self.org).update(product_count=3)
+
+        result = importer.run(upload(
+            'name,sku,buying_price,selling_price\n'
+            'খাতা ১,KHA-0001,12,18\n'
+            'কলম,,5,8\n'
+        ))
+
+        self.assertEqual((result.created, result.updated), (0, 1))
+        self.assertEqual([row for row, message in result.errors], [3])
+        self.assertEqual(Product.objects.filter(organization=self.org).count(), 1)
+
+
+class ReferenceCacheTests(TestCase):
+    def test_category_cache_keeps_only_recent_shops(self):
+        shops = [
+            Organization.objects.create(name=slug, slug=slug, owner_name='o', email=f'{slug}@example.com', phone='1')
+            for slug in ('a', 'b', 'c')
+        ]
+        reference_cache.invalidate()
+
+        with mock.patch.object(reference_cache, 'CATEGORY_CACHE_SIZE', 2):
+            for shop in shops + [shops[1]]:
+                reference_cache.categories(shop)
+
+        self.assertEqual(list(reference_cache._state['categories']), [shops[2].pk, shops[1].pk])
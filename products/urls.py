@@ -6,6 +6,7 @@ app_name = 'products'
 urlpatterns = [
     path('', views.product_list, name='product_list'),
     path('add/', views.product_add, name='product_add'),
+    path('import/', views.product_import, name='product_import'),
     path('<int:pk>/', views.product_detail, name='product_detail'),
     path('<int:pk>/edit/', views.product_edit, name='product_edit'),
     path('<int:pk>/delete/', views.product_delete, name='product_delete'),
@@ -1,17 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.http import JsonResponse
 from django.db.models import Q
 
 from .models import Category, GSMType, PaperSize, Unit, Product
+from .importer import COLUMNS, import_products
+from . import reference_cache
 from inventory.models import Stock
+from tenants import quota
 
 
 @login_required
 def product_list(request):
     """পণ্য তালিকা"""
-    products = Product.objects.filter(is_active=True).select_related('category', 'gsm', 'size', 'unit')
+    products = Product.objects.filter(is_active=True).select_related('stock')
     
     # Search
     search = request.GET.get('search', '')
@@ -32,13 +36,10 @@ def product_list(request):
     if gsm_id:
         products = products.filter(gsm_id=gsm_id)
     
-    categories = Category.objects.filter(is_active=True)
-    gsm_types = GSMType.objects.all()
-    
     context = {
-        'products': products,
-        'categories': categories,
-        'gsm_types': gsm_types,
+        'products': reference_cache.hydrate(products),
+        'categories': reference_cache.categories(request.user.organization),
+        'gsm_types': reference_cache.gsm_types(),
         'search': search,
     }
     return render(request, 'products/product_list.html', context)
@@ -47,42 +48,80 @@ def product_list(request):
 @login_required
 def product_add(request):
     """নতুন পণ্য যোগ"""
+    org = request.user.organization
+    
+    # Check product limit for organization
+    if org and org.plan and not org.can_add_product():
+        messages.error(request, quota.MESSAGES['products'].format(limit=org.plan.max_products))
+        return redirect('products:product_list')
+    
     if request.method == 'POST':
-        product = Product.objects.create(
-            name=request.POST.get('name'),
-            category_id=request.POST.get('category') or None,
-            gsm_id=request.POST.get('gsm') or None,
-            size_id=request.POST.get('size') or None,
-            unit_id=request.POST.get('unit') or None,
-            buying_price=request.POST.get('buying_price', 0),
-            selling_price=request.POST.get('selling_price', 0),
-            barcode=request.POST.get('barcode', ''),
-            description=request.POST.get('description', ''),
-        )
-        
-        if request.FILES.get('image'):
-            product.image = request.FILES['image']
-            product.save()
-        
-        # Create stock entry
-        Stock.objects.create(
-            product=product,
-            quantity=request.POST.get('initial_stock', 0),
-            reorder_level=request.POST.get('reorder_level', 10),
-        )
+        try:
+            # The slot is taken with the product, so a failed create gives it back
+            with transaction.atomic():
+                quota.reserve(org, 'products')
+                product = Product.objects.create(
+                    organization=org,
+                    name=request.POST.get('name'),
+                    category_id=request.POST.get('category') or None,
+                    gsm_id=request.POST.get('gsm') or None,
+                    size_id=request.POST.get('size') or None,
+                    unit_id=request.POST.get('unit') or None,
+                    buying_price=request.POST.get('buying_price', 0),
+                    selling_price=request.POST.get('selling_price', 0),
+                    barcode=request.POST.get('barcode', ''),
+                    description=request.POST.get('description', ''),
+                )
+                
+                if request.FILES.get('image'):
+                    product.image = request.FILES['image']
+                    product.save()
+                
+                # Create stock entry
+                Stock.objects.create(
+                    organization=product.organization,
+                    product=product,
+                    quantity=request.POST.get('initial_stock', 0),
+                    reorder_level=request.POST.get('reorder_level', 10),
+                )
+        except quota.QuotaExceeded as e:
+            messages.error(request, str(e))
+            return redirect('products:product_list')
         
         messages.success(request, f'পণ্য "{product.name}" সফলভাবে যোগ হয়েছে!')
         return redirect('products:product_list')
     
     context = {
-        'categories': Category.objects.filter(is_active=True),
-        'gsm_types': GSMType.objects.all(),
-        'sizes': PaperSize.objects.all(),
-        'units': Unit.objects.all(),
+        'categories': reference_cache.categories(request.user.organization),
+        'gsm_types': reference_cache.gsm_types(),
+        'sizes': reference_cache.paper_sizes(),
+        'units': reference_cache.units(),
     }
     return render(request, 'products/product_form.html', context)
 
 
+@login_required
+def product_import(request):
+    """Excel/CSV থেকে বাল্ক পণ্য ইমপোর্ট"""
+    result = None
+    
+    if request.method == 'POST' and request.FILES.get('file'):
+        try:
+            result = import_products(request.FILES['file'], request.user.organization, request.user)
+        except (ValueError, quota.QuotaExceeded) as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f'{result.created} টি নতুন পণ্য যোগ ও {result.updated} টি পণ্য আপডেট হয়েছে!')
+            if result.errors:
+                messages.warning(request, f'{len(result.errors)} টি সারিতে ভুল আছে।')
+    
+    context = {
+        'result': result,
+        'columns': COLUMNS,
+    }
+    return render(request, 'products/product_import.html', context)
+
+
 @login_required
 def product_detail(request, pk):
     """পণ্য বিস্তারিত"""
@@ -121,10 +160,10 @@ def product_edit(request, pk):
     
     context = {
         'product': product,
-        'categories': Category.objects.filter(is_active=True),
-        'gsm_types': GSMType.objects.all(),
-        'sizes': PaperSize.objects.all(),
-        'units': Unit.objects.all(),
+        'categories': reference_cache.categories(request.user.organization),
+        'gsm_types': reference_cache.gsm_types(),
+        'sizes': reference_cache.paper_sizes(),
+        'units': reference_cache.units(),
     }
     return render(request, 'products/product_form.html', context)
 
@@ -181,10 +220,10 @@ def product_search(request):
     products = Product.objects.filter(
         Q(name__icontains=query) | Q(sku__icontains=query) | Q(barcode__icontains=query),
         is_active=True
-    ).select_related('stock', 'unit')[:20]
+    ).select_related('stock')[:20]
     
     data = []
-    for p in products:
+    for p in reference_cache.hydrate(products):
         stock_qty = p.stock.quantity if hasattr(p, 'stock') else 0
         data.append({
             'id': p.id,
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Supplier, Purchase, PurchaseItem, SupplierPayment
+from .models import Supplier, Purchase, PurchaseItem, SupplierPayment, PurchaseReturn, PurchaseReturnItem, ProductLastPurchase, SupplierProductPrice, PurchaseOrder, PurchaseOrderItem
 
 
 class PurchaseItemInline(admin.TabularInline):
@@ -8,6 +8,11 @@ class PurchaseItemInline(admin.TabularInline):
     readonly_fields = ['total']
 
 
+class PurchaseOrderItemInline(admin.TabularInline):
+    model = PurchaseOrderItem
+    extra = 0
+
+
 class SupplierPaymentInline(admin.TabularInline):
     model = SupplierPayment
     extra = 0
@@ -40,3 +45,38 @@ class PurchaseItemAdmin(admin.ModelAdmin):
 class SupplierPaymentAdmin(admin.ModelAdmin):
     list_display = ['purchase', 'amount', 'payment_method', 'paid_by', 'payment_date']
     list_filter = ['payment_method', 'payment_date']
+
+
+class PurchaseReturnItemInline(admin.TabularInline):
+    model = PurchaseReturnItem
+    extra = 0
+    readonly_fields = ['purchase_item', 'product', 'quantity', 'unit_cost', 'total']
+
+
+@admin.register(PurchaseReturn)
+class PurchaseReturnAdmin(admin.ModelAdmin):
+    list_display = ['return_number', 'purchase', 'total_amount', 'credit_amount', 'refund_amount', 'created_at']
+    list_filter = ['refund_method', 'created_at']
+    search_fields = ['return_number', 'purchase__purchase_number']
+    readonly_fields = ['return_number', 'total_amount', 'credit_amount', 'refund_amount']
+    inlines = [PurchaseReturnItemInline]
+    date_hierarchy = 'created_at'
+
+
+@admin.register(ProductLastPurchase)
+class ProductLastPurchaseAdmin(admin.ModelAdmin):
+    list_display = ['product', 'supplier', 'unit_price', 'purchased_at']
+    search_fields = ['product__name', 'supplier__name']
+
+
+@admin.register(SupplierProductPrice)
+class SupplierProductPriceAdmin(admin.ModelAdmin):
+    list_display = ['product', 'supplier', 'last_price', 'min_price', 'average_price', 'purchase_count', 'last_purchased_at']
+    search_fields = ['product__name', 'supplier__name']
+
+
+@admin.register(PurchaseOrder)
+class PurchaseOrderAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'supplier', 'status', 'created_by', 'created_at']
+    list_filter = ['status', 'created_at']
+    inlines = [PurchaseOrderItemInline]
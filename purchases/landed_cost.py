@@ -0,0 +1,92 @@
+"""
+ল্যান্ডেড কস্ট বণ্টন
+Shipping and tax are added to - and the discount taken off - a purchase's
+lines in proportion to their value, weight or quantity, giving each line the
+unit cost the goods really cost on the shelf. That landed cost is what the
+stock movement is costed at (so valuation and margins include freight) and
+becomes the product's buying price.
+
+A whole purchase is allocated in one NumPy pass in whole paisa; the rounding
+remainder goes to the lines with the largest fractions, so the shares always
+add up to the charges exactly. Weight per unit is GSM x sheet area
+(g/m2 x m2); products without a GSM or size weigh nothing, and a purchase
+with nothing to weigh falls back to value.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.utils import timezone
+
+from products.models import Product
+from stationery_shop.db import bulk_update_columns
+
+BASES = ['value', 'weight', 'quantity']
+COST_PLACES = Decimal('0.0001')
+MM2_PER_M2 = Decimal('1000000')
+
+
+def unit_weights(product_ids):
+    """{product_id: grams per unit} from GSM and paper size"""
+    rows = Product.objects.filter(pk__in=product_ids).values_list(
+        'pk', 'gsm__value', 'size__width_mm', 'size__height_mm'
+    )
+    return {
+        pk: gsm * width * height / MM2_PER_M2 if gsm and width and height else Decimal('0')
+        for pk, gsm, width, height in rows
+    }
+
+
+def allocate(charges, basis):
+    """Split `charges` (Decimal) over lines by the weights in `basis`; returns paisa per line (int64)"""
+    basis = np.asarray(basis, dtype=np.float64)
+    total = int((charges * 100).to_integral_value())
+    if not total or not len(basis) or basis.sum() <= 0:
+        return np.zeros(len(basis), dtype=np.int64)
+
+    exact = abs(total) * basis / basis.sum()
+    shares = np.floor(exact).astype(np.int64)
+    # Largest remainder: the paisa lost to flooring go to the biggest fractions
+    short = abs(total) - int(shares.sum())
+    if short:
+        shares[np.argsort(shares - exact, kind='stable')[:short]] += 1
+    return shares if total > 0 else -shares
+
+
+def landed_costs(purchase, lines):
+    """lines: [(product_id, quantity, unit_price)] -> landed unit cost per line"""
+    if not lines:
+        return []
+    charges = (
+        Decimal(str(purchase.shipping_cost)) + Decimal(str(purchase.tax_amount))
+        - Decimal(str(purchase.discount_amount))
+    )
+    quantities = np.array([float(quantity) for product_id, quantity, price in lines])
+    values = np.array([float(quantity * price) for product_id, quantity, price in lines])
+
+    basis = values
+    if purchase.allocation_basis == 'quantity':
+        basis = quantities
+    elif purchase.allocation_basis == 'weight':
+        weights = unit_weights({product_id for product_id, quantity, price in lines})
+        by_weight = quantities * np.array([float(weights.get(product_id, 0)) for product_id, q, p in lines])
+        if by_weight.sum() > 0:
+            basis = by_weight
+    if basis.sum() <= 0:
+        basis = quantities
+
+    shares = allocate(charges, basis)
+    return [
+        max((quantity * price + Decimal(int(share)) / 100) / quantity, Decimal('0')).quantize(COST_PLACES)
+        for (product_id, quantity, price), share in zip(lines, shares)
+    ]
+
+
+def update_buying_prices(lines, costs):
+    """Set each received product's buying price to its latest landed cost, in one statement"""
+    latest = {product_id: cost for (product_id, quantity, price), cost in zip(lines, costs)}
+    now = timezone.now()
+    bulk_update_columns(
+        Product,
+        [Product(pk=pk, buying_price=cost.quantize(Decimal('0.01')), updated_at=now) for pk, cost in latest.items()],
+        ['buying_price', 'updated_at'],
+    )
@@ -0,0 +1,42 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from products.models import Product
+from purchases.models import Purchase
+from purchases.receiving import receive_items
+from tenants.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Benchmark goods receipt (receive_items) on a shop\'s products; every run is rolled back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', required=True, help='Organization slug')
+        parser.add_argument('--lines', type=int, nargs='+', default=[200, 1000], help='Receipt sizes to time')
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.get(slug=options['org'])
+        user = User.objects.filter(organization=organization).first()
+        product_ids = list(
+            Product.objects.filter(organization=organization).values_list('pk', flat=True)[:max(options['lines'])]
+        )
+        if not product_ids:
+            raise CommandError('The shop has no products')
+
+        for size in options['lines']:
+            lines = [(product_ids[n % len(product_ids)], Decimal('5'), Decimal('12.50')) for n in range(size)]
+            with transaction.atomic():
+                purchase = Purchase.objects.create(organization=organization, created_by=user)
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    receive_items(purchase, lines, user)
+                    elapsed = time.perf_counter() - start
+                self.stdout.write(f'{size:>6} lines  {elapsed:.3f}s  {len(queries)} queries')
+                transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Done!'))
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:54
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_last_purchase(apps, schema_editor):
+    """Build the last supplier/price index from existing purchase history"""
+    PurchaseItem = apps.get_model('purchases', 'PurchaseItem')
+    ProductLastPurchase = apps.get_model('purchases', 'ProductLastPurchase')
+
+    last = {}
+    rows = PurchaseItem.objects.order_by('purchase__purchase_date', 'id').values_list(
+        'product_id', 'product__organization_id', 'purchase__supplier_id', 'purchase_id',
+        'unit_price', 'purchase__purchase_date',
+    )
+    for row in rows.iterator(chunk_size=5000):
+        last[row[0]] = row
+
+    ProductLastPurchase.objects.bulk_create([
+        ProductLastPurchase(
+            product_id=product_id, organization_id=org_id, supplier_id=supplier_id,
+            purchase_id=purchase_id, unit_price=unit_price, purchased_at=purchased_at,
+        )
+        for product_id, org_id, supplier_id, purchase_id, unit_price, purchased_at in last.values()
+    ], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_sku_counter'),
+        ('purchases', '0002_purchase_organization_supplier_organization'),
+        ('tenants', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductLastPurchase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='শেষ একক মূল্য')),
+                ('purchased_at', models.DateTimeField(verbose_name='ক্রয়ের তারিখ')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='product_last_purchases', to='tenants.organization')),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='last_purchase', to='products.product', verbose_name='পণ্য')),
+                ('purchase', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='purchases.purchase', verbose_name='ক্রয়')),
+                ('supplier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='purchases.supplier', verbose_name='সাপ্লায়ার')),
+            ],
+            options={
+                'verbose_name': 'শেষ ক্রয় মূল্য',
+                'verbose_name_plural': 'শেষ ক্রয় মূল্য সমূহ',
+            },
+        ),
+        migrations.CreateModel(
+            name='PurchaseOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('draft', 'ড্রাফট'), ('received', 'গৃহীত'), ('cancelled', 'বাতিল')], default='draft', max_length=20, verbose_name='স্ট্যাটাস')),
+                ('notes', models.TextField(blank=True, verbose_name='নোট')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='তৈরি করেছেন')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='purchase_orders', to='tenants.organization')),
+                ('purchase', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order', to='purchases.purchase', verbose_name='ক্রয়')),
+                ('supplier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchase_orders', to='purchases.supplier', verbose_name='সাপ্লায়ার')),
+            ],
+            options={
+                'verbose_name': 'ক্রয় অর্ডার',
+                'verbose_name_plural': 'ক্রয় অর্ডার সমূহ',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PurchaseOrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))], verbose_name='পরিমাণ')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='একক মূল্য')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='purchases.purchaseorder', verbose_name='অর্ডার')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='products.product', verbose_name='পণ্য')),
+            ],
+            options={
+                'verbose_name': 'ক্রয় অর্ডার আইটেম',
+                'verbose_name_plural': 'ক্রয় অর্ডার আইটেম সমূহ',
+            },
+        ),
+        migrations.RunPython(backfill_last_purchase, migrations.RunPython.noop),
+    ]
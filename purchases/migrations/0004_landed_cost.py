@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchases', '0003_purchase_orders_and_last_price_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='allocation_basis',
+            field=models.CharField(choices=[('value', 'মূল্য অনুযায়ী'), ('weight', 'ওজন অনুযায়ী (GSM × সাইজ)'), ('quantity', 'পরিমাণ অনুযায়ী')], default='value', max_length=10, verbose_name='খরচ বণ্টনের ভিত্তি'),
+        ),
+        migrations.AddField(
+            model_name='purchaseitem',
+            name='landed_unit_cost',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=14, null=True, verbose_name='ল্যান্ডেড একক খরচ'),
+        ),
+    ]
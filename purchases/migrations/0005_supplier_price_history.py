@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_supplier_prices(apps, schema_editor):
+    """Build the per-supplier price history from existing purchase lines"""
+    PurchaseItem = apps.get_model('purchases', 'PurchaseItem')
+    SupplierProductPrice = apps.get_model('purchases', 'SupplierProductPrice')
+
+    history = {}
+    rows = PurchaseItem.objects.filter(purchase__supplier__isnull=False).order_by(
+        'purchase__purchase_date', 'id'
+    ).values_list(
+        'purchase__supplier_id', 'product_id', 'purchase__organization_id', 'purchase_id',
+        'purchase__purchase_date', 'quantity', 'unit_price',
+    )
+    for supplier_id, product_id, org_id, purchase_id, purchased_at, quantity, price in rows.iterator(chunk_size=5000):
+        row = history.get((supplier_id, product_id))
+        if row is None:
+            row = history[(supplier_id, product_id)] = SupplierProductPrice(
+                supplier_id=supplier_id, product_id=product_id, organization_id=org_id,
+                min_price=price, total_quantity=0, total_amount=0, purchase_count=0,
+            )
+        if row.last_purchase_id != purchase_id:
+            row.purchase_count += 1
+        row.last_purchase_id = purchase_id
+        row.last_price = price
+        row.last_purchased_at = purchased_at
+        row.min_price = min(row.min_price, price)
+        row.total_quantity += quantity
+        row.total_amount += quantity * price
+
+    SupplierProductPrice.objects.bulk_create(history.values(), batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_sku_counter'),
+        ('purchases', '0004_landed_cost'),
+        ('tenants', '0002_organization_valuation_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierProductPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='শেষ একক মূল্য')),
+                ('last_purchased_at', models.DateTimeField(verbose_name='শেষ ক্রয়ের তারিখ')),
+                ('min_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='সর্বনিম্ন একক মূল্য')),
+                ('total_quantity', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='মোট পরিমাণ')),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='মোট মূল্য')),
+                ('purchase_count', models.PositiveIntegerField(default=0, verbose_name='ক্রয় সংখ্যা')),
+                ('last_purchase', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='purchases.purchase', verbose_name='শেষ ক্রয়')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='supplier_product_prices', to='tenants.organization')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='supplier_prices', to='products.product', verbose_name='পণ্য')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_prices', to='purchases.supplier', verbose_name='সাপ্লায়ার')),
+            ],
+            options={
+                'verbose_name': 'সাপ্লায়ারের দাম',
+                'verbose_name_plural': 'সাপ্লায়ারের দাম সমূহ',
+                'indexes': [models.Index(fields=['organization', 'product'], name='supplier_price_org_prod_idx')],
+                'constraints': [models.UniqueConstraint(fields=('supplier', 'product'), name='unique_price_per_supplier_product')],
+            },
+        ),
+        migrations.RunPython(backfill_supplier_prices, migrations.RunPython.noop),
+    ]
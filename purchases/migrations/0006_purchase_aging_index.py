@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchases', '0005_supplier_price_history'),
+        ('tenants', '0002_organization_valuation_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['organization', 'payment_status', 'purchase_date'], name='purchase_org_status_date_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:47
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_sku_counter'),
+        ('purchases', '0006_purchase_aging_index'),
+        ('tenants', '0002_organization_valuation_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='returned_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='ফেরত পণ্যের মূল্য'),
+        ),
+        migrations.CreateModel(
+            name='PurchaseReturn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('return_number', models.CharField(max_length=60, unique=True, verbose_name='ডেবিট নোট নম্বর')),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='ফেরত মূল্য')),
+                ('credit_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='দেনা থেকে বাদ')),
+                ('refund_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='টাকা ফেরত')),
+                ('refund_method', models.CharField(choices=[('cash', 'নগদ'), ('card', 'কার্ড'), ('mobile', 'মোবাইল ব্যাংকিং'), ('bank', 'ব্যাংক ট্রান্সফার'), ('credit', 'বাকি')], default='cash', max_length=20, verbose_name='ফেরতের মাধ্যম')),
+                ('reason', models.TextField(blank=True, verbose_name='কারণ')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='তারিখ')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='তৈরি করেছেন')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='purchase_returns', to='tenants.organization')),
+                ('purchase', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='returns', to='purchases.purchase', verbose_name='ক্রয়')),
+            ],
+            options={
+                'verbose_name': 'ক্রয় ফেরত',
+                'verbose_name_plural': 'ক্রয় ফেরত সমূহ',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PurchaseReturnItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))], verbose_name='পরিমাণ')),
+                ('unit_cost', models.DecimalField(decimal_places=4, max_digits=14, verbose_name='একক খরচ')),
+                ('total', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='মোট')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='products.product', verbose_name='পণ্য')),
+                ('purchase_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='returns', to='purchases.purchaseitem', verbose_name='ক্রয় আইটেম')),
+                ('purchase_return', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='purchases.purchasereturn', verbose_name='ডেবিট নোট')),
+            ],
+            options={
+                'verbose_name': 'ফেরত আইটেম',
+                'verbose_name_plural': 'ফেরত আইটেম সমূহ',
+            },
+        ),
+    ]
@@ -45,6 +45,7 @@ class Purchase(models.Model):
         ('paid', 'পরিশোধিত'),
         ('partial', 'আংশিক'),
         ('unpaid', 'অপরিশোধিত'),
+        ('returned', 'ফেরত'),
     ]
     
     PAYMENT_METHODS = [
@@ -68,8 +69,20 @@ class Purchase(models.Model):
     shipping_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name='শিপিং খরচ')
     grand_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='সর্বমোট')
     
+    # How shipping, tax and discount are spread over the lines' landed cost (purchases.landed_cost)
+    ALLOCATION_BASES = [
+        ('value', 'মূল্য অনুযায়ী'),
+        ('weight', 'ওজন অনুযায়ী (GSM × সাইজ)'),
+        ('quantity', 'পরিমাণ অনুযায়ী'),
+    ]
+    allocation_basis = models.CharField(
+        max_length=10, choices=ALLOCATION_BASES, default='value', verbose_name='খরচ বণ্টনের ভিত্তি'
+    )
+    
     paid_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='প্রদত্ত টাকা')
     due_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='বাকি টাকা')
+    # Landed value of goods sent back to the supplier (PurchaseReturn); no longer owed
+    returned_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='ফেরত পণ্যের মূল্য')
     
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS, default='unpaid', verbose_name='পেমেন্ট স্ট্যাটাস')
     payment_method = models.CharField(max_length=20, choices=PAYMENT_METHODS, default='cash', verbose_name='পেমেন্ট মাধ্যম')
@@ -83,6 +96,9 @@ class Purchase(models.Model):
         verbose_name = 'ক্রয়'
         verbose_name_plural = 'ক্রয় সমূহ'
         ordering = ['-purchase_date']
+        indexes = [
+            models.Index(fields=['organization', 'payment_status', 'purchase_date'], name='purchase_org_status_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.purchase_number} - {self.grand_total}৳"
@@ -103,10 +119,12 @@ class Purchase(models.Model):
                 self.purchase_number = f"{prefix}-0001"
         
         # Calculate totals
-        self.due_amount = self.grand_total - self.paid_amount
+        self.due_amount = self.grand_total - self.returned_amount - self.paid_amount
         
-        # Set payment status
-        if self.due_amount <= 0 and self.grand_total > 0:
+        # Set payment status; fully returned goods leave nothing owed but were not paid for
+        if self.grand_total > 0 and self.returned_amount >= self.grand_total:
+            self.payment_status = 'returned'
+        elif self.due_amount <= 0 and self.grand_total > 0:
             self.payment_status = 'paid'
         elif self.paid_amount > 0:
             self.payment_status = 'partial'
@@ -123,6 +141,10 @@ class PurchaseItem(models.Model):
     quantity = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))], verbose_name='পরিমাণ')
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='একক মূল্য')
     total = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='মোট')
+    # unit_price plus the line's share of shipping and tax, less its share of the discount
+    landed_unit_cost = models.DecimalField(
+        max_digits=14, decimal_places=4, null=True, blank=True, verbose_name='ল্যান্ডেড একক খরচ'
+    )
     
     class Meta:
         verbose_name = 'ক্রয় আইটেম'
@@ -153,3 +175,148 @@ class SupplierPayment(models.Model):
     
     def __str__(self):
         return f"{self.purchase.purchase_number} - {self.amount}৳"
+
+
+
+class PurchaseReturn(models.Model):
+    """ক্রয় ফেরত (ডেবিট নোট)"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='purchase_returns'
+    )
+    purchase = models.ForeignKey(Purchase, on_delete=models.CASCADE, related_name='returns', verbose_name='ক্রয়')
+    return_number = models.CharField(max_length=60, unique=True, verbose_name='ডেবিট নোট নম্বর')
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='ফেরত মূল্য')
+    # total_amount = credit_amount (taken off what was still owed) + refund_amount (money the supplier paid back)
+    credit_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='দেনা থেকে বাদ')
+    refund_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='টাকা ফেরত')
+    refund_method = models.CharField(max_length=20, choices=Purchase.PAYMENT_METHODS, default='cash', verbose_name='ফেরতের মাধ্যম')
+    reason = models.TextField(blank=True, verbose_name='কারণ')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, verbose_name='তৈরি করেছেন')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='তারিখ')
+    
+    class Meta:
+        verbose_name = 'ক্রয় ফেরত'
+        verbose_name_plural = 'ক্রয় ফেরত সমূহ'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.return_number} - {self.total_amount}৳"
+
+
+class PurchaseReturnItem(models.Model):
+    """সাপ্লায়ারকে ফেরত আইটেম"""
+    purchase_return = models.ForeignKey(PurchaseReturn, on_delete=models.CASCADE, related_name='items', verbose_name='ডেবিট নোট')
+    purchase_item = models.ForeignKey(PurchaseItem, on_delete=models.CASCADE, related_name='returns', verbose_name='ক্রয় আইটেম')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name='পণ্য')
+    quantity = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))], verbose_name='পরিমাণ')
+    # The line's landed unit cost, what the goods went into stock at
+    unit_cost = models.DecimalField(max_digits=14, decimal_places=4, verbose_name='একক খরচ')
+    total = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='মোট')
+    
+    class Meta:
+        verbose_name = 'ফেরত আইটেম'
+        verbose_name_plural = 'ফেরত আইটেম সমূহ'
+    
+    def __str__(self):
+        return f"{self.product_id} x {self.quantity}"
+
+class ProductLastPurchase(models.Model):
+    """প্রতিটি পণ্যের শেষ সাপ্লায়ার ও দাম (ক্রয় কমিটের সময় হালনাগাদ)"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='product_last_purchases'
+    )
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='last_purchase', verbose_name='পণ্য')
+    supplier = models.ForeignKey(Supplier, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='সাপ্লায়ার')
+    purchase = models.ForeignKey(Purchase, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='ক্রয়')
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='শেষ একক মূল্য')
+    purchased_at = models.DateTimeField(verbose_name='ক্রয়ের তারিখ')
+    
+    class Meta:
+        verbose_name = 'শেষ ক্রয় মূল্য'
+        verbose_name_plural = 'শেষ ক্রয় মূল্য সমূহ'
+    
+    def __str__(self):
+        return f"{self.product.name} - {self.unit_price}৳"
+
+
+class SupplierProductPrice(models.Model):
+    """সাপ্লায়ার অনুযায়ী পণ্যের দামের ইতিহাস (ক্রয় কমিটের সময় হালনাগাদ)"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='supplier_product_prices'
+    )
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='product_prices', verbose_name='সাপ্লায়ার')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='supplier_prices', verbose_name='পণ্য')
+    last_purchase = models.ForeignKey(Purchase, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name='শেষ ক্রয়')
+    last_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='শেষ একক মূল্য')
+    last_purchased_at = models.DateTimeField(verbose_name='শেষ ক্রয়ের তারিখ')
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='সর্বনিম্ন একক মূল্য')
+    total_quantity = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='মোট পরিমাণ')
+    total_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name='মোট মূল্য')
+    purchase_count = models.PositiveIntegerField(default=0, verbose_name='ক্রয় সংখ্যা')
+
+    class Meta:
+        verbose_name = 'সাপ্লায়ারের দাম'
+        verbose_name_plural = 'সাপ্লায়ারের দাম সমূহ'
+        constraints = [
+            models.UniqueConstraint(fields=['supplier', 'product'], name='unique_price_per_supplier_product'),
+        ]
+        indexes = [
+            models.Index(fields=['organization', 'product'], name='supplier_price_org_prod_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.supplier.name} - {self.product.name} - {self.last_price}৳"
+
+    @property
+    def average_price(self):
+        return self.total_amount / self.total_quantity if self.total_quantity else self.last_price
+
+
+class PurchaseOrder(models.Model):
+    """ক্রয় অর্ডার (ড্রাফট) - গ্রহণ করলে Purchase তৈরি হয়"""
+    STATUS_CHOICES = [
+        ('draft', 'ড্রাফট'),
+        ('received', 'গৃহীত'),
+        ('cancelled', 'বাতিল'),
+    ]
+    
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='purchase_orders'
+    )
+    supplier = models.ForeignKey(Supplier, on_delete=models.SET_NULL, null=True, blank=True, related_name='purchase_orders', verbose_name='সাপ্লায়ার')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft', verbose_name='স্ট্যাটাস')
+    purchase = models.OneToOneField(Purchase, on_delete=models.SET_NULL, null=True, blank=True, related_name='order', verbose_name='ক্রয়')
+    notes = models.TextField(blank=True, verbose_name='নোট')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, verbose_name='তৈরি করেছেন')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'ক্রয় অর্ডার'
+        verbose_name_plural = 'ক্রয় অর্ডার সমূহ'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"PO-{self.pk} ({self.supplier or 'সাপ্লায়ার নেই'})"
+    
+    @property
+    def total(self):
+        return sum(item.quantity * item.unit_price for item in self.items.all())
+
+
+class PurchaseOrderItem(models.Model):
+    """ক্রয় অর্ডারের আইটেম"""
+    order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='items', verbose_name='অর্ডার')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name='পণ্য')
+    quantity = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))], verbose_name='পরিমাণ')
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='একক মূল্য')
+    
+    class Meta:
+        verbose_name = 'ক্রয় অর্ডার আইটেম'
+        verbose_name_plural = 'ক্রয় অর্ডার আইটেম সমূহ'
+    
+    def __str__(self):
+        return f"{self.product.name} x {self.quantity}"
@@ -0,0 +1,93 @@
+"""
+সাপ্লায়ার অনুযায়ী দামের ইতিহাস
+SupplierProductPrice keeps one row per (supplier, product) with the last
+price paid, the lowest, and the running quantity and amount the average is
+taken from. Rows are updated with the receipt that commits the purchase, so
+looking up what every supplier charged for a list of products is a single
+indexed read and never a scan over old purchase lines.
+
+Prices are the supplier's invoice prices (PurchaseItem.unit_price), before
+shipping, tax and discount are spread over the lines.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from stationery_shop.db import bulk_update_columns
+from .models import SupplierProductPrice
+
+ZERO = Decimal('0')
+
+
+def record(purchase, lines):
+    """Fold one committed purchase's lines into its supplier's price rows"""
+    if purchase.supplier_id is None or not lines:
+        return
+
+    bought = {}
+    for product_id, quantity, price in lines:
+        quantity_sum, amount, lowest, last = bought.get(product_id, (ZERO, ZERO, price, price))
+        bought[product_id] = (quantity_sum + quantity, amount + quantity * price, min(lowest, price), price)
+
+    # Placeholder rows first so concurrent receipts from the same supplier queue on the lock below
+    SupplierProductPrice.objects.bulk_create(
+        [
+            SupplierProductPrice(
+                organization=purchase.organization, supplier_id=purchase.supplier_id, product_id=product_id,
+                last_price=last, last_purchased_at=purchase.purchase_date, min_price=lowest,
+            )
+            for product_id, (quantity, amount, lowest, last) in bought.items()
+        ],
+        ignore_conflicts=True,
+    )
+    rows = SupplierProductPrice.objects.select_for_update().filter(
+        supplier_id=purchase.supplier_id, product_id__in=bought
+    ).order_by('pk')
+
+    changed = []
+    for row in rows:
+        quantity, amount, lowest, last = bought[row.product_id]
+        row.min_price = min(row.min_price, lowest) if row.purchase_count else lowest
+        if not row.purchase_count or purchase.purchase_date >= row.last_purchased_at:
+            row.last_price = last
+            row.last_purchased_at = purchase.purchase_date
+            row.last_purchase_id = purchase.pk
+        row.total_quantity += quantity
+        row.total_amount += amount
+        row.purchase_count += 1
+        changed.append(row)
+    bulk_update_columns(
+        SupplierProductPrice, changed,
+        ['min_price', 'last_price', 'last_purchased_at', 'last_purchase', 'total_quantity', 'total_amount',
+         'purchase_count'],
+    )
+
+
+def summary(organization, product_ids=None):
+    """{product_id: last / lowest / average price across suppliers} in one query"""
+    rows = SupplierProductPrice.objects.filter(organization=organization)
+    if product_ids is not None:
+        rows = rows.filter(product_id__in=product_ids)
+
+    grouped = defaultdict(list)
+    for row in rows.values_list(
+        'product_id', 'supplier_id', 'supplier__name', 'last_price', 'last_purchased_at', 'min_price',
+        'total_quantity', 'total_amount',
+    ):
+        grouped[row[0]].append(row)
+
+    prices = {}
+    for product_id, suppliers in grouped.items():
+        last = max(suppliers, key=lambda row: row[4])
+        lowest = min(suppliers, key=lambda row: row[5])
+        quantity = sum((row[6] for row in suppliers), ZERO)
+        amount = sum((row[7] for row in suppliers), ZERO)
+        prices[product_id] = {
+            'last_price': last[3],
+            'last_supplier': last[2],
+            'last_purchased_at': last[4],
+            'lowest_price': lowest[5],
+            'lowest_supplier': lowest[2],
+            'average_price': (amount / quantity).quantize(Decimal('0.01')) if quantity else last[3],
+            'by_supplier': {row[1]: row[3] for row in suppliers},
+        }
+    return prices
@@ -0,0 +1,123 @@
+"""
+ক্রয়ের মাল গ্রহণ (goods receipt)
+Shared by purchase_add and purchase order receipt: writes purchase lines,
+increases stock, records movements and refreshes the last-price index and
+the per-supplier price history.
+
+Each line is costed at its landed unit cost (purchases.landed_cost), which
+also becomes the product's buying price. A receipt costs a fixed number of statements whatever its size: products and
+stocks are read in one query each, missing stocks are inserted together,
+the locked stock rows get their new quantities in one executemany, items and
+movements are bulk-inserted, and all of it commits or rolls back together.
+bulk_create skips post_save, so costing and low-stock checks are run here
+for the whole receipt, and the purchase is posted to the journal
+(accounting.journal) once its totals are known.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from products.models import Product
+from accounting import journal
+from inventory import alerts, valuation
+from inventory.models import Stock, StockMovement
+from stationery_shop.db import bulk_update_columns
+from . import landed_cost, price_history
+from .models import PurchaseItem, ProductLastPurchase
+
+
+def update_last_purchase_index(purchase, lines):
+    """Upsert the last supplier/price per product from one committed purchase"""
+    ProductLastPurchase.objects.bulk_create(
+        [
+            ProductLastPurchase(
+                organization=purchase.organization,
+                product_id=product_id,
+                supplier_id=purchase.supplier_id,
+                purchase=purchase,
+                unit_price=price,
+                purchased_at=purchase.purchase_date,
+            )
+            for product_id, price in {product_id: price for product_id, quantity, price in lines}.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['product'],
+        update_fields=['organization', 'supplier', 'purchase', 'unit_price', 'purchased_at'],
+    )
+
+
+@transaction.atomic
+def receive_items(purchase, lines, user):
+    """lines: [(product_id, quantity, unit_price)] -> items, stock and totals"""
+    if any(quantity <= 0 or price < 0 for product_id, quantity, price in lines):
+        raise ValueError('পরিমাণ শূন্যের বেশি ও দাম ঋণাত্মক নয় হতে হবে')
+    product_ids = {product_id for product_id, quantity, price in lines}
+    found = set(Product.objects.filter(pk__in=product_ids).values_list('pk', flat=True))
+    if found != product_ids:
+        raise Product.DoesNotExist(f'Unknown products: {sorted(product_ids - found)}')
+
+    # Missing stock rows first (a concurrent receipt may create the same ones), then lock them all
+    Stock.objects.bulk_create(
+        [
+            Stock(product_id=product_id, quantity=0, reorder_level=10, organization=purchase.organization)
+            for product_id in product_ids
+        ],
+        ignore_conflicts=True,
+    )
+    stocks = {
+        stock.product_id: stock
+        for stock in Stock.objects.select_for_update().filter(product_id__in=product_ids).order_by('pk')
+    }
+
+    now = timezone.now()
+    costs = landed_cost.landed_costs(purchase, lines)
+    subtotal = Decimal('0')
+    items, movements = [], []
+    for (product_id, quantity, price), cost in zip(lines, costs):
+        items.append(PurchaseItem(
+            purchase=purchase,
+            product_id=product_id,
+            quantity=quantity,
+            unit_price=price,
+            total=quantity * price,
+            landed_unit_cost=cost,
+        ))
+        subtotal += quantity * price
+
+        stock = stocks[product_id]
+        previous_qty = stock.quantity
+        stock.quantity += quantity
+        stock.last_updated = now
+        movements.append(StockMovement(
+            organization=purchase.organization,
+            product_id=product_id,
+            movement_type='in',
+            quantity=quantity,
+            previous_quantity=previous_qty,
+            new_quantity=stock.quantity,
+            unit_cost=cost,
+            reference=purchase.purchase_number,
+            notes=f'ক্রয়: {purchase.purchase_number}',
+            created_by=user,
+        ))
+
+    PurchaseItem.objects.bulk_create(items, batch_size=1000)
+    bulk_update_columns(Stock, stocks.values(), ['quantity', 'last_updated'])
+    valuation.apply(StockMovement.objects.bulk_create(movements, batch_size=1000))
+    alerts.refresh([stock.pk for stock in stocks.values()])
+
+    if lines:
+        update_last_purchase_index(purchase, lines)
+        price_history.record(purchase, lines)
+        landed_cost.update_buying_prices(lines, costs)
+
+    # Update purchase totals
+    purchase.subtotal = subtotal
+    purchase.grand_total = (
+        subtotal - Decimal(str(purchase.discount_amount)) + Decimal(str(purchase.shipping_cost))
+        + Decimal(str(purchase.tax_amount))
+    )
+    purchase.save()
+    journal.post_purchase(purchase)
+    return purchase
@@ -0,0 +1,133 @@
+"""
+ক্রয় ফেরত (ডেবিট নোট)
+Goods sent back to the supplier against the purchase lines they arrived on.
+Each line goes back at its landed unit cost (what it went into stock at),
+comes off what is still owed to the supplier first and is refunded by the
+supplier for the rest; the journal credits inventory with that value.
+
+Like receiving, a return is a fixed number of statements however many lines
+it has: lines and earlier returns are read in one query each, the stock rows
+are locked together and written in one executemany, movements and return
+lines are bulk-inserted, and the purchase and journal are updated once, all
+in one transaction. The stock movements themselves are costed by the
+inventory book (inventory.valuation) like any other decrease.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from accounting import journal
+from inventory import alerts, valuation
+from inventory.models import Stock, StockMovement
+from stationery_shop.db import bulk_update_columns
+from .models import Purchase, PurchaseItem, PurchaseReturn, PurchaseReturnItem
+
+ZERO = Decimal('0')
+CENTS = Decimal('0.01')
+
+
+class ReturnError(Exception):
+    pass
+
+
+def returned_quantities(item_ids):
+    """{purchase item id: quantity already sent back}"""
+    return dict(
+        PurchaseReturnItem.objects.filter(purchase_item_id__in=list(item_ids))
+        .values('purchase_item_id').annotate(quantity=Sum('quantity')).order_by()
+        .values_list('purchase_item_id', 'quantity')
+    )
+
+
+@transaction.atomic
+def create_return(purchase, quantities, user, refund_method='cash', reason=''):
+    """quantities: {purchase item id: quantity going back} -> PurchaseReturn"""
+    quantities = {item_id: quantity for item_id, quantity in quantities.items() if quantity > 0}
+    if not quantities:
+        raise ReturnError('ফেরতের পরিমাণ দিন')
+
+    purchase = Purchase.objects.select_for_update().get(pk=purchase.pk)
+    items = {
+        item.pk: item
+        for item in PurchaseItem.objects.filter(purchase=purchase, pk__in=quantities).select_related('product')
+    }
+    if len(items) != len(quantities):
+        raise ReturnError('এই ক্রয়ে এমন আইটেম নেই')
+    already = returned_quantities(items)
+    for item_id, quantity in quantities.items():
+        item = items[item_id]
+        if quantity > item.quantity - already.get(item_id, ZERO):
+            raise ReturnError(f'{item.product.name}: কেনার চেয়ে বেশি ফেরত দেওয়া যাবে না')
+
+    product_ids = {item.product_id for item in items.values()}
+    stocks = {
+        stock.product_id: stock
+        for stock in Stock.objects.select_for_update().filter(product_id__in=product_ids).order_by('pk')
+    }
+    # Several lines of one product draw on the same stock row
+    wanted = {}
+    for item_id, quantity in quantities.items():
+        product_id = items[item_id].product_id
+        wanted[product_id] = wanted.get(product_id, ZERO) + quantity
+    for product_id, quantity in wanted.items():
+        stock = stocks.get(product_id)
+        if stock is None or stock.quantity < quantity:
+            product = next(item.product for item in items.values() if item.product_id == product_id)
+            raise ReturnError(f'{product.name}: স্টকে যথেষ্ট পণ্য নেই')
+
+    number = f'DN-{purchase.purchase_number}-{purchase.returns.count() + 1}'
+    now = timezone.now()
+    lines, movements = [], []
+    for item_id, quantity in quantities.items():
+        item = items[item_id]
+        unit_cost = item.landed_unit_cost if item.landed_unit_cost is not None else item.unit_price
+        lines.append(PurchaseReturnItem(
+            purchase_item=item, product_id=item.product_id, quantity=quantity,
+            unit_cost=unit_cost, total=(unit_cost * quantity).quantize(CENTS),
+        ))
+        stock = stocks[item.product_id]
+        previous_qty = stock.quantity
+        stock.quantity -= quantity
+        stock.last_updated = now
+        movements.append(StockMovement(
+            organization=purchase.organization,
+            product_id=item.product_id,
+            movement_type='return',
+            quantity=quantity,
+            previous_quantity=previous_qty,
+            new_quantity=stock.quantity,
+            reference=number,
+            notes=f'সাপ্লায়ারকে ফেরত: {purchase.purchase_number}',
+            created_by=user,
+        ))
+
+    bulk_update_columns(Stock, stocks.values(), ['quantity', 'last_updated'])
+    valuation.apply(StockMovement.objects.bulk_create(movements, batch_size=1000))
+    alerts.refresh([stock.pk for stock in stocks.values()])
+
+    value = min(sum((line.total for line in lines), ZERO), purchase.grand_total - purchase.returned_amount)
+    credit = min(value, max(purchase.due_amount, ZERO))
+    purchase_return = PurchaseReturn.objects.create(
+        organization=purchase.organization,
+        purchase=purchase,
+        return_number=number,
+        total_amount=value,
+        credit_amount=credit,
+        refund_amount=value - credit,
+        refund_method=refund_method,
+        reason=reason,
+        created_by=user,
+    )
+    for line in lines:
+        line.purchase_return = purchase_return
+    PurchaseReturnItem.objects.bulk_create(lines, batch_size=1000)
+
+    purchase.paid_amount = min(purchase.paid_amount, purchase.grand_total - purchase.returned_amount) \
+        - purchase_return.refund_amount
+    purchase.returned_amount += value
+    purchase.save()
+
+    journal.post_purchase_return(purchase_return)
+    return purchase_return
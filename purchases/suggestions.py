@@ -0,0 +1,108 @@
+"""
+ক্রয় অর্ডার সাজেশন
+Products flagged low (inventory Stock.is_low) are grouped by their last
+supplier from the ProductLastPurchase index and turned into draft purchase
+orders with the last paid price. Whatever is already on an open draft order
+comes off the suggested quantity, so creating drafts twice does not order
+the same shortfall twice.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+
+from inventory.models import Stock
+from .models import ProductLastPurchase, PurchaseOrder, PurchaseOrderItem, Supplier
+
+# Order up to this multiple of the reorder level
+ORDER_UP_TO_FACTOR = Decimal('2')
+
+
+def suggested_quantity(quantity, reorder_level):
+    target = reorder_level * ORDER_UP_TO_FACTOR
+    return max(target - quantity, reorder_level, Decimal('1'))
+
+
+def build_suggestions(organization):
+    """Return [{'supplier': Supplier|None, 'lines': [...], 'total': Decimal}] sorted by supplier"""
+    stocks = Stock.objects.filter(organization=organization, is_low=True).values_list(
+        'product_id', 'product__name', 'product__buying_price', 'quantity', 'reorder_level',
+    )
+    stocks = list(stocks)
+    if not stocks:
+        return []
+
+    index = {
+        row[0]: row[1:]
+        for row in ProductLastPurchase.objects.filter(
+            product_id__in=[s[0] for s in stocks]
+        ).values_list('product_id', 'supplier_id', 'unit_price')
+    }
+
+    on_order = dict(
+        PurchaseOrderItem.objects.filter(
+            order__organization=organization, order__status='draft',
+            product_id__in=[s[0] for s in stocks],
+        ).values('product_id').annotate(quantity=Sum('quantity')).order_by()
+        .values_list('product_id', 'quantity')
+    )
+
+    groups = {}
+    for product_id, name, buying_price, quantity, reorder_level in stocks:
+        order_qty = suggested_quantity(quantity, reorder_level) - on_order.get(product_id, 0)
+        if order_qty <= 0:
+            continue
+        supplier_id, last_price = index.get(product_id, (None, None))
+        price = last_price if last_price is not None else buying_price
+        groups.setdefault(supplier_id, []).append({
+            'product_id': product_id,
+            'name': name,
+            'stock': quantity,
+            'reorder_level': reorder_level,
+            'quantity': order_qty,
+            'unit_price': price,
+            'total': order_qty * price,
+        })
+
+    suppliers = Supplier.objects.in_bulk([pk for pk in groups if pk is not None])
+    result = [
+        {
+            'supplier': suppliers.get(supplier_id),
+            'lines': lines,
+            'total': sum(line['total'] for line in lines),
+        }
+        for supplier_id, lines in groups.items()
+    ]
+    result.sort(key=lambda group: (group['supplier'] is None, str(group['supplier'] or '')))
+    return result
+
+
+@transaction.atomic
+def create_draft_orders(organization, user, suggestions=None):
+    """সব সাজেশন থেকে ড্রাফট ক্রয় অর্ডার (এক সাপ্লায়ার = এক অর্ডার)"""
+    if suggestions is None:
+        suggestions = build_suggestions(organization)
+
+    orders = PurchaseOrder.objects.bulk_create([
+        PurchaseOrder(
+            organization=organization,
+            supplier=group['supplier'],
+            status='draft',
+            notes='স্বয়ংক্রিয় সাজেশন (লো স্টক)',
+            created_by=user,
+        )
+        for group in suggestions
+    ])
+
+    # bulk_create returns pks on PostgreSQL/SQLite, so items can follow in one insert
+    PurchaseOrderItem.objects.bulk_create([
+        PurchaseOrderItem(
+            order=order,
+            product_id=line['product_id'],
+            quantity=line['quantity'],
+            unit_price=line['unit_price'],
+        )
+        for order, group in zip(orders, suggestions)
+        for line in group['lines']
+    ])
+    return orders
@@ -1,3 +1,63 @@
-from django.test import TestCase
+from decimal import Decimal
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+from inventory.models import Stock
+from products.models import Product
+from tenants.models import Organization
+from .landed_cost import allocate, landed_costs
+from .suggestions import build_suggestions, create_draft_orders
+
+
+class SuggestionTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name='s', slug='s', owner_name='o', email='s@example.com', phone='1')
+        self.product = Product.objects.create(
+            organization=self.org, name='কলম', buying_price=Decimal('5'), selling_price=Decimal('8'),
+        )
+
+    def test_stock_saved_without_a_shop_is_suggested(self):
+        # Older code paths created stock rows without an organization
+        Stock.objects.create(product=self.product, quantity=Decimal('2'), reorder_level=Decimal('10'))
+
+        groups = build_suggestions(self.org)
+
+        self.assertEqual([line['product_id'] for group in groups for line in group['lines']], [self.product.pk])
+
+    def test_quantities_on_open_drafts_are_not_suggested_again(self):
+        Stock.objects.create(organization=self.org, product=self.product, quantity=Decimal('2'), reorder_level=Decimal('10'))
+
+        self.assertEqual(len(create_draft_orders(self.org, None)), 1)
+        self.assertEqual(build_suggestions(self.org), [])
+        self.assertEqual(create_draft_orders(self.org, None), [])
+
+
+class LandedCostTests(SimpleTestCase):
+    def test_shares_add_up_to_the_charges(self):
+        for charges, basis in [
+            (Decimal('100.00'), [1, 1, 1]),
+            (Decimal('0.05'), [3, 3, 3, 3, 3, 3, 3]),
+            (Decimal('-17.89'), [120.5, 3, 0.25, 77]),
+            (Decimal('1234.57'), list(range(1, 200))),
+        ]:
+            shares = allocate(charges, basis)
+            self.assertEqual(int(shares.sum()), int(charges * 100), charges)
+
+    def test_remainder_goes_to_the_largest_fractions(self):
+        self.assertEqual(list(allocate(Decimal('1.00'), [1, 1, 1])), [34, 33, 33])
+        self.assertEqual(list(allocate(Decimal('0.10'), [1, 2])), [3, 7])
+
+    def test_nothing_to_spread_over(self):
+        self.assertEqual(list(allocate(Decimal('10'), [0, 0])), [0, 0])
+        self.assertEqual(list(allocate(Decimal('0'), [1, 2])), [0, 0])
+
+    def test_landed_costs_include_shipping_tax_and_discount(self):
+        purchase = SimpleNamespace(shipping_cost=Decimal('30'), tax_amount=Decimal('10'),
+                                   discount_amount=Decimal('10'), allocation_basis='value')
+        lines = [(1, Decimal('10'), Decimal('20')), (2, Decimal('5'), Decimal('20'))]
+
+        costs = landed_costs(purchase, lines)
+
+        self.assertEqual(costs, [Decimal('22'), Decimal('22')])
+        self.assertEqual(sum(cost * quantity for cost, (p, quantity, price) in zip(costs, lines)), Decimal('330'))
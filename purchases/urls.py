@@ -8,6 +8,13 @@ urlpatterns = [
     path('add/', views.purchase_add, name='purchase_add'),
     path('<int:pk>/', views.purchase_detail, name='purchase_detail'),
     path('<int:pk>/payment/', views.add_payment, name='add_payment'),
+    path('<int:pk>/return/', views.purchase_return, name='purchase_return'),
+    path('api/prices/', views.supplier_prices_api, name='supplier_prices_api'),
+    
+    # Purchase orders
+    path('suggestions/', views.purchase_suggestions, name='purchase_suggestions'),
+    path('orders/<int:pk>/receive/', views.purchase_order_receive, name='purchase_order_receive'),
+    path('orders/<int:pk>/cancel/', views.purchase_order_cancel, name='purchase_order_cancel'),
     
     # Suppliers
     path('suppliers/', views.supplier_list, name='supplier_list'),
@@ -16,5 +23,8 @@ urlpatterns = [
     
     # Reports
     path('report/', views.purchase_report, name='purchase_report'),
+    path('report/export/', views.purchase_report_export, name='purchase_report_export'),
     path('report/due/', views.supplier_due_report, name='supplier_due_report'),
+    path('report/due/export/', views.supplier_due_export, name='supplier_due_export'),
+    path('report/due/supplier/<int:pk>/', views.supplier_due_detail, name='supplier_due_detail'),
 ]
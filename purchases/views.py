@@ -1,13 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Sum, Q
+from django.http import JsonResponse
+from django.db import transaction
+from django.db.models import Count, F, Sum, Q
 from django.utils import timezone
 from decimal import Decimal
 
-from .models import Supplier, Purchase, PurchaseItem, SupplierPayment
+from .models import Supplier, Purchase, PurchaseItem, SupplierPayment, PurchaseOrder
+from . import landed_cost, price_history, returns
+from .receiving import receive_items
+from .suggestions import build_suggestions, create_draft_orders
 from products.models import Product
 from inventory.models import Stock, StockMovement
+from accounting import journal
+from stationery_shop import aging
+from stationery_shop.exports import EXPORT_CHUNK_SIZE, scope_to_org, xlsx_response
 
 
 @login_required
@@ -38,62 +46,39 @@ def purchase_list(request):
 def purchase_add(request):
     """নতুন ক্রয়"""
     if request.method == 'POST':
-        # Create purchase
-        purchase = Purchase.objects.create(
-            supplier_id=request.POST.get('supplier') or None,
-            discount_amount=request.POST.get('discount', 0) or 0,
-            shipping_cost=request.POST.get('shipping', 0) or 0,
-            paid_amount=request.POST.get('paid_amount', 0) or 0,
-            payment_method=request.POST.get('payment_method', 'cash'),
-            notes=request.POST.get('notes', ''),
-            created_by=request.user,
-        )
-        
-        # Add items
-        subtotal = 0
-        product_ids = request.POST.getlist('product_id[]')
+        product_ids = request.POST.getlist('product[]')
         quantities = request.POST.getlist('quantity[]')
-        prices = request.POST.getlist('price[]')
+        prices = request.POST.getlist('unit_price[]')
+        try:
+            lines = [
+                (int(product_id), Decimal(quantities[i]), Decimal(prices[i]))
+                for i, product_id in enumerate(product_ids) if product_id
+            ]
+        except (ValueError, IndexError, ArithmeticError):
+            lines = None
+        # Zero-quantity lines would divide by zero in the landed cost allocation
+        if not lines or any(not quantity.is_finite() or quantity <= 0 or not price.is_finite() or price < 0
+                            for product_id, quantity, price in lines):
+            messages.error(request, 'প্রতিটি আইটেমের পরিমাণ শূন্যের বেশি ও সঠিক দাম দিন')
+            return redirect('purchases:purchase_add')
         
-        for i, product_id in enumerate(product_ids):
-            if product_id:
-                product = Product.objects.get(pk=product_id)
-                quantity = Decimal(quantities[i])
-                price = Decimal(prices[i])
-                
-                PurchaseItem.objects.create(
-                    purchase=purchase,
-                    product=product,
-                    quantity=quantity,
-                    unit_price=price,
-                    total=quantity * price,
-                )
-                subtotal += quantity * price
-                
-                # Update stock
-                stock, created = Stock.objects.get_or_create(
-                    product=product,
-                    defaults={'quantity': 0, 'reorder_level': 10}
-                )
-                previous_qty = stock.quantity
-                stock.quantity += quantity
-                stock.save()
-                
-                StockMovement.objects.create(
-                    product=product,
-                    movement_type='in',
-                    quantity=quantity,
-                    previous_quantity=previous_qty,
-                    new_quantity=stock.quantity,
-                    reference=purchase.purchase_number,
-                    notes=f'ক্রয়: {purchase.purchase_number}',
-                    created_by=request.user,
-                )
+        basis = request.POST.get('allocation_basis')
         
-        # Update purchase totals
-        purchase.subtotal = subtotal
-        purchase.grand_total = subtotal - Decimal(str(purchase.discount_amount)) + Decimal(str(purchase.shipping_cost))
-        purchase.save()
+        # The purchase and its receipt commit together
+        with transaction.atomic():
+            purchase = Purchase.objects.create(
+                organization=request.user.organization,
+                supplier_id=request.POST.get('supplier') or None,
+                discount_amount=Decimal(request.POST.get('discount') or 0),
+                shipping_cost=Decimal(request.POST.get('shipping') or 0),
+                tax_amount=Decimal(request.POST.get('tax') or 0),
+                allocation_basis=basis if basis in landed_cost.BASES else 'value',
+                paid_amount=Decimal(request.POST.get('paid_amount') or 0),
+                payment_method=request.POST.get('payment_method', 'cash'),
+                notes=request.POST.get('notes', ''),
+                created_by=request.user,
+            )
+            receive_items(purchase, lines, request.user)
         
         messages.success(request, f'ক্রয় সফল! নম্বর: {purchase.purchase_number}')
         return redirect('purchases:purchase_detail', pk=purchase.pk)
@@ -104,19 +89,116 @@ def purchase_add(request):
     context = {
         'products': products,
         'suppliers': suppliers,
+        'allocation_bases': Purchase.ALLOCATION_BASES,
+        # The shop's whole price history in one query, for every product in the form
+        'supplier_prices': _prices_json(price_history.summary(request.user.organization)),
     }
     return render(request, 'purchases/purchase_form.html', context)
 
 
+def _prices_json(prices):
+    return {
+        product_id: {
+            'last': float(row['last_price']),
+            'last_supplier': row['last_supplier'],
+            'last_date': row['last_purchased_at'].date().isoformat(),
+            'lowest': float(row['lowest_price']),
+            'lowest_supplier': row['lowest_supplier'],
+            'average': float(row['average_price']),
+            'by_supplier': {supplier_id: float(price) for supplier_id, price in row['by_supplier'].items()},
+        }
+        for product_id, row in prices.items()
+    }
+
+
+@login_required
+def supplier_prices_api(request):
+    """পণ্যের শেষ / সর্বনিম্ন / গড় ক্রয় মূল্য: ?ids=1,2,3"""
+    ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk.isdigit()][:500]
+    prices = price_history.summary(request.user.organization, ids)
+    return JsonResponse({'prices': _prices_json(prices)})
+
+
+@login_required
+def purchase_suggestions(request):
+    """লো স্টক থেকে ক্রয় সাজেশন ও ড্রাফট অর্ডার"""
+    org = request.user.organization
+    
+    if request.method == 'POST':
+        orders = create_draft_orders(org, request.user)
+        messages.success(request, f'{len(orders)} টি ড্রাফট ক্রয় অর্ডার তৈরি হয়েছে!')
+        return redirect('purchases:purchase_suggestions')
+    
+    drafts = PurchaseOrder.objects.filter(organization=org, status='draft').select_related(
+        'supplier'
+    ).annotate(
+        line_count=Count('items'),
+        amount=Sum(F('items__quantity') * F('items__unit_price')),
+    ).order_by('-created_at')
+    
+    context = {
+        'suggestions': build_suggestions(org),
+        'drafts': drafts,
+    }
+    return render(request, 'purchases/suggestions.html', context)
+
+
+@login_required
+def purchase_order_receive(request, pk):
+    """ড্রাফট অর্ডার থেকে ক্রয় (মাল গ্রহণ)"""
+    order = get_object_or_404(PurchaseOrder, pk=pk, organization=request.user.organization, status='draft')
+    
+    if request.method == 'POST':
+        with transaction.atomic():
+            # A second submit waits here and then finds the order already received
+            order = PurchaseOrder.objects.select_for_update().filter(pk=order.pk, status='draft').first()
+            if order is None:
+                messages.error(request, 'এই অর্ডারটি আগেই গ্রহণ বা বাতিল হয়েছে')
+                return redirect('purchases:purchase_suggestions')
+            purchase = Purchase.objects.create(
+                organization=order.organization,
+                supplier=order.supplier,
+                payment_method='credit',
+                notes=order.notes,
+                created_by=request.user,
+            )
+            lines = [(item.product_id, item.quantity, item.unit_price) for item in order.items.all()]
+            receive_items(purchase, lines, request.user)
+            order.status = 'received'
+            order.purchase = purchase
+            order.save()
+        
+        messages.success(request, f'ক্রয় সফল! নম্বর: {purchase.purchase_number}')
+        return redirect('purchases:purchase_detail', pk=purchase.pk)
+    
+    return redirect('purchases:purchase_suggestions')
+
+
+@login_required
+def purchase_order_cancel(request, pk):
+    """ড্রাফট অর্ডার বাতিল"""
+    order = get_object_or_404(PurchaseOrder, pk=pk, organization=request.user.organization, status='draft')
+    if request.method == 'POST':
+        order.status = 'cancelled'
+        order.save()
+        messages.success(request, 'ক্রয় অর্ডার বাতিল হয়েছে!')
+    return redirect('purchases:purchase_suggestions')
+
+
 @login_required
 def purchase_detail(request, pk):
     """ক্রয় বিস্তারিত"""
     purchase = get_object_or_404(Purchase, pk=pk)
-    items = purchase.items.select_related('product')
+    items = list(purchase.items.select_related('product'))
+    returned = returns.returned_quantities(item.pk for item in items)
+    for item in items:
+        item.returned_quantity = returned.get(item.pk, 0)
+        item.returnable = item.quantity - item.returned_quantity
     
     context = {
         'purchase': purchase,
         'items': items,
+        'returns': purchase.returns.select_related('created_by'),
     }
     return render(request, 'purchases/purchase_detail.html', context)
 
@@ -129,24 +211,53 @@ def add_payment(request, pk):
     if request.method == 'POST':
         amount = Decimal(request.POST.get('amount', 0))
         
-        SupplierPayment.objects.create(
-            purchase=purchase,
-            amount=amount,
-            payment_method=request.POST.get('payment_method', 'cash'),
-            reference=request.POST.get('reference', ''),
-            notes=request.POST.get('notes', ''),
-            paid_by=request.user,
-        )
-        
-        # Update purchase
-        purchase.paid_amount += amount
-        purchase.save()
+        with transaction.atomic():
+            payment = SupplierPayment.objects.create(
+                purchase=purchase,
+                amount=amount,
+                payment_method=request.POST.get('payment_method', 'cash'),
+                reference=request.POST.get('reference', ''),
+                notes=request.POST.get('notes', ''),
+                paid_by=request.user,
+            )
+            
+            # Update purchase
+            purchase.paid_amount += amount
+            purchase.save()
+            journal.post_supplier_payment(payment)
         
         messages.success(request, f'{amount}৳ পেমেন্ট করা হয়েছে!')
     
     return redirect('purchases:purchase_detail', pk=pk)
 
 
+@login_required
+def purchase_return(request, pk):
+    """সাপ্লায়ারকে পণ্য ফেরত (ডেবিট নোট)"""
+    purchase = get_object_or_404(scope_to_org(Purchase.objects.all(), request), pk=pk)
+    if request.method != 'POST':
+        return redirect('purchases:purchase_detail', pk=pk)
+    
+    try:
+        quantities = {
+            int(key.split('-', 1)[1]): Decimal(value)
+            for key, value in request.POST.items()
+            if key.startswith('return-') and value.strip()
+        }
+        purchase_return = returns.create_return(
+            purchase, quantities, request.user,
+            refund_method=request.POST.get('refund_method', 'cash'),
+            reason=request.POST.get('reason', ''),
+        )
+    except (ValueError, ArithmeticError):
+        messages.error(request, 'সঠিক পরিমাণ দিন')
+    except (returns.ReturnError, journal.JournalError) as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, f'ডেবিট নোট {purchase_return.return_number} তৈরি হয়েছে!')
+    return redirect('purchases:purchase_detail', pk=pk)
+
+
 @login_required
 def supplier_list(request):
     """সাপ্লায়ার তালিকা"""
@@ -209,17 +320,109 @@ def purchase_report(request):
     return render(request, 'purchases/report.html', context)
 
 
+@login_required
+def purchase_report_export(request):
+    """ক্রয় রিপোর্ট Excel"""
+    from_date = request.GET.get('from_date') or timezone.now().date().replace(day=1)
+    to_date = request.GET.get('to_date') or timezone.now().date()
+    
+    purchases = scope_to_org(Purchase.objects.filter(
+        purchase_date__date__gte=from_date,
+        purchase_date__date__lte=to_date
+    ), request).order_by('purchase_date').values_list(
+        'purchase_number', 'purchase_date', 'supplier__name', 'subtotal', 'discount_amount',
+        'shipping_cost', 'grand_total', 'paid_amount', 'due_amount', 'payment_status',
+    )
+    
+    statuses = dict(Purchase.PAYMENT_STATUS)
+    rows = (
+        row[:9] + (statuses.get(row[9], row[9]),)
+        for row in purchases.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    headers = ['ক্রয় নম্বর', 'তারিখ', 'সাপ্লায়ার', 'উপমোট', 'ছাড়', 'শিপিং খরচ', 'সর্বমোট',
+               'প্রদত্ত', 'বাকি', 'স্ট্যাটাস']
+    return xlsx_response(f'purchases-{from_date}-{to_date}.xlsx', [('ক্রয়', headers, rows)])
+
+
 @login_required
 def supplier_due_report(request):
-    """সাপ্লায়ার বাকি রিপোর্ট"""
-    purchases = Purchase.objects.filter(
-        payment_status__in=['unpaid', 'partial']
-    ).select_related('supplier').order_by('-due_amount')
+    """সাপ্লায়ার বাকি রিপোর্ট (এজিং: সাপ্লায়ার অনুযায়ী)"""
+    suppliers, totals = aging.summary(
+        scope_to_org(Purchase.objects.all(), request),
+        ['supplier_id', 'supplier__name', 'supplier__phone'], 'purchase_date',
+    )
     
-    total_due = purchases.aggregate(total=Sum('due_amount'))['total'] or 0
+    context = {
+        'suppliers': suppliers,
+        'totals': totals,
+        'buckets': aging.BUCKETS,
+        'total_due': totals['total'],
+    }
+    return render(request, 'purchases/due_report.html', context)
+
+
+def _supplier_due_purchases(request, pk):
+    """একজন সাপ্লায়ারের খোলা ক্রয় (pk 0 = সাপ্লায়ার ছাড়া)"""
+    purchases = aging.open_documents(scope_to_org(Purchase.objects.all(), request))
+    if pk:
+        return purchases.filter(supplier_id=pk)
+    return purchases.filter(supplier__isnull=True)
+
+
+@login_required
+def supplier_due_detail(request, pk):
+    """সাপ্লায়ারের বাকি ক্রয় (বয়স অনুযায়ী)"""
+    supplier = get_object_or_404(scope_to_org(Supplier.objects.all(), request), pk=pk) if pk else None
+    documents = _supplier_due_purchases(request, pk)
+    stats = documents.aggregate(total=Sum('due_amount'), count=Count('pk'))
+    # Oldest first; the full list is in the Excel export
+    purchases = list(documents.order_by('purchase_date').values(
+        'pk', 'purchase_number', 'purchase_date', 'grand_total', 'paid_amount', 'due_amount',
+    )[:200])
+    today = timezone.localdate()
+    for purchase in purchases:
+        purchase['age'], purchase['bucket'] = aging.bucket_of(purchase['purchase_date'], today)
     
     context = {
+        'supplier': supplier,
         'purchases': purchases,
-        'total_due': total_due,
+        'total_due': stats['total'] or 0,
+        'document_count': stats['count'],
     }
-    return render(request, 'purchases/due_report.html', context)
+    return render(request, 'purchases/due_supplier_detail.html', context)
+
+
+@login_required
+def supplier_due_export(request):
+    """সাপ্লায়ার বাকি রিপোর্ট Excel: এজিং + ক্রয় তালিকা"""
+    purchases = scope_to_org(Purchase.objects.all(), request)
+    supplier = request.GET.get('supplier')
+    if supplier and supplier.isdigit():
+        purchases = _supplier_due_purchases(request, int(supplier))
+    
+    today = timezone.localdate()
+    suppliers, totals = aging.summary(
+        purchases, ['supplier_id', 'supplier__name', 'supplier__phone'], 'purchase_date', today
+    )
+    bucket_keys = [key for key, *rest in aging.BUCKETS]
+    summary_rows = (
+        (row['supplier__name'] or '-', row['supplier__phone'], row['documents'])
+        + tuple(row[key] for key in bucket_keys) + (row['total'],)
+        for row in suppliers
+    )
+    open_purchases = aging.open_documents(purchases).order_by('supplier__name', 'purchase_date').values_list(
+        'purchase_number', 'purchase_date', 'supplier__name', 'supplier__phone',
+        'grand_total', 'paid_amount', 'due_amount',
+    )
+    purchase_rows = (
+        row + aging.bucket_of(row[1], today)
+        for row in open_purchases.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    
+    bucket_labels = [label for key, label, *rest in aging.BUCKETS]
+    sheets = [
+        ('এজিং', ['সাপ্লায়ার', 'ফোন', 'ক্রয় সংখ্যা'] + bucket_labels + ['মোট বাকি'], summary_rows),
+        ('বাকি ক্রয়', ['ক্রয় নম্বর', 'তারিখ', 'সাপ্লায়ার', 'ফোন', 'সর্বমোট', 'প্রদত্ত', 'বাকি', 'বয়স (দিন)', 'সময়সীমা'],
+         purchase_rows),
+    ]
+    return xlsx_response('supplier-due-report.xlsx', sheets)
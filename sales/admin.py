@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Customer, Sale, SaleItem, Payment
+from .models import Customer, Sale, SaleItem, Payment, SaleReturn, SaleReturnItem, Shift
 
 
 class SaleItemInline(admin.TabularInline):
@@ -41,3 +41,31 @@ class PaymentAdmin(admin.ModelAdmin):
     list_display = ['sale', 'amount', 'payment_method', 'received_by', 'payment_date']
     list_filter = ['payment_method', 'payment_date']
     search_fields = ['sale__invoice_number']
+
+
+class SaleReturnItemInline(admin.TabularInline):
+    model = SaleReturnItem
+    extra = 0
+    readonly_fields = ['sale_item', 'product', 'quantity', 'unit_price', 'total', 'unit_cost']
+
+
+@admin.register(SaleReturn)
+class SaleReturnAdmin(admin.ModelAdmin):
+    list_display = ['return_number', 'sale', 'total_amount', 'credit_amount', 'refund_amount', 'created_at']
+    list_filter = ['refund_method', 'created_at']
+    search_fields = ['return_number', 'sale__invoice_number']
+    readonly_fields = ['return_number', 'total_amount', 'credit_amount', 'refund_amount', 'cost_amount']
+    inlines = [SaleReturnItemInline]
+    date_hierarchy = 'created_at'
+
+
+@admin.register(Shift)
+class ShiftAdmin(admin.ModelAdmin):
+    list_display = ['cashier', 'opened_at', 'closed_at', 'status', 'expected_cash', 'counted_cash', 'variance']
+    list_filter = ['status', 'opened_at']
+    search_fields = ['cashier__username']
+    readonly_fields = [
+        'expected_cash', 'expected_card', 'expected_mobile', 'expected_bank',
+        'credit_sales', 'sale_count', 'payment_count', 'variance',
+    ]
+    date_hierarchy = 'opened_at'
@@ -0,0 +1,76 @@
+"""
+গ্রাহকের একসাথে পেমেন্ট (বাকি ইনভয়েসে ভাগ করে)
+A customer who pays a lump sum gets it spread over their open invoices,
+oldest first. The open invoices are read and locked in one query, the split
+is worked out in Python, the touched sales are written with one executemany
+UPDATE (paid, due, status) and their Payment rows with one bulk INSERT. The
+payments post to the journal as one batch and add to the cashier's open
+shift in one UPDATE, so a receipt costs the same number of queries whether
+it settles one invoice or five hundred.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from accounting import journal
+from stationery_shop import aging
+from stationery_shop.db import bulk_update_columns
+from . import shifts
+from .models import Payment, Sale
+
+ZERO = Decimal('0')
+
+
+class AllocationError(Exception):
+    pass
+
+
+def open_sales(organization, customer):
+    """Oldest first, the order a receipt settles them in"""
+    return aging.open_documents(
+        Sale.objects.filter(organization=organization, customer=customer)
+    ).order_by('sale_date', 'pk')
+
+
+def split(sales, amount):
+    """[(sale, amount applied)] walking the sales in order until the amount runs out"""
+    allocations = []
+    remaining = amount
+    for sale in sales:
+        if remaining <= 0:
+            break
+        applied = min(remaining, sale.due_amount)
+        allocations.append((sale, applied))
+        remaining -= applied
+    return allocations
+
+
+@transaction.atomic
+def receive(organization, customer, amount, payment_method='cash', user=None, reference='', notes=''):
+    """Allocate `amount` across the customer's open invoices; returns the Payment rows"""
+    if amount <= 0:
+        raise AllocationError('টাকার পরিমাণ শূন্যের বেশি হতে হবে')
+    sales = list(open_sales(organization, customer).select_for_update())
+    total_due = sum((sale.due_amount for sale in sales), ZERO)
+    if amount > total_due:
+        raise AllocationError(f'মোট বাকি ৳{total_due}, এর বেশি নেওয়া যাবে না')
+
+    now = timezone.now()
+    payments = []
+    for sale, applied in split(sales, amount):
+        sale.paid_amount += applied
+        sale.due_amount -= applied
+        sale.payment_status = 'paid' if sale.due_amount == 0 else 'partial'
+        sale.updated_at = now
+        payments.append(Payment(
+            sale=sale, amount=applied, payment_method=payment_method,
+            reference=reference, notes=notes, received_by=user,
+        ))
+    bulk_update_columns(Sale, [payment.sale for payment in payments],
+                        ['paid_amount', 'due_amount', 'payment_status', 'updated_at'])
+    Payment.objects.bulk_create(payments)
+
+    journal.post_sale_payments(organization, payments)
+    shifts.record_payments(organization, user.pk if user else None, payments)
+    return payments
@@ -0,0 +1,18 @@
+import os
+
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register()
+def invoice_font_check(app_configs, **kwargs):
+    """ইনভয়েস PDF-এর বাংলা ফন্ট আছে কিনা"""
+    font_path = getattr(settings, 'INVOICE_FONT_PATH', '')
+    if font_path and not os.path.exists(font_path):
+        return [Error(
+            f'Invoice font not found: {font_path}',
+            hint='Point INVOICE_FONT_PATH at a Bengali TTF such as HindSiliguri-Regular.ttf '
+                 '(the Docker image downloads it), or leave it unset to print with Helvetica.',
+            id='sales.E001',
+        )]
+    return []
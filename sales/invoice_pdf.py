@@ -0,0 +1,329 @@
+"""
+সার্ভার-সাইড PDF ইনভয়েস (reportlab)
+A4 and 80mm thermal receipt layouts with an on-disk render cache
+"""
+import io
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+LAYOUT_A4 = 'a4'
+LAYOUT_THERMAL = 'thermal'
+LAYOUTS = (LAYOUT_A4, LAYOUT_THERMAL)
+
+FONT_NAME = 'InvoiceBengali'
+FALLBACK_FONT = 'Helvetica'
+
+THERMAL_WIDTH = 80 * mm
+THERMAL_MARGIN = 4 * mm
+THERMAL_LINE = 4.2 * mm
+
+_font = None
+
+
+def get_font():
+    """Register the Bengali TTF once per process and return its name
+
+    Without INVOICE_FONT_PATH invoices render with Helvetica; a path that
+    does not exist is a broken deployment (Bengali text would print as boxes),
+    which the sales.E001 system check reports at startup.
+    """
+    global _font
+    if _font is None:
+        font_path = getattr(settings, 'INVOICE_FONT_PATH', '')
+        if not font_path:
+            _font = FALLBACK_FONT
+        elif os.path.exists(font_path):
+            pdfmetrics.registerFont(TTFont(FONT_NAME, font_path))
+            _font = FONT_NAME
+        else:
+            raise ImproperlyConfigured(f'INVOICE_FONT_PATH {font_path} does not exist')
+    return _font
+
+
+def invoice_data(sale, items=None):
+    """Sale থেকে রেন্ডারের জন্য প্লেইন ডাটা (picklable, no DB access while drawing)"""
+    if items is None:
+        items = sale.items.select_related('product', 'product__gsm', 'product__size')
+    org = sale.organization
+    return {
+        'invoice_number': sale.invoice_number,
+        'sale_date': sale.sale_date.strftime('%d/%m/%Y %I:%M %p') if sale.sale_date else '',
+        'shop_name': org.name if org else 'স্টেশনারি শপ',
+        'shop_address': org.address if org else '',
+        'shop_phone': org.phone if org else '',
+        'customer': sale.customer.name if sale.customer_id else 'ওয়াক-ইন গ্রাহক',
+        'cashier': (sale.created_by.get_full_name() or sale.created_by.username) if sale.created_by_id else '',
+        'payment_method': sale.get_payment_method_display(),
+        'items': [
+            (str(item.product), item.quantity, item.unit_price, item.total)
+            for item in items
+        ],
+        'subtotal': sale.subtotal,
+        'discount': sale.discount_amount,
+        'grand_total': sale.grand_total,
+        'paid': sale.paid_amount,
+        'due': sale.due_amount,
+        'change': sale.change_amount,
+    }
+
+
+def _money(value):
+    return f"৳{value:,.2f}"
+
+
+def _draw_a4(c, data, font):
+    width, height = A4
+    left, right = 20 * mm, width - 20 * mm
+    y = height - 25 * mm
+
+    c.setFont(font, 18)
+    c.drawString(left, y, data['shop_name'])
+    c.setFont(font, 9)
+    for line in (data['shop_address'], data['shop_phone']):
+        if line:
+            y -= 5 * mm
+            c.drawString(left, y, line)
+
+    c.setFont(font, 14)
+    c.drawRightString(right, height - 25 * mm, 'ইনভয়েস')
+    c.setFont(font, 9)
+    c.drawRightString(right, height - 31 * mm, data['invoice_number'])
+    c.drawRightString(right, height - 36 * mm, data['sale_date'])
+
+    y -= 12 * mm
+    c.drawString(left, y, f"গ্রাহক: {data['customer']}")
+    if data['cashier']:
+        c.drawRightString(right, y, f"বিক্রেতা: {data['cashier']}")
+
+    # Items table
+    y -= 10 * mm
+    cols = (left, left + 95 * mm, left + 120 * mm, right)
+    c.setFont(font, 10)
+    c.drawString(cols[0], y, 'পণ্য')
+    c.drawRightString(cols[1] + 15 * mm, y, 'পরিমাণ')
+    c.drawRightString(cols[2] + 25 * mm, y, 'একক মূল্য')
+    c.drawRightString(cols[3], y, 'মোট')
+    y -= 2 * mm
+    c.line(left, y, right, y)
+    c.setFont(font, 9)
+
+    for name, quantity, unit_price, total in data['items']:
+        y -= 6 * mm
+        if y < 40 * mm:
+            c.showPage()
+            c.setFont(font, 9)
+            y = height - 25 * mm
+        c.drawString(cols[0], y, name[:60])
+        c.drawRightString(cols[1] + 15 * mm, y, f"{quantity:g}")
+        c.drawRightString(cols[2] + 25 * mm, y, _money(unit_price))
+        c.drawRightString(cols[3], y, _money(total))
+
+    y -= 3 * mm
+    c.line(left, y, right, y)
+
+    rows = [('উপমোট', data['subtotal'])]
+    if data['discount']:
+        rows.append(('ছাড়', -data['discount']))
+    rows += [('সর্বমোট', data['grand_total']), ('প্রদত্ত', data['paid'])]
+    if data['due']:
+        rows.append(('বাকি', data['due']))
+    if data['change']:
+        rows.append(('ফেরত', data['change']))
+
+    for label, value in rows:
+        y -= 6 * mm
+        c.setFont(font, 11 if label == 'সর্বমোট' else 9)
+        c.drawRightString(right - 35 * mm, y, label)
+        c.drawRightString(right, y, _money(value))
+
+    c.setFont(font, 9)
+    c.drawString(left, y, f"পেমেন্ট: {data['payment_method']}")
+    c.drawCentredString(width / 2, 20 * mm, 'ধন্যবাদ! আবার আসবেন।')
+    c.showPage()
+
+
+def _thermal_height(data):
+    # header + 2 lines per item + totals + footer
+    lines = 10 + 2 * len(data['items']) + 8
+    return lines * THERMAL_LINE + 2 * THERMAL_MARGIN
+
+
+def _draw_thermal(c, data, font):
+    height = _thermal_height(data)
+    c.setPageSize((THERMAL_WIDTH, height))
+    left, right = THERMAL_MARGIN, THERMAL_WIDTH - THERMAL_MARGIN
+    center = THERMAL_WIDTH / 2
+    y = height - THERMAL_MARGIN - THERMAL_LINE
+
+    def rule():
+        nonlocal y
+        c.setDash(1, 2)
+        c.line(left, y + THERMAL_LINE / 2, right, y + THERMAL_LINE / 2)
+        c.setDash()
+
+    c.setFont(font, 12)
+    c.drawCentredString(center, y, data['shop_name'])
+    c.setFont(font, 7)
+    for line in (data['shop_address'], data['shop_phone']):
+        y -= THERMAL_LINE
+        c.drawCentredString(center, y, line)
+
+    y -= THERMAL_LINE
+    rule()
+    c.setFont(font, 8)
+    for label, value in (('ইনভয়েস', data['invoice_number']), ('তারিখ', data['sale_date']), ('গ্রাহক', data['customer'])):
+        y -= THERMAL_LINE
+        c.drawString(left, y, label)
+        c.drawRightString(right, y, value)
+
+    y -= THERMAL_LINE
+    rule()
+    for name, quantity, unit_price, total in data['items']:
+        y -= THERMAL_LINE
+        c.setFont(font, 8)
+        c.drawString(left, y, name[:36])
+        y -= THERMAL_LINE
+        c.setFont(font, 7)
+        c.drawString(left + 2 * mm, y, f"{quantity:g} x {_money(unit_price)}")
+        c.drawRightString(right, y, _money(total))
+
+    y -= THERMAL_LINE
+    rule()
+    c.setFont(font, 8)
+    rows = [('উপমোট', data['subtotal']), ('ছাড়', data['discount']), ('সর্বমোট', data['grand_total']),
+            ('প্রদত্ত', data['paid']), ('বাকি', data['due']), ('ফেরত', data['change'])]
+    for label, value in rows:
+        y -= THERMAL_LINE
+        c.drawString(left, y, label)
+        c.drawRightString(right, y, _money(value))
+
+    y -= THERMAL_LINE * 1.5
+    c.setFont(font, 7)
+    c.drawCentredString(center, y, 'ধন্যবাদ! আবার আসবেন।')
+    c.showPage()
+
+
+DRAWERS = {
+    LAYOUT_A4: _draw_a4,
+    LAYOUT_THERMAL: _draw_thermal,
+}
+
+
+def render_invoices(data_list, layout=LAYOUT_A4):
+    """এক বা একাধিক ইনভয়েস একটি PDF-এ রেন্ডার করে bytes রিটার্ন করে"""
+    font = get_font()
+    draw = DRAWERS[layout]
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4, pageCompression=1)
+    c.setTitle(data_list[0]['invoice_number'] if len(data_list) == 1 else 'Invoices')
+    for data in data_list:
+        draw(c, data, font)
+    c.save()
+    return buffer.getvalue()
+
+
+def _render_chunk(args):
+    # Process pool entry point: must stay module-level and DB-free
+    data_list, layout = args
+    return render_invoices(data_list, layout)
+
+
+# ---------------------------------------------------------------------------
+# Render cache
+# ---------------------------------------------------------------------------
+
+def _cache_dir(sale):
+    return Path(settings.INVOICE_PDF_CACHE_DIR) / str(sale.organization_id or 0)
+
+
+def cache_path(sale, layout):
+    """Cache file keyed by sale id, layout and last modification time"""
+    stamp = sale.updated_at
+    if sale.organization_id and sale.organization.updated_at > stamp:
+        # Shop name/address changes must also invalidate reprints
+        stamp = sale.organization.updated_at
+    return _cache_dir(sale) / f"{sale.pk}-{layout}-{int(stamp.timestamp() * 1000000)}.pdf"
+
+
+def _write_atomic(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def get_invoice_pdf(sale, layout=LAYOUT_A4):
+    """ক্যাশ থেকে PDF দিন, না থাকলে রেন্ডার করে ক্যাশে রাখুন"""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown invoice layout: {layout}")
+
+    path = cache_path(sale, layout)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+
+    content = render_invoices([invoice_data(sale)], layout)
+    _write_atomic(path, content)
+
+    # Drop stale renders of the same sale/layout
+    for old in path.parent.glob(f"{sale.pk}-{layout}-*.pdf"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return content
+
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+def render_daily_invoices(organization, date, layout=LAYOUT_A4, workers=None):
+    """একদিনের সব ইনভয়েস একটি PDF-এ (process pool দিয়ে)"""
+    from pypdf import PdfWriter
+    from .models import Sale, SaleItem
+
+    sales = list(
+        Sale.objects.filter(organization=organization, sale_date__date=date)
+        .select_related('organization', 'customer', 'created_by')
+        .order_by('sale_date', 'id')
+    )
+    if not sales:
+        return None
+
+    # One query for all lines of the day
+    items_by_sale = {}
+    lines = SaleItem.objects.filter(sale__in=sales).select_related(
+        'product', 'product__gsm', 'product__size'
+    ).order_by('id')
+    for item in lines:
+        items_by_sale.setdefault(item.sale_id, []).append(item)
+
+    data_list = [invoice_data(sale, items_by_sale.get(sale.pk, [])) for sale in sales]
+
+    workers = workers or settings.INVOICE_PDF_WORKERS
+    if workers <= 1 or len(data_list) < 2 * workers:
+        return render_invoices(data_list, layout)
+
+    # Contiguous chunks keep the merged document in sale order
+    size = -(-len(data_list) // workers)
+    chunks = [(data_list[i:i + size], layout) for i in range(0, len(data_list), size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_render_chunk, chunks))
+
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(io.BytesIO(part))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
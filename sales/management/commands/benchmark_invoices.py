@@ -0,0 +1,67 @@
+import time
+from decimal import Decimal
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from sales import invoice_pdf
+
+
+class Command(BaseCommand):
+    help = 'Benchmark PDF invoice rendering (invoices/second)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200, help='Number of invoices to render')
+        parser.add_argument('--items', type=int, default=8, help='Lines per invoice')
+        parser.add_argument('--workers', type=int, default=4, help='Process pool size for batch mode')
+
+    def sample_invoice(self, number, items):
+        lines = [
+            (f'অফসেট কাগজ {n} (80 GSM) - A4', Decimal('2'), Decimal('450.00'), Decimal('900.00'))
+            for n in range(items)
+        ]
+        total = sum(line[3] for line in lines)
+        return {
+            'invoice_number': f'INV-BENCH-{number:05d}',
+            'sale_date': '01/01/2025 10:00 AM',
+            'shop_name': 'স্টেশনারি শপ',
+            'shop_address': 'ঢাকা',
+            'shop_phone': '01700000000',
+            'customer': 'ওয়াক-ইন গ্রাহক',
+            'cashier': 'admin',
+            'payment_method': 'নগদ',
+            'items': lines,
+            'subtotal': total,
+            'discount': Decimal('0'),
+            'grand_total': total,
+            'paid': total,
+            'due': Decimal('0'),
+            'change': Decimal('0'),
+        }
+
+    def report(self, label, count, elapsed):
+        self.stdout.write(f'{label:<28} {count / elapsed:>10.1f} invoices/s  ({elapsed:.2f}s)')
+
+    def handle(self, *args, **options):
+        count, workers = options['count'], options['workers']
+        data_list = [self.sample_invoice(n, options['items']) for n in range(count)]
+        invoice_pdf.get_font()
+
+        for layout in invoice_pdf.LAYOUTS:
+            start = time.perf_counter()
+            for data in data_list:
+                invoice_pdf.render_invoices([data], layout)
+            self.report(f'{layout} single', count, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            invoice_pdf.render_invoices(data_list, layout)
+            self.report(f'{layout} batch (1 process)', count, time.perf_counter() - start)
+
+            size = -(-count // workers)
+            chunks = [(data_list[i:i + size], layout) for i in range(0, count, size)]
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(invoice_pdf._render_chunk, chunks))
+            self.report(f'{layout} batch ({workers} processes)', count, time.perf_counter() - start)
+
+        self.stdout.write(self.style.SUCCESS('Done!'))
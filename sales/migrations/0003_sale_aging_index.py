@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0002_customer_organization_sale_organization'),
+        ('tenants', '0002_organization_valuation_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['organization', 'payment_status', 'sale_date'], name='sale_org_status_date_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:30
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_sale_organization(apps, schema_editor):
+    """Sales made before the views set it belong to the seller's shop"""
+    Sale = apps.get_model('sales', 'Sale')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Sale.objects.filter(organization__isnull=True, created_by__isnull=False).update(
+        organization=Subquery(User.objects.filter(pk=OuterRef('created_by')).values('organization')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0003_sale_aging_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        # The backfill reads User.organization
+        ('accounts', '0002_user_is_owner_user_organization'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sale_organization, migrations.RunPython.noop),
+    ]
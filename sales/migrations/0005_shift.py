@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_locations'),
+        ('sales', '0004_sale_organization_backfill'),
+        ('tenants', '0002_organization_valuation_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Shift',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('open', 'চলমান'), ('closed', 'বন্ধ')], default='open', max_length=10, verbose_name='অবস্থা')),
+                ('opening_float', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='শুরুর ক্যাশ')),
+                ('expected_cash', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='নগদ')),
+                ('expected_card', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='কার্ড')),
+                ('expected_mobile', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='মোবাইল ব্যাংকিং')),
+                ('expected_bank', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='ব্যাংক ট্রান্সফার')),
+                ('credit_sales', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='বাকি বিক্রি')),
+                ('sale_count', models.PositiveIntegerField(default=0, verbose_name='বিক্রয় সংখ্যা')),
+                ('payment_count', models.PositiveIntegerField(default=0, verbose_name='পেমেন্ট সংখ্যা')),
+                ('counted_cash', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='গণনাকৃত ক্যাশ')),
+                ('variance', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True, verbose_name='পার্থক্য')),
+                ('notes', models.TextField(blank=True, verbose_name='নোট')),
+                ('opened_at', models.DateTimeField(auto_now_add=True, verbose_name='শুরু')),
+                ('closed_at', models.DateTimeField(blank=True, null=True, verbose_name='শেষ')),
+                ('cashier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shifts', to=settings.AUTH_USER_MODEL, verbose_name='ক্যাশিয়ার')),
+                ('closed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='বন্ধ করেছেন')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shifts', to='inventory.location', verbose_name='শাখা')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='shifts', to='tenants.organization')),
+            ],
+            options={
+                'verbose_name': 'শিফট',
+                'verbose_name_plural': 'শিফট সমূহ',
+                'ordering': ['-opened_at'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'open')), fields=('organization', 'cashier'), name='one_open_shift_per_cashier')],
+            },
+        ),
+    ]
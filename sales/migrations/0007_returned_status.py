@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:34
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_returned(apps, schema_editor):
+    """Sales already returned in full were saved as paid"""
+    Sale = apps.get_model('sales', 'Sale')
+    Sale.objects.filter(grand_total__gt=0, returned_amount__gte=F('grand_total')).update(payment_status='returned')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0006_returns'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sale',
+            name='payment_status',
+            field=models.CharField(choices=[('paid', 'পরিশোধিত'), ('partial', 'আংশিক'), ('unpaid', 'অপরিশোধিত'), ('returned', 'ফেরত')], default='unpaid', max_length=20, verbose_name='পেমেন্ট স্ট্যাটাস'),
+        ),
+        migrations.RunPython(mark_returned, migrations.RunPython.noop),
+    ]
@@ -45,6 +45,7 @@ class Sale(models.Model):
         ('paid', 'পরিশোধিত'),
         ('partial', 'আংশিক'),
         ('unpaid', 'অপরিশোধিত'),
+        ('returned', 'ফেরত'),
     ]
     
     PAYMENT_METHODS = [
@@ -71,6 +72,8 @@ class Sale(models.Model):
     paid_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='প্রদত্ত টাকা')
     due_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='বাকি টাকা')
     change_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name='ফেরত')
+    # Value of goods returned against this invoice (SaleReturn); no longer owed
+    returned_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='ফেরত পণ্যের মূল্য')
     
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS, default='unpaid', verbose_name='পেমেন্ট স্ট্যাটাস')
     payment_method = models.CharField(max_length=20, choices=PAYMENT_METHODS, default='cash', verbose_name='পেমেন্ট মাধ্যম')
@@ -84,6 +87,9 @@ class Sale(models.Model):
         verbose_name = 'বিক্রয়'
         verbose_name_plural = 'বিক্রয় সমূহ'
         ordering = ['-sale_date']
+        indexes = [
+            models.Index(fields=['organization', 'payment_status', 'sale_date'], name='sale_org_status_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.invoice_number} - {self.grand_total}৳"
@@ -104,13 +110,15 @@ class Sale(models.Model):
                 self.invoice_number = f"{prefix}-0001"
         
         # Calculate totals
-        self.due_amount = self.grand_total - self.paid_amount
+        self.due_amount = self.grand_total - self.returned_amount - self.paid_amount
         if self.due_amount < 0:
             self.change_amount = abs(self.due_amount)
             self.due_amount = 0
         
-        # Set payment status
-        if self.due_amount == 0 and self.grand_total > 0:
+        # Set payment status; fully returned goods leave nothing owed but were not paid for
+        if self.grand_total > 0 and self.returned_amount >= self.grand_total:
+            self.payment_status = 'returned'
+        elif self.due_amount == 0 and self.grand_total > 0:
             self.payment_status = 'paid'
         elif self.paid_amount > 0:
             self.payment_status = 'partial'
@@ -164,3 +172,112 @@ class Payment(models.Model):
     
     def __str__(self):
         return f"{self.sale.invoice_number} - {self.amount}৳"
+
+
+
+class SaleReturn(models.Model):
+    """বিক্রয় ফেরত (ক্রেডিট নোট)"""
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='sale_returns'
+    )
+    sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name='returns', verbose_name='বিক্রয়')
+    return_number = models.CharField(max_length=60, unique=True, verbose_name='ক্রেডিট নোট নম্বর')
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='ফেরত মূল্য')
+    # total_amount = credit_amount (taken off what was still due) + refund_amount (money given back)
+    credit_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='বাকি থেকে বাদ')
+    refund_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='টাকা ফেরত')
+    refund_method = models.CharField(max_length=20, choices=Sale.PAYMENT_METHODS, default='cash', verbose_name='ফেরতের মাধ্যম')
+    cost_amount = models.DecimalField(max_digits=16, decimal_places=4, default=0, verbose_name='পণ্যের খরচ')
+    reason = models.TextField(blank=True, verbose_name='কারণ')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, verbose_name='তৈরি করেছেন')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='তারিখ')
+    
+    class Meta:
+        verbose_name = 'বিক্রয় ফেরত'
+        verbose_name_plural = 'বিক্রয় ফেরত সমূহ'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.return_number} - {self.total_amount}৳"
+
+
+class SaleReturnItem(models.Model):
+    """ফেরত আইটেম"""
+    sale_return = models.ForeignKey(SaleReturn, on_delete=models.CASCADE, related_name='items', verbose_name='ক্রেডিট নোট')
+    sale_item = models.ForeignKey(SaleItem, on_delete=models.CASCADE, related_name='returns', verbose_name='বিক্রয় আইটেম')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name='পণ্য')
+    quantity = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))], verbose_name='পরিমাণ')
+    # The line's price after its own and the invoice's discount
+    unit_price = models.DecimalField(max_digits=12, decimal_places=4, verbose_name='একক মূল্য')
+    total = models.DecimalField(max_digits=12, decimal_places=2, verbose_name='মোট')
+    unit_cost = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True, verbose_name='একক খরচ')
+    
+    class Meta:
+        verbose_name = 'ফেরত আইটেম'
+        verbose_name_plural = 'ফেরত আইটেম সমূহ'
+    
+    def __str__(self):
+        return f"{self.product_id} x {self.quantity}"
+
+class Shift(models.Model):
+    """ক্যাশিয়ারের শিফট (ক্যাশ ড্রয়ার)"""
+    STATUS_CHOICES = [
+        ('open', 'চলমান'),
+        ('closed', 'বন্ধ'),
+    ]
+    
+    organization = models.ForeignKey(
+        'tenants.Organization', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='shifts'
+    )
+    cashier = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='shifts', verbose_name='ক্যাশিয়ার')
+    location = models.ForeignKey(
+        'inventory.Location', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='shifts', verbose_name='শাখা'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open', verbose_name='অবস্থা')
+    opening_float = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='শুরুর ক্যাশ')
+    
+    # Kept current by each sale and payment as it commits (see shifts.record_sale / record_payment)
+    expected_cash = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='নগদ')
+    expected_card = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='কার্ড')
+    expected_mobile = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='মোবাইল ব্যাংকিং')
+    expected_bank = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='ব্যাংক ট্রান্সফার')
+    credit_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='বাকি বিক্রি')
+    sale_count = models.PositiveIntegerField(default=0, verbose_name='বিক্রয় সংখ্যা')
+    payment_count = models.PositiveIntegerField(default=0, verbose_name='পেমেন্ট সংখ্যা')
+    
+    counted_cash = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name='গণনাকৃত ক্যাশ')
+    variance = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, verbose_name='পার্থক্য')
+    notes = models.TextField(blank=True, verbose_name='নোট')
+    opened_at = models.DateTimeField(auto_now_add=True, verbose_name='শুরু')
+    closed_at = models.DateTimeField(null=True, blank=True, verbose_name='শেষ')
+    closed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+', verbose_name='বন্ধ করেছেন'
+    )
+    
+    class Meta:
+        verbose_name = 'শিফট'
+        verbose_name_plural = 'শিফট সমূহ'
+        ordering = ['-opened_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'cashier'], condition=models.Q(status='open'),
+                name='one_open_shift_per_cashier',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.cashier} - {self.opened_at:%Y-%m-%d %H:%M}"
+    
+    @property
+    def expected_in_drawer(self):
+        """ড্রয়ারে যা থাকার কথা"""
+        return self.opening_float + self.expected_cash
+    
+    @property
+    def expected_total(self):
+        """সব মাধ্যমে মোট আদায়"""
+        return self.expected_cash + self.expected_card + self.expected_mobile + self.expected_bank
@@ -0,0 +1,149 @@
+"""
+বিক্রয় ফেরত (ক্রেডিট নোট)
+A return names the invoice lines and the quantity coming back. It is priced
+at what the customer actually paid for each line (the line's own discount
+and its share of the invoice discount), comes off what the invoice still
+owes first and is refunded for the rest, and goes back into stock at the cost
+it left with, so the journal reverses the sale's revenue and cost of goods
+exactly.
+
+However many lines an invoice has, a return costs a fixed number of
+statements: the lines and what was already returned against them are read
+in one query each, the stock rows are locked together and written in one
+executemany, the movements and return lines are bulk-inserted, and the
+invoice, journal and cashier's shift are each updated once - all in the
+transaction that creates the credit note.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from accounting import journal
+from inventory import alerts, valuation
+from inventory.models import Stock, StockMovement
+from stationery_shop.db import bulk_update_columns
+from . import shifts
+from .models import Sale, SaleItem, SaleReturn, SaleReturnItem
+
+ZERO = Decimal('0')
+CENTS = Decimal('0.01')
+PRICE_PLACES = Decimal('0.0001')
+
+
+class ReturnError(Exception):
+    pass
+
+
+def returned_quantities(item_ids):
+    """{sale item id: quantity already returned}"""
+    return dict(
+        SaleReturnItem.objects.filter(sale_item_id__in=list(item_ids))
+        .values('sale_item_id').annotate(quantity=Sum('quantity')).order_by()
+        .values_list('sale_item_id', 'quantity')
+    )
+
+
+def _unit_costs(sale, product_ids):
+    """What each product cost when it left on this sale (from the sale's costed movements)"""
+    rows = (
+        StockMovement.objects.filter(movement_type='out', reference=sale.invoice_number, product_id__in=product_ids)
+        .values('product_id').annotate(quantity=Sum('quantity'), cost=Sum('total_cost')).order_by()
+    )
+    return {row['product_id']: row['cost'] / row['quantity'] for row in rows if row['quantity'] and row['cost'] is not None}
+
+
+@transaction.atomic
+def create_return(sale, quantities, user, refund_method='cash', reason=''):
+    """quantities: {sale item id: quantity coming back} -> SaleReturn"""
+    quantities = {item_id: quantity for item_id, quantity in quantities.items() if quantity > 0}
+    if not quantities:
+        raise ReturnError('ফেরতের পরিমাণ দিন')
+
+    # Returns and payments against one invoice go one at a time
+    sale = Sale.objects.select_for_update().get(pk=sale.pk)
+    items = {item.pk: item for item in SaleItem.objects.filter(sale=sale, pk__in=quantities).select_related('product')}
+    if len(items) != len(quantities):
+        raise ReturnError('এই ইনভয়েসে এমন আইটেম নেই')
+    already = returned_quantities(items)
+    for item_id, quantity in quantities.items():
+        item = items[item_id]
+        if quantity > item.quantity - already.get(item_id, ZERO):
+            raise ReturnError(f'{item.product.name}: বিক্রির চেয়ে বেশি ফেরত নেওয়া যাবে না')
+
+    number = f'CN-{sale.invoice_number}-{sale.returns.count() + 1}'
+    # The invoice discount is shared over the lines in proportion to their totals
+    share = sale.grand_total / sale.subtotal if sale.subtotal else Decimal('1')
+    product_ids = {item.product_id for item in items.values()}
+    costs = _unit_costs(sale, product_ids)
+
+    Stock.objects.bulk_create(
+        [Stock(product_id=product_id, quantity=0, reorder_level=10, organization=sale.organization)
+         for product_id in product_ids],
+        ignore_conflicts=True,
+    )
+    stocks = {
+        stock.product_id: stock
+        for stock in Stock.objects.select_for_update().filter(product_id__in=product_ids).order_by('pk')
+    }
+
+    now = timezone.now()
+    lines, movements = [], []
+    for item_id, quantity in quantities.items():
+        item = items[item_id]
+        unit_price = (item.total / item.quantity * share).quantize(PRICE_PLACES)
+        lines.append(SaleReturnItem(
+            sale_item=item, product_id=item.product_id, quantity=quantity,
+            unit_price=unit_price, total=(unit_price * quantity).quantize(CENTS),
+        ))
+        stock = stocks[item.product_id]
+        previous_qty = stock.quantity
+        stock.quantity += quantity
+        stock.last_updated = now
+        movements.append(StockMovement(
+            organization=sale.organization,
+            product_id=item.product_id,
+            movement_type='return',
+            quantity=quantity,
+            previous_quantity=previous_qty,
+            new_quantity=stock.quantity,
+            unit_cost=costs.get(item.product_id),
+            reference=number,
+            notes=f'বিক্রয় ফেরত: {sale.invoice_number}',
+            created_by=user,
+        ))
+
+    bulk_update_columns(Stock, stocks.values(), ['quantity', 'last_updated'])
+    # Without a costed sale movement (e.g. archived) the book's current cost is used
+    movements = StockMovement.objects.bulk_create(movements, batch_size=1000)
+    valuation.apply(movements)
+    alerts.refresh([stock.pk for stock in stocks.values()])
+
+    value = min(sum((line.total for line in lines), ZERO), sale.grand_total - sale.returned_amount)
+    credit = min(value, max(sale.due_amount, ZERO))
+    sale_return = SaleReturn.objects.create(
+        organization=sale.organization,
+        sale=sale,
+        return_number=number,
+        total_amount=value,
+        credit_amount=credit,
+        refund_amount=value - credit,
+        refund_method=refund_method,
+        cost_amount=sum((movement.total_cost or ZERO for movement in movements), ZERO),
+        reason=reason,
+        created_by=user,
+    )
+    for line, movement in zip(lines, movements):
+        line.sale_return = sale_return
+        line.unit_cost = movement.unit_cost
+    SaleReturnItem.objects.bulk_create(lines, batch_size=1000)
+
+    # paid_amount may include change handed back; only what was kept can be refunded
+    sale.paid_amount = min(sale.paid_amount, sale.grand_total - sale.returned_amount) - sale_return.refund_amount
+    sale.returned_amount += value
+    sale.save()
+
+    journal.post_sale_return(sale_return)
+    shifts.record_refund(sale_return)
+    return sale_return
@@ -0,0 +1,99 @@
+"""
+ক্যাশিয়ারের শিফট
+A cashier opens a shift with the float in the drawer. Every sale and customer
+payment they take then adds to the shift's expected total for its payment
+method in the same transaction - one UPDATE on the cashier's open shift,
+found by the (organization, cashier) open-shift constraint, with F()
+increments so two terminals never lose each other's amounts. Closing the
+shift compares the counted cash with the float plus expected cash, a read of
+the one row however many sales it covered.
+
+Money taken with no open shift is still sold and posted; it just belongs to
+no shift.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Shift
+
+# Which expected total each payment method adds to; like the journal, 'credit'
+# money actually taken at the counter counts as cash
+METHOD_FIELDS = {'cash': 'expected_cash', 'card': 'expected_card', 'mobile': 'expected_mobile', 'bank': 'expected_bank'}
+
+
+class ShiftError(Exception):
+    pass
+
+
+def current(organization, cashier):
+    """The cashier's open shift, if any"""
+    return Shift.objects.filter(organization=organization, cashier=cashier, status='open').first()
+
+
+def open_shift(organization, cashier, opening_float, location=None):
+    try:
+        with transaction.atomic():
+            return Shift.objects.create(
+                organization=organization, cashier=cashier, opening_float=opening_float, location=location,
+            )
+    except IntegrityError:
+        raise ShiftError('আপনার একটি শিফট ইতিমধ্যে চলমান')
+
+
+def _add(organization, cashier_id, amounts):
+    amounts = {field: F(field) + value for field, value in amounts.items() if value}
+    if not amounts or cashier_id is None:
+        return 0
+    return Shift.objects.filter(organization=organization, cashier_id=cashier_id, status='open').update(**amounts)
+
+
+def record_sale(sale):
+    """What was taken at the counter (change already given back) and what was sold on credit"""
+    return _add(sale.organization, sale.created_by_id, {
+        METHOD_FIELDS.get(sale.payment_method, 'expected_cash'): min(sale.paid_amount, sale.grand_total),
+        'credit_sales': sale.due_amount,
+        'sale_count': 1,
+    })
+
+
+def record_payment(payment):
+    return _add(payment.sale.organization, payment.received_by_id, {
+        METHOD_FIELDS.get(payment.payment_method, 'expected_cash'): payment.amount,
+        'payment_count': 1,
+    })
+
+
+def record_payments(organization, cashier_id, payments):
+    """Several payments taken by one cashier at once (a customer receipt)"""
+    amounts = defaultdict(Decimal)
+    for payment in payments:
+        amounts[METHOD_FIELDS.get(payment.payment_method, 'expected_cash')] += payment.amount
+    amounts['payment_count'] = len(payments)
+    return _add(organization, cashier_id, amounts)
+
+
+def record_refund(sale_return):
+    """Money handed back for a return leaves the drawer of whoever took the return"""
+    return _add(sale_return.organization, sale_return.created_by_id, {
+        METHOD_FIELDS.get(sale_return.refund_method, 'expected_cash'): -sale_return.refund_amount,
+    })
+
+
+@transaction.atomic
+def close_shift(shift, counted_cash, user=None, notes=''):
+    """শিফট বন্ধ: variance = counted cash - (float + expected cash)"""
+    shift = Shift.objects.select_for_update().get(pk=shift.pk)
+    if shift.status != 'open':
+        raise ShiftError('শিফটটি আগেই বন্ধ হয়েছে')
+    shift.counted_cash = counted_cash
+    shift.variance = counted_cash - shift.expected_in_drawer
+    shift.notes = notes
+    shift.status = 'closed'
+    shift.closed_at = timezone.now()
+    shift.closed_by = user
+    shift.save()
+    return shift
@@ -1,3 +1,216 @@
-from django.test import TestCase
+import io
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from accounts.models import User
+from tenants import quota
+from tenants.models import Organization, OrganizationUsage, SubscriptionPlan
+from inventory.models import Stock
+from products.models import Product
+from . import allocation, returns
+from .models import Customer, Payment, Sale, SaleItem
+
+# A year of a busy shop's invoices
+SALES_PER_DAY = 40
+EXPORT_DAYS = 365
+# Streamed, these exports peak around 2 MB; built as a normal workbook, 45-55 MB
+PEAK_MEMORY_LIMIT = 24 * 1024 * 1024
+
+
+def make_shop(slug):
+    org = Organization.objects.create(name=slug, slug=slug, owner_name='o', email=f'{slug}@example.com', phone='1')
+    user = User.objects.create_user(username=f'{slug}-user', password='p', organization=org)
+    return org, user
+
+
+def make_sale(org, user, grand_total='100', paid='0'):
+    return Sale.objects.create(
+        organization=org, created_by=user, subtotal=Decimal(grand_total),
+        grand_total=Decimal(grand_total), paid_amount=Decimal(paid),
+    )
+
+
+@override_settings(INVOICE_PDF_CACHE_DIR=tempfile.mkdtemp())
+class InvoiceAccessTests(TestCase):
+    def test_invoice_pdf_is_only_served_to_the_sales_shop(self):
+        first, first_user = make_shop('first')
+        second, second_user = make_shop('second')
+        sale = make_sale(first, first_user)
+        url = reverse('sales:sale_invoice_pdf', args=[sale.pk])
+
+        self.client.force_login(second_user)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(first_user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+
+class AddPaymentTests(TestCase):
+    def setUp(self):
+        self.org, self.user = make_shop('shop')
+        self.sale = make_sale(self.org, self.user, grand_total='100', paid='40')
+        self.url = reverse('sales:add_payment', args=[self.sale.pk])
+        self.client.force_login(self.user)
+
+    def test_payment_reduces_the_due(self):
+        self.client.post(self.url, {'amount': '60', 'payment_method': 'cash'})
+
+        self.sale.refresh_from_db()
+        self.assertEqual((self.sale.due_amount, self.sale.payment_status), (Decimal('0'), 'paid'))
+
+    def test_invalid_amounts_are_rejected(self):
+        for amount in ['0', '-10', 'abc', 'NaN', '60.01']:
+            response = self.client.post(self.url, {'amount': amount})
+            self.assertRedirects(response, reverse('sales:sale_detail', args=[self.sale.pk]),
+                                 fetch_redirect_response=False)
+        self.assertFalse(Payment.objects.exists())
+        self.sale.refresh_from_db()
+        self.assertEqual(self.sale.due_amount, Decimal('60'))
+
+    def test_other_shops_sales_are_not_found(self):
+        other, other_user = make_shop('other')
+        self.client.force_login(other_user)
+
+        self.assertEqual(self.client.post(self.url, {'amount': '10'}).status_code, 404)
+
+
+class AllocationTests(TestCase):
+    def setUp(self):
+        self.org, self.user = make_shop('shop')
+        self.customer = Customer.objects.create(organization=self.org, name='গ্রাহক', phone='1')
+        start = timezone.make_aware(datetime(2026, 1, 1, 10))
+        self.sales = []
+        for day, total in enumerate(['100', '50', '30']):
+            sale = make_sale(self.org, self.user, grand_total=total)
+            sale.customer = self.customer
+            sale.save()
+            Sale.objects.filter(pk=sale.pk).update(sale_date=start + timedelta(days=day))
+            self.sales.append(sale)
+
+    def dues(self):
+        return [(sale.due_amount, sale.payment_status) for sale in Sale.objects.filter(customer=self.customer).order_by('sale_date')]
+
+    def test_receipt_settles_the_oldest_invoices_first(self):
+        payments = allocation.receive(self.org, self.customer, Decimal('120'), user=self.user)
+
+        self.assertEqual([(payment.sale_id, payment.amount) for payment in payments],
+                         [(self.sales[0].pk, Decimal('100')), (self.sales[1].pk, Decimal('20'))])
+        self.assertEqual(self.dues(), [(Decimal('0'), 'paid'), (Decimal('30'), 'partial'), (Decimal('30'), 'unpaid')])
+
+    def test_receipt_above_the_total_due_is_refused(self):
+        for amount in [Decimal('0'), Decimal('-5'), Decimal('180.01')]:
+            with self.assertRaises(allocation.AllocationError):
+                allocation.receive(self.org, self.customer, amount, user=self.user)
+        self.assertFalse(Payment.objects.exists())
+        self.assertEqual([due for due, status in self.dues()], [Decimal('100'), Decimal('50'), Decimal('30')])
+
+
+class SaleReturnTests(TestCase):
+    def setUp(self):
+        self.org, self.user = make_shop('shop')
+        product = Product.objects.create(
+            organization=self.org, name='কলম', buying_price=Decimal('5'), selling_price=Decimal('10'),
+        )
+        Stock.objects.create(organization=self.org, product=product, quantity=Decimal('10'))
+        self.sale = make_sale(self.org, self.user, grand_total='100')
+        self.item = SaleItem.objects.create(
+            sale=self.sale, product=product, quantity=Decimal('10'), unit_price=Decimal('10'), total=Decimal('100'),
+        )
+
+    def test_fully_returned_unpaid_sale_is_not_paid(self):
+        returns.create_return(self.sale, {self.item.pk: Decimal('10')}, self.user)
+
+        self.sale.refresh_from_db()
+        self.assertEqual((self.sale.due_amount, self.sale.payment_status), (Decimal('0'), 'returned'))
+
+    def test_partly_returned_sale_still_owes_the_rest(self):
+        returns.create_return(self.sale, {self.item.pk: Decimal('4')}, self.user)
+
+        self.sale.refresh_from_db()
+        self.assertEqual((self.sale.due_amount, self.sale.payment_status), (Decimal('60'), 'unpaid'))
+
+
+class SaleQuotaTests(TestCase):
+    def test_sale_over_the_monthly_limit_is_refused_not_a_server_error(self):
+        org, user = make_shop('shop')
+        org.plan = SubscriptionPlan.objects.create(name='free', display_name='ফ্রি', max_monthly_sales=1)
+        org.save()
+        self.client.force_login(user)
+        # A sale from another terminal lands after sale_add's pre-check
+        quota.usage(org)
+        with mock.patch('tenants.quota.allows', return_value=True):
+            OrganizationUsage.objects.filter(organization=org).update(monthly_sale_count=1)
+            response = self.client.post(reverse('sales:sale_add'), {'product_id[]': [], 'quantity[]': []})
+
+        self.assertRedirects(response, reverse('sales:sale_list'), fetch_redirect_response=False)
+        self.assertFalse(Sale.objects.exists())
+
+
+class SalesExportTests(TestCase):
+    period = {'from_date': '2025-01-01', 'to_date': '2025-12-31'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.org, cls.user = make_shop('big')
+        customer = Customer.objects.create(organization=cls.org, name='গ্রাহক', phone='1')
+        sales = Sale.objects.bulk_create(
+            [Sale(organization=cls.org, customer=customer, created_by=cls.user, invoice_number=f'INV-T-{i:06d}',
+                  subtotal=Decimal('120'), grand_total=Decimal('120'), paid_amount=Decimal('100'),
+                  due_amount=Decimal('20'), payment_status='partial')
+             for i in range(SALES_PER_DAY * EXPORT_DAYS)],
+            batch_size=2000,
+        )
+        # sale_date is auto_now_add, so the year is spread out afterwards
+        start = timezone.make_aware(datetime(2025, 1, 1, 10))
+        for day in range(EXPORT_DAYS):
+            Sale.objects.filter(
+                pk__in=[sale.pk for sale in sales[day * SALES_PER_DAY:(day + 1) * SALES_PER_DAY]]
+            ).update(sale_date=start + timedelta(days=day))
+
+    def peak_memory(self, url, params=None):
+        self.client.force_login(self.user)
+        tracemalloc.start()
+        try:
+            response = self.client.get(url, params)
+            content = b''.join(response.streaming_content)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(response.status_code, 200)
+        return content, peak
+
+    def test_one_year_sales_export_streams_within_memory_ceiling(self):
+        content, peak = self.peak_memory(reverse('sales:daily_sales_export'), self.period)
+
+        self.assertLess(peak, PEAK_MEMORY_LIMIT)
+        sheet = load_workbook(io.BytesIO(content), read_only=True)['বিক্রয়']
+        self.assertEqual(sum(1 for row in sheet.iter_rows(min_row=2)), SALES_PER_DAY * EXPORT_DAYS)
+
+    def test_due_report_export_streams_within_memory_ceiling(self):
+        content, peak = self.peak_memory(reverse('sales:due_report_export'))
+
+        self.assertLess(peak, PEAK_MEMORY_LIMIT)
+        workbook = load_workbook(io.BytesIO(content), read_only=True)
+        aging = list(workbook['এজিং'].iter_rows(min_row=2, values_only=True))
+        self.assertEqual(len(aging), 1)
+        self.assertEqual(aging[0][2], SALES_PER_DAY * EXPORT_DAYS)
+        self.assertEqual(sum(1 for row in workbook['বাকি ইনভয়েস'].iter_rows(min_row=2)), SALES_PER_DAY * EXPORT_DAYS)
+
+    def test_exports_only_contain_the_users_shop(self):
+        other, other_user = make_shop('other')
+        make_sale(other, other_user)
+        self.client.force_login(other_user)
+
+        response = self.client.get(reverse('sales:due_report_export'))
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        self.assertEqual(len(list(workbook['বাকি ইনভয়েস'].iter_rows(min_row=2))), 1)
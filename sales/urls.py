@@ -9,17 +9,32 @@ urlpatterns = [
     path('add/', views.sale_add, name='sale_add'),
     path('<int:pk>/', views.sale_detail, name='sale_detail'),
     path('<int:pk>/invoice/', views.sale_invoice, name='sale_invoice'),
+    path('<int:pk>/invoice/pdf/', views.sale_invoice_pdf, name='sale_invoice_pdf'),
     path('<int:pk>/payment/', views.add_payment, name='add_payment'),
+    path('<int:pk>/return/', views.sale_return, name='sale_return'),
+    
+    # Shifts
+    path('shifts/', views.shift_list, name='shift_list'),
+    path('shifts/open/', views.shift_open, name='shift_open'),
+    path('shifts/<int:pk>/', views.shift_detail, name='shift_detail'),
     
     # Customers
     path('customers/', views.customer_list, name='customer_list'),
     path('customers/add/', views.customer_add, name='customer_add'),
     path('customers/<int:pk>/', views.customer_detail, name='customer_detail'),
+    path('customers/<int:pk>/receipt/', views.customer_receipt, name='customer_receipt'),
     
     # Reports
     path('report/daily/', views.daily_sales_report, name='daily_sales_report'),
+    path('report/daily/export/', views.daily_sales_export, name='daily_sales_export'),
     path('report/due/', views.due_report, name='due_report'),
+    path('report/due/export/', views.due_report_export, name='due_report_export'),
+    path('report/due/customer/<int:pk>/', views.due_customer_detail, name='due_customer_detail'),
+    path('report/invoices/', views.daily_invoices_pdf, name='daily_invoices_pdf'),
     
     # API
     path('api/create/', views.create_sale_api, name='create_sale_api'),
+    path('api/reserve/', views.reserve_stock_api, name='reserve_stock_api'),
+    path('api/release/', views.release_stock_api, name='release_stock_api'),
+    path('api/availability/', views.stock_availability_api, name='stock_availability_api'),
 ]
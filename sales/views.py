@@ -1,16 +1,26 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
-from django.db.models import Sum, Q
+from django.db import transaction
+from django.http import JsonResponse, HttpResponse, HttpResponseBadRequest
+from django.db.models import Count, Sum, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.views.decorators.csrf import csrf_exempt
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 import json
+import uuid
 
-from .models import Customer, Sale, SaleItem, Payment
+from .models import Customer, Sale, SaleItem, Payment, Shift
+from . import allocation, invoice_pdf, returns, shifts
+from stationery_shop import aging
+from stationery_shop.exports import EXPORT_CHUNK_SIZE, scope_to_org, xlsx_response
 from products.models import Product
-from inventory.models import Stock, StockMovement
+from products import reference_cache
+from inventory.models import Location, Stock, StockMovement
+from inventory import locations, reservations
+from accounting import journal
+from tenants import quota
 
 
 @login_required
@@ -46,76 +56,178 @@ def sale_list(request):
     return render(request, 'sales/sale_list.html', context)
 
 
+def _pos_location(request, location_id):
+    """POS যে শাখা থেকে বিক্রি করছে; None = the main store"""
+    organization = getattr(request.user, 'organization', None)
+    if not location_id or organization is None or not organization.has_multiple_locations():
+        return None
+    return Location.objects.filter(organization=organization, pk=location_id, is_active=True).first()
+
+
 @login_required
 def pos(request):
     """POS - Point of Sale"""
-    products = Product.objects.filter(is_active=True).select_related('stock', 'unit')[:50]
+    products = reference_cache.hydrate(Product.objects.filter(is_active=True).select_related('stock')[:50])
     customers = Customer.objects.filter(is_active=True)
+    location = _pos_location(request, request.GET.get('location'))
+    
+    # The grid shows what is left at this location after other terminals' carts, not the raw stock
+    available = reservations.available_quantities([product.pk for product in products], location=location)
+    for product in products:
+        product.available = available[product.pk]
     
+    organization = getattr(request.user, 'organization', None)
     context = {
         'products': products,
         'customers': customers,
+        'cart_id': uuid.uuid4().hex,
+        'shift': shifts.current(organization, request.user),
+        'location': location,
+        'locations': (
+            Location.objects.filter(organization=organization, is_active=True)
+            if organization and organization.has_multiple_locations() else []
+        ),
     }
     return render(request, 'sales/pos.html', context)
 
 
+@login_required
+def reserve_stock_api(request):
+    """কার্টে পণ্য রিজার্ভ API: {cart, product_id, quantity} sets the cart's quantity"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid method'}, status=400)
+    
+    try:
+        data = json.loads(request.body)
+        cart = str(data['cart'])[:32]
+        quantity = Decimal(str(data.get('quantity', 0)))
+        product = get_object_or_404(scope_to_org(Product.objects.all(), request), pk=data['product_id'])
+    except (ValueError, KeyError, ArithmeticError):
+        return JsonResponse({'error': 'Invalid request'}, status=400)
+    
+    try:
+        available = reservations.reserve(
+            request.user.organization, cart, product.pk, quantity, user=request.user,
+            location=_pos_location(request, data.get('location_id')),
+        )
+    except reservations.ReservationError as e:
+        return JsonResponse({'error': str(e), 'available': float(e.available)}, status=409)
+    # What this cart could hold in total
+    return JsonResponse({'success': True, 'available': float(available + max(quantity, 0))})
+
+
+@login_required
+def release_stock_api(request):
+    """কার্টের রিজার্ভেশন ছেড়ে দেওয়া API (product_id না দিলে পুরো কার্ট)"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid method'}, status=400)
+    
+    try:
+        data = json.loads(request.body)
+        cart = str(data['cart'])[:32]
+    except (ValueError, KeyError):
+        return JsonResponse({'error': 'Invalid request'}, status=400)
+    
+    product_ids = [data['product_id']] if data.get('product_id') else None
+    released = reservations.release(cart, product_ids)
+    return JsonResponse({'success': True, 'released': released})
+
+
+@login_required
+def stock_availability_api(request):
+    """POS গ্রিডের জন্য বিক্রয়যোগ্য স্টক: ?ids=1,2,3&cart=..."""
+    ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk.isdigit()][:200]
+    product_ids = scope_to_org(Product.objects.filter(pk__in=ids), request).values_list('pk', flat=True)
+    available = reservations.available_quantities(
+        product_ids, exclude_cart=request.GET.get('cart'), location=_pos_location(request, request.GET.get('location'))
+    )
+    return JsonResponse({'available': {pk: float(quantity) for pk, quantity in available.items()}})
+
+
 @login_required
 def sale_add(request):
     """নতুন বিক্রয়"""
     if request.method == 'POST':
-        # Create sale
-        sale = Sale.objects.create(
-            customer_id=request.POST.get('customer') or None,
-            discount_amount=request.POST.get('discount', 0) or 0,
-            paid_amount=request.POST.get('paid_amount', 0) or 0,
-            payment_method=request.POST.get('payment_method', 'cash'),
-            notes=request.POST.get('notes', ''),
-            created_by=request.user,
-        )
-        
-        # Add items
-        subtotal = 0
-        product_ids = request.POST.getlist('product_id[]')
-        quantities = request.POST.getlist('quantity[]')
-        prices = request.POST.getlist('price[]')
+        organization = request.user.organization
+        if organization and organization.plan and not quota.allows(organization, 'sales'):
+            messages.error(request, quota.MESSAGES['sales'].format(limit=organization.plan.max_monthly_sales))
+            return redirect('sales:sale_list')
         
-        for i, product_id in enumerate(product_ids):
-            if product_id:
-                product = Product.objects.get(pk=product_id)
-                quantity = Decimal(quantities[i])
-                price = Decimal(prices[i])
-                
-                SaleItem.objects.create(
-                    sale=sale,
-                    product=product,
-                    quantity=quantity,
-                    unit_price=price,
-                    total=quantity * price,
-                )
-                subtotal += quantity * price
-                
-                # Update stock
-                if hasattr(product, 'stock'):
-                    previous_qty = product.stock.quantity
-                    product.stock.quantity -= quantity
-                    product.stock.save()
+        # The sale, its stock, its journal entry and its place in the monthly quota commit together
+        with transaction.atomic():
+            # Lock the stock being sold; POS carts' holds count against it too
+            wanted = {}
+            for product_id, quantity in zip(request.POST.getlist('product_id[]'), request.POST.getlist('quantity[]')):
+                if product_id:
+                    wanted[int(product_id)] = wanted.get(int(product_id), 0) + Decimal(quantity)
+            short = reservations.shortages(wanted, lock=True)
+            if short:
+                names = ', '.join(Product.objects.filter(pk__in=short).values_list('name', flat=True))
+                messages.error(request, f'পর্যাপ্ত স্টক নেই: {names}')
+                return redirect('sales:sale_list')
+            
+            try:
+                quota.reserve(organization, 'sales')
+            except quota.QuotaExceeded as e:
+                # Another terminal took the month's last sale since the check above
+                messages.error(request, str(e))
+                return redirect('sales:sale_list')
+            # Create sale
+            sale = Sale.objects.create(
+                organization=request.user.organization,
+                customer_id=request.POST.get('customer') or None,
+                discount_amount=Decimal(request.POST.get('discount') or 0),
+                paid_amount=Decimal(request.POST.get('paid_amount') or 0),
+                payment_method=request.POST.get('payment_method', 'cash'),
+                notes=request.POST.get('notes', ''),
+                created_by=request.user,
+            )
+            
+            # Add items
+            subtotal = 0
+            product_ids = request.POST.getlist('product_id[]')
+            quantities = request.POST.getlist('quantity[]')
+            prices = request.POST.getlist('price[]')
+            
+            for i, product_id in enumerate(product_ids):
+                if product_id:
+                    product = Product.objects.get(pk=product_id)
+                    quantity = Decimal(quantities[i])
+                    price = Decimal(prices[i])
                     
-                    StockMovement.objects.create(
+                    SaleItem.objects.create(
+                        sale=sale,
                         product=product,
-                        movement_type='out',
                         quantity=quantity,
-                        previous_quantity=previous_qty,
-                        new_quantity=product.stock.quantity,
-                        reference=sale.invoice_number,
-                        notes=f'বিক্রয়: {sale.invoice_number}',
-                        created_by=request.user,
+                        unit_price=price,
+                        total=quantity * price,
                     )
-        
-        # Update sale totals
-        sale.subtotal = subtotal
-        sale.grand_total = subtotal - sale.discount_amount
-        sale.save()
-        
+                    subtotal += quantity * price
+                    
+                    # Update stock
+                    if hasattr(product, 'stock'):
+                        previous_qty = product.stock.quantity
+                        product.stock.quantity -= quantity
+                        product.stock.save()
+                        
+                        StockMovement.objects.create(
+                            product=product,
+                            movement_type='out',
+                            quantity=quantity,
+                            previous_quantity=previous_qty,
+                            new_quantity=product.stock.quantity,
+                            reference=sale.invoice_number,
+                            notes=f'বিক্রয়: {sale.invoice_number}',
+                            created_by=request.user,
+                        )
+            
+            # Update sale totals
+            sale.subtotal = subtotal
+            sale.grand_total = subtotal - sale.discount_amount
+            sale.save()
+            journal.post_sale(sale)
+            shifts.record_sale(sale)
+            
         messages.success(request, f'বিক্রয় সফল! ইনভয়েস: {sale.invoice_number}')
         return redirect('sales:sale_detail', pk=sale.pk)
     
@@ -138,54 +250,80 @@ def create_sale_api(request):
     
     try:
         data = json.loads(request.body)
+        cart = data.get('cart')
+        location = _pos_location(request, data.get('location_id'))
         
-        # Create sale
-        sale = Sale.objects.create(
-            customer_id=data.get('customer_id') or None,
-            discount_amount=Decimal(str(data.get('discount', 0))),
-            paid_amount=Decimal(str(data.get('paid_amount', 0))),
-            payment_method=data.get('payment_method', 'cash'),
-            notes=data.get('notes', ''),
-            created_by=request.user,
-        )
-        
-        # Add items
-        subtotal = Decimal('0')
+        wanted = {}
         for item in data.get('items', []):
-            product = Product.objects.get(pk=item['product_id'])
-            quantity = Decimal(str(item['quantity']))
-            price = Decimal(str(item['price']))
+            wanted[int(item['product_id'])] = wanted.get(int(item['product_id']), 0) + Decimal(str(item['quantity']))
+        
+        # The sale, its stock, its journal entry and its place in the monthly quota commit together
+        with transaction.atomic():
+            # Lock the stock being sold, then check it against other terminals' carts;
+            # a concurrent sale of the same products waits here until this one commits
+            short = reservations.shortages(wanted, exclude_cart=cart, location=location, lock=True)
+            if short:
+                names = ', '.join(Product.objects.filter(pk__in=short).values_list('name', flat=True))
+                return JsonResponse({'error': f'পর্যাপ্ত স্টক নেই: {names}'}, status=409)
             
-            SaleItem.objects.create(
-                sale=sale,
-                product=product,
-                quantity=quantity,
-                unit_price=price,
-                total=quantity * price,
+            quota.reserve(request.user.organization, 'sales')
+            # Create sale
+            sale = Sale.objects.create(
+                organization=request.user.organization,
+                customer_id=data.get('customer_id') or None,
+                discount_amount=Decimal(str(data.get('discount', 0))),
+                paid_amount=Decimal(str(data.get('paid_amount', 0))),
+                payment_method=data.get('payment_method', 'cash'),
+                notes=data.get('notes', ''),
+                created_by=request.user,
             )
-            subtotal += quantity * price
             
-            # Update stock
-            if hasattr(product, 'stock'):
-                previous_qty = product.stock.quantity
-                product.stock.quantity -= quantity
-                product.stock.save()
+            # Add items
+            subtotal = Decimal('0')
+            for item in data.get('items', []):
+                product = Product.objects.get(pk=item['product_id'])
+                quantity = Decimal(str(item['quantity']))
+                price = Decimal(str(item['price']))
                 
-                StockMovement.objects.create(
+                SaleItem.objects.create(
+                    sale=sale,
                     product=product,
-                    movement_type='out',
                     quantity=quantity,
-                    previous_quantity=previous_qty,
-                    new_quantity=product.stock.quantity,
-                    reference=sale.invoice_number,
-                    notes=f'বিক্রয়: {sale.invoice_number}',
-                    created_by=request.user,
+                    unit_price=price,
+                    total=quantity * price,
                 )
-        
-        # Update totals
-        sale.subtotal = subtotal
-        sale.grand_total = subtotal - sale.discount_amount
-        sale.save()
+                subtotal += quantity * price
+                
+                # Update stock
+                if hasattr(product, 'stock'):
+                    previous_qty = product.stock.quantity
+                    product.stock.quantity -= quantity
+                    product.stock.save()
+                    
+                    StockMovement.objects.create(
+                        product=product,
+                        movement_type='out',
+                        quantity=quantity,
+                        previous_quantity=previous_qty,
+                        new_quantity=product.stock.quantity,
+                        reference=sale.invoice_number,
+                        notes=f'বিক্রয়: {sale.invoice_number}',
+                        created_by=request.user,
+                    )
+            
+            # Update totals
+            sale.subtotal = subtotal
+            sale.grand_total = subtotal - sale.discount_amount
+            sale.save()
+            
+            # A branch sale also comes off that branch's stock
+            locations.issue_at(location, wanted)
+            journal.post_sale(sale)
+            shifts.record_sale(sale)
+            
+        # The stock is sold now, so the cart no longer holds it
+        if cart:
+            reservations.release(cart)
         
         return JsonResponse({
             'success': True,
@@ -194,6 +332,8 @@ def create_sale_api(request):
             'grand_total': float(sale.grand_total),
         })
         
+    except quota.QuotaExceeded as e:
+        return JsonResponse({'error': str(e)}, status=403)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
 
@@ -201,12 +341,17 @@ def create_sale_api(request):
 @login_required
 def sale_detail(request, pk):
     """বিক্রয় বিস্তারিত"""
-    sale = get_object_or_404(Sale, pk=pk)
-    items = sale.items.select_related('product')
+    sale = get_object_or_404(scope_to_org(Sale.objects.all(), request), pk=pk)
+    items = list(sale.items.select_related('product'))
+    returned = returns.returned_quantities(item.pk for item in items)
+    for item in items:
+        item.returned_quantity = returned.get(item.pk, 0)
+        item.returnable = item.quantity - item.returned_quantity
     
     context = {
         'sale': sale,
         'items': items,
+        'returns': sale.returns.select_related('created_by'),
     }
     return render(request, 'sales/sale_detail.html', context)
 
@@ -214,7 +359,7 @@ def sale_detail(request, pk):
 @login_required
 def sale_invoice(request, pk):
     """ইনভয়েস প্রিন্ট"""
-    sale = get_object_or_404(Sale, pk=pk)
+    sale = get_object_or_404(scope_to_org(Sale.objects.all(), request), pk=pk)
     items = sale.items.select_related('product')
     
     context = {
@@ -224,30 +369,191 @@ def sale_invoice(request, pk):
     return render(request, 'sales/invoice.html', context)
 
 
+@login_required
+def sale_invoice_pdf(request, pk):
+    """PDF ইনভয়েস (A4 / থার্মাল রিসিট)"""
+    sale = get_object_or_404(
+        scope_to_org(Sale.objects.select_related('organization', 'customer', 'created_by'), request), pk=pk
+    )
+    layout = request.GET.get('layout', invoice_pdf.LAYOUT_A4)
+    if layout not in invoice_pdf.LAYOUTS:
+        layout = invoice_pdf.LAYOUT_A4
+    
+    response = HttpResponse(invoice_pdf.get_invoice_pdf(sale, layout), content_type='application/pdf')
+    response['Content-Disposition'] = f'inline; filename="{sale.invoice_number}.pdf"'
+    return response
+
+
+@login_required
+def daily_invoices_pdf(request):
+    """একদিনের সব ইনভয়েস একটি PDF-এ"""
+    try:
+        date = parse_date(request.GET['date']) if request.GET.get('date') else timezone.localdate()
+    except ValueError:
+        date = None
+    if date is None:
+        return HttpResponseBadRequest('তারিখ সঠিক নয় (YYYY-MM-DD)')
+    layout = request.GET.get('layout', invoice_pdf.LAYOUT_A4)
+    if layout not in invoice_pdf.LAYOUTS:
+        layout = invoice_pdf.LAYOUT_A4
+    
+    content = invoice_pdf.render_daily_invoices(request.user.organization, date, layout)
+    if content is None:
+        messages.warning(request, 'এই তারিখে কোনো বিক্রয় নেই!')
+        return redirect('sales:daily_sales_report')
+    
+    response = HttpResponse(content, content_type='application/pdf')
+    response['Content-Disposition'] = f'inline; filename="invoices-{date}.pdf"'
+    return response
+
+
 @login_required
 def add_payment(request, pk):
     """পেমেন্ট যোগ"""
-    sale = get_object_or_404(Sale, pk=pk)
+    sale = get_object_or_404(scope_to_org(Sale.objects.all(), request), pk=pk)
     
     if request.method == 'POST':
-        amount = Decimal(request.POST.get('amount', 0))
+        try:
+            amount = Decimal(request.POST.get('amount') or '0')
+        except InvalidOperation:
+            amount = None
+        if amount is None or not amount.is_finite() or amount <= 0:
+            messages.error(request, 'টাকার পরিমাণ শূন্যের বেশি হতে হবে')
+            return redirect('sales:sale_detail', pk=pk)
         
-        Payment.objects.create(
-            sale=sale,
-            amount=amount,
+        with transaction.atomic():
+            # Lock the invoice like allocation.receive and returns do, then check what it still owes
+            sale = Sale.objects.select_for_update().get(pk=sale.pk)
+            if amount > sale.due_amount:
+                messages.error(request, f'বাকি ৳{sale.due_amount}, এর বেশি নেওয়া যাবে না')
+                return redirect('sales:sale_detail', pk=pk)
+            payment = Payment.objects.create(
+                sale=sale,
+                amount=amount,
+                payment_method=request.POST.get('payment_method', 'cash'),
+                reference=request.POST.get('reference', ''),
+                notes=request.POST.get('notes', ''),
+                received_by=request.user,
+            )
+            
+            # Update sale
+            sale.paid_amount += amount
+            sale.save()
+            journal.post_sale_payment(payment)
+            shifts.record_payment(payment)
+        
+        messages.success(request, f'{amount}৳ পেমেন্ট যোগ হয়েছে!')
+    
+    return redirect('sales:sale_detail', pk=pk)
+
+
+@login_required
+def sale_return(request, pk):
+    """বিক্রয় ফেরত (ক্রেডিট নোট)"""
+    sale = get_object_or_404(scope_to_org(Sale.objects.all(), request), pk=pk)
+    if request.method != 'POST':
+        return redirect('sales:sale_detail', pk=pk)
+    
+    try:
+        quantities = {
+            int(key.split('-', 1)[1]): Decimal(value)
+            for key, value in request.POST.items()
+            if key.startswith('return-') and value.strip()
+        }
+        sale_return = returns.create_return(
+            sale, quantities, request.user,
+            refund_method=request.POST.get('refund_method', 'cash'),
+            reason=request.POST.get('reason', ''),
+        )
+    except (ValueError, ArithmeticError):
+        messages.error(request, 'সঠিক পরিমাণ দিন')
+    except (returns.ReturnError, journal.JournalError) as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, f'ক্রেডিট নোট {sale_return.return_number} তৈরি হয়েছে! ফেরত: ৳{sale_return.refund_amount}')
+    return redirect('sales:sale_detail', pk=pk)
+
+
+@login_required
+def customer_receipt(request, pk):
+    """গ্রাহকের একসাথে পেমেন্ট: পুরনো বাকি ইনভয়েস থেকে ক্রমানুসারে ভাগ"""
+    customer = get_object_or_404(scope_to_org(Customer.objects.all(), request), pk=pk)
+    if request.method != 'POST':
+        return redirect('sales:due_customer_detail', pk=pk)
+    
+    try:
+        amount = Decimal(request.POST.get('amount') or 0)
+        payments = allocation.receive(
+            request.user.organization, customer, amount,
             payment_method=request.POST.get('payment_method', 'cash'),
+            user=request.user,
             reference=request.POST.get('reference', ''),
             notes=request.POST.get('notes', ''),
-            received_by=request.user,
         )
-        
-        # Update sale
-        sale.paid_amount += amount
-        sale.save()
-        
-        messages.success(request, f'{amount}৳ পেমেন্ট যোগ হয়েছে!')
+    except ArithmeticError:
+        messages.error(request, 'সঠিক টাকার পরিমাণ দিন')
+    except (allocation.AllocationError, journal.JournalError) as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, f'{amount}৳ পেমেন্ট {len(payments)}টি ইনভয়েসে ভাগ হয়েছে!')
+    return redirect('sales:due_customer_detail', pk=pk)
+
+
+@login_required
+def shift_list(request):
+    """শিফট তালিকা"""
+    organization = request.user.organization
+    context = {
+        'shifts': Shift.objects.filter(organization=organization).select_related('cashier', 'location')[:100],
+        'current_shift': shifts.current(organization, request.user),
+    }
+    return render(request, 'sales/shift_list.html', context)
+
+
+@login_required
+def shift_open(request):
+    """শিফট শুরু"""
+    if request.method != 'POST':
+        return redirect('sales:shift_list')
+    try:
+        shift = shifts.open_shift(
+            request.user.organization, request.user,
+            Decimal(request.POST.get('opening_float') or 0),
+            location=_pos_location(request, request.POST.get('location')),
+        )
+    except ArithmeticError:
+        messages.error(request, 'সঠিক টাকার পরিমাণ দিন')
+        return redirect('sales:shift_list')
+    except shifts.ShiftError as e:
+        messages.error(request, str(e))
+        return redirect('sales:shift_list')
+    messages.success(request, 'শিফট শুরু হয়েছে!')
+    return redirect('sales:shift_detail', pk=shift.pk)
+
+
+@login_required
+def shift_detail(request, pk):
+    """শিফটের হিসাব ও বন্ধ করা (POST: counted_cash)"""
+    shift = get_object_or_404(
+        Shift.objects.select_related('cashier', 'location', 'closed_by'),
+        pk=pk, organization=request.user.organization,
+    )
     
-    return redirect('sales:sale_detail', pk=pk)
+    if request.method == 'POST':
+        try:
+            shift = shifts.close_shift(
+                shift, Decimal(request.POST.get('counted_cash') or 0),
+                user=request.user, notes=request.POST.get('notes', ''),
+            )
+        except ArithmeticError:
+            messages.error(request, 'সঠিক টাকার পরিমাণ দিন')
+        except shifts.ShiftError as e:
+            messages.error(request, str(e))
+        else:
+            messages.success(request, f'শিফট বন্ধ হয়েছে! পার্থক্য: {shift.variance}৳')
+        return redirect('sales:shift_detail', pk=pk)
+    
+    return render(request, 'sales/shift_detail.html', {'shift': shift})
 
 
 @login_required
@@ -314,15 +620,109 @@ def daily_sales_report(request):
 
 @login_required
 def due_report(request):
-    """বাকি রিপোর্ট"""
-    sales = Sale.objects.filter(
-        payment_status__in=['unpaid', 'partial']
-    ).select_related('customer').order_by('-due_amount')
+    """বাকি রিপোর্ট (এজিং: গ্রাহক অনুযায়ী)"""
+    customers, totals = aging.summary(
+        scope_to_org(Sale.objects.all(), request), ['customer_id', 'customer__name', 'customer__phone'], 'sale_date'
+    )
     
-    total_due = sales.aggregate(total=Sum('due_amount'))['total'] or 0
+    context = {
+        'customers': customers,
+        'totals': totals,
+        'buckets': aging.BUCKETS,
+        'total_due': totals['total'],
+        'due_customers_count': len(customers),
+    }
+    return render(request, 'sales/due_report.html', context)
+
+
+def _customer_due_sales(request, pk):
+    """একজন গ্রাহকের খোলা ইনভয়েস (pk 0 = ওয়াক-ইন)"""
+    sales = aging.open_documents(scope_to_org(Sale.objects.all(), request))
+    if pk:
+        return sales.filter(customer_id=pk)
+    return sales.filter(customer__isnull=True)
+
+
+@login_required
+def due_customer_detail(request, pk):
+    """গ্রাহকের বাকি ইনভয়েস (বয়স অনুযায়ী)"""
+    customer = get_object_or_404(scope_to_org(Customer.objects.all(), request), pk=pk) if pk else None
+    documents = _customer_due_sales(request, pk)
+    stats = documents.aggregate(total=Sum('due_amount'), count=Count('pk'))
+    # Oldest first; the full list is in the Excel export
+    sales = list(documents.order_by('sale_date').values(
+        'pk', 'invoice_number', 'sale_date', 'grand_total', 'paid_amount', 'due_amount',
+    )[:200])
+    today = timezone.localdate()
+    for sale in sales:
+        sale['age'], sale['bucket'] = aging.bucket_of(sale['sale_date'], today)
     
     context = {
+        'customer': customer,
         'sales': sales,
-        'total_due': total_due,
+        'total_due': stats['total'] or 0,
+        'document_count': stats['count'],
     }
-    return render(request, 'sales/due_report.html', context)
+    return render(request, 'sales/due_customer_detail.html', context)
+
+
+@login_required
+def daily_sales_export(request):
+    """দৈনিক বিক্রয় রিপোর্ট Excel"""
+    from_date = request.GET.get('from_date') or timezone.now().date()
+    to_date = request.GET.get('to_date') or timezone.now().date()
+    
+    sales = scope_to_org(Sale.objects.filter(
+        sale_date__date__gte=from_date,
+        sale_date__date__lte=to_date
+    ), request).order_by('sale_date').values_list(
+        'invoice_number', 'sale_date', 'customer__name', 'created_by__username',
+        'subtotal', 'discount_amount', 'grand_total', 'paid_amount', 'due_amount',
+        'payment_method', 'payment_status',
+    )
+    
+    methods = dict(Sale.PAYMENT_METHODS)
+    statuses = dict(Sale.PAYMENT_STATUS)
+    rows = (
+        row[:9] + (methods.get(row[9], row[9]), statuses.get(row[10], row[10]))
+        for row in sales.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    headers = ['ইনভয়েস', 'তারিখ', 'গ্রাহক', 'বিক্রেতা', 'উপমোট', 'ছাড়', 'সর্বমোট',
+               'প্রদত্ত', 'বাকি', 'পেমেন্ট মাধ্যম', 'স্ট্যাটাস']
+    return xlsx_response(f'sales-{from_date}-{to_date}.xlsx', [('বিক্রয়', headers, rows)])
+
+
+@login_required
+def due_report_export(request):
+    """বাকি রিপোর্ট Excel: গ্রাহক অনুযায়ী এজিং + ইনভয়েস তালিকা"""
+    sales = scope_to_org(Sale.objects.all(), request)
+    customer = request.GET.get('customer')
+    if customer and customer.isdigit():
+        sales = _customer_due_sales(request, int(customer))
+    
+    today = timezone.localdate()
+    customers, totals = aging.summary(
+        sales, ['customer_id', 'customer__name', 'customer__phone'], 'sale_date', today
+    )
+    bucket_keys = [key for key, *rest in aging.BUCKETS]
+    summary_rows = (
+        (row['customer__name'] or 'ওয়াক-ইন', row['customer__phone'], row['documents'])
+        + tuple(row[key] for key in bucket_keys) + (row['total'],)
+        for row in customers
+    )
+    invoices = aging.open_documents(sales).order_by('customer__name', 'sale_date').values_list(
+        'invoice_number', 'sale_date', 'customer__name', 'customer__phone',
+        'grand_total', 'paid_amount', 'due_amount',
+    )
+    invoice_rows = (
+        row + aging.bucket_of(row[1], today)
+        for row in invoices.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    
+    bucket_labels = [label for key, label, *rest in aging.BUCKETS]
+    sheets = [
+        ('এজিং', ['গ্রাহক', 'ফোন', 'ইনভয়েস সংখ্যা'] + bucket_labels + ['মোট বাকি'], summary_rows),
+        ('বাকি ইনভয়েস', ['ইনভয়েস', 'তারিখ', 'গ্রাহক', 'ফোন', 'সর্বমোট', 'প্রদত্ত', 'বাকি', 'বয়স (দিন)', 'সময়সীমা'],
+         invoice_rows),
+    ]
+    return xlsx_response('due-report.xlsx', sheets)
@@ -0,0 +1,77 @@
+"""
+বাকির বয়স (aging) রিপোর্ট
+Open documents - unpaid and partial sales or purchases - are bucketed by age
+into 0-30, 31-60, 61-90 and 90+ days. The per-party summary is one GROUP BY
+with a conditional SUM per bucket over the (organization, payment_status,
+date) index, so it reads only the open rows however long the shop's history
+is. Grand totals are summed from those party rows rather than asked for in a
+second query. The age of a document is counted in whole local days.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+OPEN_STATUSES = ['unpaid', 'partial']
+# (key, label, oldest age in days, newest age in days)
+BUCKETS = [
+    ('current', '০-৩০ দিন', 30, 0),
+    ('days_31_60', '৩১-৬০ দিন', 60, 31),
+    ('days_61_90', '৬১-৯০ দিন', 90, 61),
+    ('over_90', '৯০+ দিন', None, 91),
+]
+ZERO = Decimal('0')
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def bucket_filters(date_field, today=None):
+    """{bucket key: Q} on the document date, one range per bucket"""
+    today = today or timezone.localdate()
+    filters = {}
+    for key, label, oldest, newest in BUCKETS:
+        q = Q(**{f'{date_field}__lt': _day_start(today - timedelta(days=newest - 1))})
+        if oldest is not None:
+            q &= Q(**{f'{date_field}__gte': _day_start(today - timedelta(days=oldest))})
+        filters[key] = q
+    return filters
+
+
+def bucket_of(document_date, today=None):
+    """(age in days, bucket label) of one document"""
+    today = today or timezone.localdate()
+    age = (today - timezone.localtime(document_date).date()).days
+    for key, label, oldest, newest in BUCKETS:
+        if oldest is None or age <= oldest:
+            return age, label
+
+
+def open_documents(queryset):
+    return queryset.filter(payment_status__in=OPEN_STATUSES, due_amount__gt=0)
+
+
+def summary(queryset, party_fields, date_field, today=None):
+    """Per-party aging rows (largest balance first) and the grand totals, in one query"""
+    aggregates = {
+        key: Sum('due_amount', filter=q) for key, q in bucket_filters(date_field, today).items()
+    }
+    rows = list(
+        open_documents(queryset).values(*party_fields).annotate(
+            total=Sum('due_amount'),
+            documents=Count('pk'),
+            oldest=Min(date_field),
+            **aggregates,
+        ).order_by('-total')
+    )
+    totals = dict.fromkeys([key for key, *rest in BUCKETS] + ['total'], ZERO)
+    totals['documents'] = 0
+    for row in rows:
+        for key in aggregates:
+            row[key] = row[key] or ZERO
+            totals[key] += row[key]
+        totals['total'] += row['total']
+        totals['documents'] += row['documents']
+    return rows, totals
@@ -0,0 +1,28 @@
+"""
+ডাটাবেস হেল্পার
+bulk_update() builds a CASE expression per row and field in Python, which
+dominates the request time once a batch reaches thousands of rows. The helper
+below sends one parameterised UPDATE per row through a single executemany.
+"""
+from django.db import connection
+
+
+def bulk_update_columns(model, objs, fields):
+    """Write `fields` of saved objects by primary key; no signals, auto_now fields are not touched"""
+    objs = list(objs)
+    if not objs:
+        return
+    quote = connection.ops.quote_name
+    columns = [model._meta.get_field(name) for name in fields]
+    pk = model._meta.pk
+    sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+        quote(model._meta.db_table),
+        ', '.join(f'{quote(field.column)} = %s' for field in columns),
+        quote(pk.column),
+    )
+    params = [
+        [field.get_db_prep_save(getattr(obj, field.attname), connection) for field in columns] + [obj.pk]
+        for obj in objs
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
@@ -0,0 +1,53 @@
+"""
+Excel এক্সপোর্ট হেল্পার
+Streams report rows into an openpyxl write-only workbook so memory stays flat
+regardless of row count.
+"""
+import tempfile
+from datetime import datetime
+
+from django.http import FileResponse
+from django.utils import timezone
+from openpyxl import Workbook
+
+# Rows fetched from the database per round trip
+EXPORT_CHUNK_SIZE = 2000
+
+
+def scope_to_org(queryset, request, field='organization'):
+    """Limit an export to the user's shop (SaaS admin sees all)"""
+    org = getattr(request.user, 'organization', None)
+    if org:
+        return queryset.filter(**{field: org})
+    return queryset
+
+
+def cell(value):
+    """Convert values openpyxl cannot store (aware datetimes)"""
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+
+def write_workbook(fileobj, sheets):
+    """sheets: iterable of (title, headers, rows); rows is any iterator of tuples"""
+    wb = Workbook(write_only=True)
+    for title, headers, rows in sheets:
+        ws = wb.create_sheet(title=title[:31])
+        ws.append(headers)
+        for row in rows:
+            ws.append([cell(value) for value in row])
+    wb.save(fileobj)
+
+
+def xlsx_response(filename, sheets):
+    """Build the workbook in a temp file and stream it back in chunks"""
+    tmp = tempfile.TemporaryFile()
+    write_workbook(tmp, sheets)
+    tmp.seek(0)
+    return FileResponse(
+        tmp,
+        as_attachment=True,
+        filename=filename,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
@@ -97,6 +97,24 @@ else:
         }
     }
 
+# Cache
+# Shared cache (Redis) in production so cache versions are seen by every gunicorn worker
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -150,3 +168,14 @@ if not DEBUG:
 
 # CORS settings (for API access if needed)
 CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
+
+# POS cart reservations hold stock for this many seconds after the cart was last touched
+STOCK_RESERVATION_TTL = int(os.environ.get('STOCK_RESERVATION_TTL', 600))
+
+# Invoice PDF rendering
+# Bengali TTF font embedded in PDF invoices (the Docker image sets it); unset prints with
+# Helvetica, a path that does not exist fails the sales.E001 check
+INVOICE_FONT_PATH = os.environ.get('INVOICE_FONT_PATH', '')
+# Rendered invoices are cached outside MEDIA_ROOT so they are never publicly served
+INVOICE_PDF_CACHE_DIR = Path(os.environ.get('INVOICE_PDF_CACHE_DIR', BASE_DIR / 'cache' / 'invoices'))
+INVOICE_PDF_WORKERS = int(os.environ.get('INVOICE_PDF_WORKERS', os.cpu_count() or 1))
@@ -1,10 +1,10 @@
 from django.contrib import admin
-from .models import Organization, SubscriptionPlan, Subscription
+from .models import Organization, OrganizationUsage, SubscriptionPlan, Subscription
 
 
 @admin.register(SubscriptionPlan)
 class SubscriptionPlanAdmin(admin.ModelAdmin):
-    list_display = ['display_name', 'price_monthly', 'max_products', 'max_users', 'is_active']
+    list_display = ['display_name', 'price_monthly', 'max_products', 'max_users', 'max_monthly_sales', 'is_active']
     list_filter = ['is_active']
 
 
@@ -23,3 +23,10 @@ class SubscriptionAdmin(admin.ModelAdmin):
     list_filter = ['status', 'is_active', 'plan']
     search_fields = ['organization__name']
     date_hierarchy = 'created_at'
+
+
+@admin.register(OrganizationUsage)
+class OrganizationUsageAdmin(admin.ModelAdmin):
+    list_display = ['organization', 'product_count', 'user_count', 'monthly_sale_count', 'month', 'updated_at']
+    search_fields = ['organization__name']
+    readonly_fields = ['product_count', 'user_count', 'monthly_sale_count', 'month', 'updated_at']
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from tenants import quota
+from tenants.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Start every shop's monthly sale counter on the new month (schedule on the 1st, e.g. via cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=parse_date, help='Any day of the month to start, YYYY-MM-DD (default: today)')
+        parser.add_argument('--recount', action='store_true',
+                            help='Also re-seed product, user and sale counters from the tables')
+        parser.add_argument('--org', help='Organization slug for --recount (default: all active shops)')
+
+    def handle(self, *args, **options):
+        day = options['date'] or timezone.localdate()
+        start = time.perf_counter()
+        reset = quota.reset_month(day)
+        self.stdout.write(f'{reset} shops start {quota.current_month(day):%Y-%m} from zero '
+                          f'in {time.perf_counter() - start:.2f}s')
+
+        if options['recount']:
+            organizations = Organization.objects.filter(is_active=True)
+            if options['org']:
+                organizations = organizations.filter(slug=options['org'])
+            for org in organizations:
+                row = quota.recount(org, day)
+                self.stdout.write(
+                    f'{org.slug}: {row.product_count} products, {row.user_count} users, '
+                    f'{row.monthly_sale_count} sales this month'
+                )
+
+        self.stdout.write(self.style.SUCCESS('Done!'))
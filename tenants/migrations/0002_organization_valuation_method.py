@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='valuation_method',
+            field=models.CharField(choices=[('average', 'ওয়েটেড এভারেজ'), ('fifo', 'FIFO (আগে আসা আগে যাবে)')], default='average', max_length=10, verbose_name='স্টক মূল্যায়ন পদ্ধতি'),
+        ),
+    ]
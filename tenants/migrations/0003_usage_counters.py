@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0002_organization_valuation_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_count', models.PositiveIntegerField(default=0, verbose_name='পণ্য সংখ্যা')),
+                ('user_count', models.PositiveIntegerField(default=0, verbose_name='ইউজার সংখ্যা')),
+                ('monthly_sale_count', models.PositiveIntegerField(default=0, verbose_name='এই মাসের বিক্রি')),
+                ('month', models.DateField(verbose_name='মাস')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='usage', to='tenants.organization')),
+            ],
+            options={
+                'verbose_name': 'ব্যবহার',
+                'verbose_name_plural': 'ব্যবহার',
+            },
+        ),
+    ]
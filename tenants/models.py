@@ -55,6 +55,15 @@ class Organization(models.Model):
     # Subscription
     plan = models.ForeignKey(SubscriptionPlan, on_delete=models.PROTECT, null=True, blank=True)
     
+    # Inventory costing (changing it requires: manage.py rebuild_valuation --org <slug>)
+    VALUATION_METHODS = [
+        ('average', 'ওয়েটেড এভারেজ'),
+        ('fifo', 'FIFO (আগে আসা আগে যাবে)'),
+    ]
+    valuation_method = models.CharField(
+        max_length=10, choices=VALUATION_METHODS, default='average', verbose_name="স্টক মূল্যায়ন পদ্ধতি"
+    )
+    
     # Status
     is_active = models.BooleanField(default=True)
     is_verified = models.BooleanField(default=False)
@@ -75,21 +84,47 @@ class Organization(models.Model):
     def active_subscription(self):
         return self.subscriptions.filter(is_active=True, end_date__gte=timezone.now()).first()
     
+    # Usage is read from the OrganizationUsage counters (tenants.quota), not counted
     def get_current_product_count(self):
-        return self.products.count()
+        from . import quota
+        return quota.usage(self).product_count
     
     def get_current_user_count(self):
-        return self.users.count()
+        from . import quota
+        return quota.usage(self).user_count
     
     def can_add_product(self):
         if not self.plan:
             return False
-        return self.get_current_product_count() < self.plan.max_products
+        from . import quota
+        return quota.allows(self, 'products')
     
     def can_add_user(self):
         if not self.plan:
             return False
-        return self.get_current_user_count() < self.plan.max_users
+        from . import quota
+        return quota.allows(self, 'users')
+    
+    def has_multiple_locations(self):
+        return bool(self.plan and self.plan.has_multiple_locations)
+
+
+class OrganizationUsage(models.Model):
+    """দোকানের ব্যবহার কাউন্টার (প্ল্যানের সীমার বিপরীতে)"""
+    organization = models.OneToOneField(Organization, on_delete=models.CASCADE, related_name='usage')
+    product_count = models.PositiveIntegerField(default=0, verbose_name="পণ্য সংখ্যা")
+    user_count = models.PositiveIntegerField(default=0, verbose_name="ইউজার সংখ্যা")
+    # Sales made in `month` (its first day); the monthly job starts the next month from zero
+    monthly_sale_count = models.PositiveIntegerField(default=0, verbose_name="এই মাসের বিক্রি")
+    month = models.DateField(verbose_name="মাস")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "ব্যবহার"
+        verbose_name_plural = "ব্যবহার"
+    
+    def __str__(self):
+        return f"{self.organization.name} - {self.month:%Y-%m}"
 
 
 class Subscription(models.Model):
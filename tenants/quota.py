@@ -0,0 +1,129 @@
+"""
+প্ল্যানের সীমা (কোটা)
+Each shop has one OrganizationUsage row with its product, user and
+this-month sale counters. A write path reserves what it is about to create
+with one conditional UPDATE - the counter moves only if it stays within the
+SubscriptionPlan limit - inside the transaction that creates the rows, so a
+failed create gives the slot back and two terminals can never both take the
+last one. Checking a limit is a read of that one row, never a COUNT(*).
+
+Deleted products and users give their slot back (tenants.signals). The
+monthly counter belongs to `month`: the scheduled reset_quota_usage command
+starts every shop's new month from zero, and a shop whose counter is still
+on an earlier month is moved on by its first sale of the new one. The same
+command's --recount re-seeds the counters from the tables for anything
+created outside these paths (admin, shell).
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OrganizationUsage
+
+# resource -> (counter field, SubscriptionPlan limit field)
+RESOURCES = {
+    'products': ('product_count', 'max_products'),
+    'users': ('user_count', 'max_users'),
+    'sales': ('monthly_sale_count', 'max_monthly_sales'),
+}
+
+MESSAGES = {
+    'products': 'আপনার প্ল্যানে সর্বোচ্চ {limit}টি পণ্য যোগ করতে পারবেন। প্ল্যান আপগ্রেড করুন।',
+    'users': 'আপনার প্ল্যানে সর্বোচ্চ {limit} জন ইউজার যোগ করতে পারবেন। প্ল্যান আপগ্রেড করুন।',
+    'sales': 'আপনার প্ল্যানে মাসে সর্বোচ্চ {limit}টি বিক্রি করতে পারবেন। প্ল্যান আপগ্রেড করুন।',
+}
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+def current_month(day=None):
+    return (day or timezone.localdate()).replace(day=1)
+
+
+def limit(organization, resource):
+    """The plan's limit; None for a shop without a plan, which is counted but not limited"""
+    plan = organization.plan
+    return getattr(plan, RESOURCES[resource][1]) if plan else None
+
+
+def counts(organization, month):
+    """What the counters should hold, counted from the tables"""
+    from sales.models import Sale
+    return {
+        'product_count': organization.products.count(),
+        'user_count': organization.users.count(),
+        'monthly_sale_count': Sale.objects.filter(organization=organization, sale_date__date__gte=month).count(),
+    }
+
+
+def usage(organization):
+    """The shop's counters, created (seeded from the tables) on first use"""
+    month = current_month()
+    row = OrganizationUsage.objects.filter(organization=organization).first()
+    if row is None:
+        row, created = OrganizationUsage.objects.get_or_create(
+            organization=organization, defaults={'month': month, **counts(organization, month)},
+        )
+    if row.month < month:
+        # Not rolled over yet: nothing has been sold this month
+        row.monthly_sale_count = 0
+    return row
+
+
+def allows(organization, resource, count=1):
+    allowed = limit(organization, resource)
+    if allowed is None:
+        return True
+    return getattr(usage(organization), RESOURCES[resource][0]) + count <= allowed
+
+
+def _start_month(organization, month):
+    return OrganizationUsage.objects.filter(organization=organization, month__lt=month).update(
+        month=month, monthly_sale_count=0,
+    )
+
+
+def reserve(organization, resource, count=1):
+    """Take `count` slots or raise QuotaExceeded; call inside the creating transaction"""
+    if organization is None or count <= 0:
+        return
+    field = RESOURCES[resource][0]
+    allowed = limit(organization, resource)
+    month = current_month()
+    rows = OrganizationUsage.objects.filter(organization=organization)
+    if allowed is not None:
+        rows = rows.filter(**{f'{field}__lte': allowed - count})
+    if resource == 'sales':
+        rows = rows.filter(month=month)
+    if rows.update(**{field: F(field) + count}):
+        return
+    # No row yet, or last month's sale counter: fix that up and try once more
+    usage(organization)
+    if resource == 'sales':
+        _start_month(organization, month)
+    if not rows.update(**{field: F(field) + count}):
+        raise QuotaExceeded(MESSAGES[resource].format(limit=allowed))
+
+
+def release(organization, resource, count=1):
+    """Give slots back (a product or user was deleted)"""
+    field = RESOURCES[resource][0]
+    OrganizationUsage.objects.filter(organization=organization, **{f'{field}__gte': count}).update(
+        **{field: F(field) - count}
+    )
+
+
+def reset_month(day=None):
+    """Start every shop's sale counter on the new month; one UPDATE for all shops"""
+    month = current_month(day)
+    return OrganizationUsage.objects.filter(month__lt=month).update(month=month, monthly_sale_count=0)
+
+
+def recount(organization, day=None):
+    """Re-seed the shop's counters from the tables"""
+    month = current_month(day)
+    row, created = OrganizationUsage.objects.update_or_create(
+        organization=organization, defaults={'month': month, **counts(organization, month)},
+    )
+    return row
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+from products.models import Product
+from . import quota
+
+
+@receiver(post_delete, sender=Product)
+def release_product_slot(sender, instance, **kwargs):
+    """পণ্য মুছলে প্ল্যানের জায়গা ফেরত"""
+    if instance.organization_id:
+        quota.release(instance.organization_id, 'products')
+
+
+@receiver(post_delete, sender=User)
+def release_user_slot(sender, instance, **kwargs):
+    """ইউজার মুছলে প্ল্যানের জায়গা ফেরত"""
+    if instance.organization_id:
+        quota.release(instance.organization_id, 'users')
@@ -1,3 +1,62 @@
+from datetime import date
+
 from django.test import TestCase
 
-# Create your tests here.
+from products.models import Product
+from . import quota
+from .models import Organization, OrganizationUsage, SubscriptionPlan
+
+
+class QuotaTests(TestCase):
+    def setUp(self):
+        self.plan = SubscriptionPlan.objects.create(name='free', display_name='ফ্রি', max_products=2, max_monthly_sales=1)
+        self.org = Organization.objects.create(
+            name='s', slug='s', owner_name='o', email='s@example.com', phone='1', plan=self.plan,
+        )
+
+    def test_reserve_stops_at_the_plan_limit(self):
+        quota.reserve(self.org, 'products')
+        quota.reserve(self.org, 'products')
+
+        with self.assertRaises(quota.QuotaExceeded):
+            quota.reserve(self.org, 'products')
+        self.assertFalse(quota.allows(self.org, 'products'))
+        self.assertEqual(OrganizationUsage.objects.get(organization=self.org).product_count, 2)
+
+    def test_batch_that_does_not_fit_takes_nothing(self):
+        quota.reserve(self.org, 'products')
+
+        with self.assertRaises(quota.QuotaExceeded):
+            quota.reserve(self.org, 'products', 2)
+        self.assertEqual(OrganizationUsage.objects.get(organization=self.org).product_count, 1)
+
+    def test_deleting_a_product_gives_its_slot_back(self):
+        product = Product.objects.create(organization=self.org, name='কলম', buying_price=1, selling_price=2)
+        # The counter starts from the product already there
+        quota.reserve(self.org, 'products')
+        self.assertFalse(quota.allows(self.org, 'products'))
+
+        product.delete()
+
+        self.assertTrue(quota.allows(self.org, 'products'))
+
+    def test_shop_without_a_plan_is_counted_but_not_limited(self):
+        self.org.plan = None
+        self.org.save()
+
+        quota.reserve(self.org, 'products', 5)
+
+        self.assertTrue(quota.allows(self.org, 'products', 100))
+        self.assertEqual(OrganizationUsage.objects.get(organization=self.org).product_count, 5)
+
+    def test_monthly_sales_start_again_in_a_new_month(self):
+        quota.reserve(self.org, 'sales')
+        with self.assertRaises(quota.QuotaExceeded):
+            quota.reserve(self.org, 'sales')
+
+        # Last month's counter: the first sale of this month moves it on
+        OrganizationUsage.objects.filter(organization=self.org).update(month=date(2000, 1, 1))
+        quota.reserve(self.org, 'sales')
+
+        usage = OrganizationUsage.objects.get(organization=self.org)
+        self.assertEqual((usage.month, usage.monthly_sale_count), (quota.current_month(), 1))
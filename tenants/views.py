@@ -5,6 +5,7 @@ from django.utils import timezone
 from django.utils.text import slugify
 from datetime import timedelta
 from .models import Organization, SubscriptionPlan, Subscription
+from . import quota
 from accounts.models import User
 
 
@@ -90,7 +91,8 @@ def register(request):
             is_active=is_active
         )
         
-        # Create User (Owner)
+        # Create User (Owner), the shop's first user slot
+        quota.reserve(org, 'users')
         user = User.objects.create_user(
             username=username,
             email=email,
@@ -147,12 +149,15 @@ def subscription_details(request):
     subscription = org.active_subscription
     plans = SubscriptionPlan.objects.filter(is_active=True)
     
-    # Usage stats
+    # Usage stats, from the shop's counters
+    counters = quota.usage(org)
     usage = {
-        'products': org.get_current_product_count(),
+        'products': counters.product_count,
         'products_limit': org.plan.max_products if org.plan else 0,
-        'users': org.get_current_user_count(),
+        'users': counters.user_count,
         'users_limit': org.plan.max_users if org.plan else 0,
+        'sales': counters.monthly_sale_count,
+        'sales_limit': org.plan.max_monthly_sales if org.plan else 0,
     }
     
     return render(request, 'tenants/subscription.html', {